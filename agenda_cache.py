@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import *
+from intent_cache import IntentCache
+
+# Per-instance fields of MCP meetings; they differ for every occurrence of a recurring
+# meeting without changing what its agenda should say
+_VOLATILE_FIELDS = ('id', 'start_time', 'end_time', 'created_at', 'confirmed_at', 'meet_link',
+                    'calendar_link', 'content', 'status', 'duration')
+
+
+def context_digest(context):
+    """Digest of MCP context that ignores per-occurrence details and repeated meetings
+
+    Agenda text ('content') is left out as well: meetings recorded with a different agenda
+    drop cached entries through AgendaCache.on_meeting_recorded instead.
+    """
+    try:
+        meetings = json.loads(context) if context else []
+    except (TypeError, ValueError):
+        meetings = None
+    if isinstance(meetings, list) and all(isinstance(m, dict) for m in meetings):
+        facts = set()
+        for meeting in meetings:
+            fact = {k: v for k, v in meeting.items() if k not in _VOLATILE_FIELDS}
+            if isinstance(fact.get('participants'), list):
+                fact['participants'] = sorted(fact['participants'])
+            facts.add(json.dumps(fact, sort_keys=True, default=str))
+        encoded = json.dumps(sorted(facts))
+    else:
+        encoded = str(context)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class AgendaCache:
+    """Persistent LRU + TTL cache of generated agendas
+
+    Keyed on normalized subject, participant set and MCP context digest, so every occurrence
+    of a recurring meeting or identically named stand-up reuses the same agenda. Entries are
+    saved to a JSON file and survive restarts; a background thread writes the file at most
+    once per flush_delay seconds, however many agendas were cached in between.
+    """
+
+    def __init__(self, path=None, max_size=None, ttl=None, flush_delay=None):
+        self.path = path or AGENDA_CACHE_PATH
+        self.max_size = max_size or AGENDA_CACHE_SIZE
+        self.ttl = AGENDA_CACHE_TTL if ttl is None else ttl
+        self.flush_delay = AGENDA_CACHE_FLUSH_DELAY if flush_delay is None else flush_delay
+        self._entries = OrderedDict()  # (topic, people digest, context digest) -> {'topic', 'agenda', 'expires_at'}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of the cache file at a time
+        self._dirty = False
+        self._flusher = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable agenda cache {self.path}: {str(e)}")
+            return
+        now = time.time()
+        for key, entry in entries:
+            # Keys are saved as lists; older files used 'topic|people|context' strings
+            if isinstance(key, list) and entry['expires_at'] > now:
+                self._entries[tuple(key)] = entry
+
+    def _save(self, entries):
+        """Atomically write entries to the cache file"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save agenda cache: {str(e)}")
+
+    def _changed(self):
+        """Mark the file out of date and make sure a flush is on its way; called with the lock held"""
+        self._dirty = True
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="agenda-cache-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_delay)
+            with self._lock:
+                if not self._dirty:
+                    self._flusher = None
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to the cache file now"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = list(self._entries.items())
+            self._save(entries)
+
+    @staticmethod
+    def key(topic, participants, context):
+        people = sorted({p.strip().lower() for p in participants or []})
+        digest = hashlib.blake2b(json.dumps(people).encode('utf-8'), digest_size=8).hexdigest()
+        return (IntentCache.normalize(topic), digest, context_digest(context))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['agenda']
+
+    def put(self, key, agenda):
+        with self._lock:
+            self._entries[key] = {
+                'topic': key[0],
+                'agenda': agenda,
+                'expires_at': time.time() + self.ttl
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._changed()
+
+    def invalidate_topic(self, topic, keep_agenda=None):
+        """Drop cached agendas for a topic (except ones equal to keep_agenda); returns the count"""
+        topic = IntentCache.normalize(topic)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry['topic'] == topic and entry['agenda'] != keep_agenda]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self.invalidations += len(stale)
+                self._changed()
+            return len(stale)
+
+    def on_meeting_recorded(self, meeting):
+        """Invalidation hook for newly recorded meetings
+
+        A meeting that used a cached agenda changes nothing; one recorded with different
+        content makes the other agendas on its topic stale.
+        """
+        return self.invalidate_topic(meeting.get('subject', ''), keep_agenda=meeting.get('content'))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._changed()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_agenda_cache():
+    """Return the shared agenda cache, loading it from disk on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AgendaCache()
+        return _cache
@@ -0,0 +1,92 @@
+"""Throughput of MeetingAutomation.send_bulk_emails against a local SMTP sink.
+
+Compares the bulk mail-merge path with sending each personalized message on
+its own connection, and shows per-recipient refusals being reported.
+
+    python benchmarks/bench_bulk_send.py --recipients 250 --sessions 3
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+from collections import Counter
+from email.mime.text import MIMEText
+from string import Template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_automation import MeetingAutomation  # noqa: E402
+from smtp_pool import SMTPConnectionPool  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+SUBJECT = "Meeting Request: $subject"
+BODY = """<html><body>
+<p>Hi $name,</p>
+<p>Please confirm the meeting "$subject":</p>
+<a href="$link?action=confirm">Confirm</a> | <a href="$link?action=reject">Reject</a>
+</body></html>"""
+
+
+def make_recipients(count):
+    return [{
+        'email': f'participant{i}@example.com',
+        'name': f'Participant {i}',
+        'subject': 'Quarterly Planning',
+        'link': f'http://localhost:8000/confirm_meeting/{i}'
+    } for i in range(count)]
+
+
+def send_one_by_one(host, port, recipients):
+    """Baseline: a fresh connection and login per personalized message"""
+    subject, body = Template(SUBJECT), Template(BODY)
+    for variables in recipients:
+        msg = MIMEText(body.substitute(variables), 'html')
+        msg['From'] = 'bench@example.com'
+        msg['To'] = variables['email']
+        msg['Subject'] = subject.substitute(variables)
+        with smtplib.SMTP(host, port) as server:
+            server.login('bench@example.com', 'benchpassword123')
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPRecipientsRefused:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=250)
+    parser.add_argument('--sessions', type=int, default=3)
+    parser.add_argument('--connect-delay', type=float, default=0.02)
+    parser.add_argument('--auth-delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    recipients = make_recipients(args.recipients)
+    refused = {recipients[i]['email'] for i in range(0, args.recipients, 50)}
+
+    with SMTPSink(connect_delay=args.connect_delay, auth_delay=args.auth_delay, refuse=refused) as sink:
+        host, port = sink.address
+
+        start = time.perf_counter()
+        send_one_by_one(host, port, recipients)
+        baseline = time.perf_counter() - start
+
+        # Skip __init__ so the benchmark does not need Google Calendar credentials
+        automation = MeetingAutomation.__new__(MeetingAutomation)
+        automation.smtp_pool = SMTPConnectionPool(server=host, port=port, email='bench@example.com',
+                                                  password='benchpassword123', use_ssl=False, use_tls=False,
+                                                  max_size=args.sessions)
+        connections_before = sink.connections
+        start = time.perf_counter()
+        results = automation.send_bulk_emails(SUBJECT, BODY, recipients, max_sessions=args.sessions)
+        bulk = time.perf_counter() - start
+        automation.smtp_pool.close()
+
+    print(f"\none-by-one  {args.recipients:>5} msgs  {baseline:7.3f}s  {args.recipients / baseline:9.1f} msg/s")
+    print(f"bulk        {args.recipients:>5} msgs  {bulk:7.3f}s  {args.recipients / bulk:9.1f} msg/s")
+    print(f"sessions opened by bulk send: {sink.connections - connections_before}")
+    print(f"results: {dict(Counter(result['status'] for result in results))}")
+
+
+if __name__ == '__main__':
+    main()
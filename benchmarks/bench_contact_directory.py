@@ -0,0 +1,105 @@
+"""Contact lookup latency at directory scale, plus load and incremental reload times.
+
+Generates a synthetic CSV of --contacts entries (random first/last name pairs, some with
+nicknames) in a temp directory and times exact, prefix, nickname and one-typo lookups.
+Reload times a full load and an edit of --edits rows picked up by refresh().
+
+    python benchmarks/bench_contact_directory.py --contacts 100000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_directory import ContactDirectory  # noqa: E402
+
+SYLLABLES = ['al', 'an', 'ar', 'ba', 'be', 'da', 'de', 'el', 'fa', 'ha', 'ib', 'ja', 'ka', 'la', 'li', 'ma',
+             'mi', 'na', 'no', 'ra', 'ri', 'sa', 'se', 'ta', 'to', 'ul', 'va', 'ya', 'za', 'zo']
+
+
+def make_name(rng, syllables):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def write_contacts(path, count, rng):
+    firsts = sorted({make_name(rng, rng.randint(2, 3)) for _ in range(4000)})
+    lasts = sorted({make_name(rng, rng.randint(2, 4)) for _ in range(20000)})
+    rows = []
+    for i in range(count):
+        first, last = rng.choice(firsts), rng.choice(lasts)
+        alias = first[:3].lower() + str(i % 97) if i % 10 == 0 else ''
+        rows.append({'name': f'{first} {last}', 'email': f'{first}.{last}.{i}@example.com'.lower(), 'aliases': alias})
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'email', 'aliases'])
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]  # swap two letters
+
+
+def time_lookups(directory, queries, fn):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6, latencies[-1] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contacts', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--edits', type=int, default=50, help='rows changed before the incremental reload')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = os.path.join(tempfile.mkdtemp(), 'contacts.csv')
+    rows = write_contacts(path, args.contacts, rng)
+
+    started = time.perf_counter()
+    directory = ContactDirectory(path=path, reload_interval=0)
+    print(f"full load:        {time.perf_counter() - started:.2f}s for {len(directory)} contacts")
+
+    sample = [rng.choice(rows) for _ in range(args.queries)]
+    workloads = [
+        ('exact full name', [row['name'] for row in sample]),
+        ('exact address', [row['email'] for row in sample]),
+        ('prefix', [row['name'].split()[1][:4] for row in sample]),
+        ('first name + typo', [f"{row['name'].split()[0]} {typo(row['name'].split()[1].lower(), rng)}" for row in sample]),
+        ('nickname', ['bob'] * args.queries),
+        ('unknown', [f'zzq{i}xy' for i in range(args.queries)]),
+    ]
+    # The lookups below must not pay for file change checks
+    directory.reload_interval = float('inf')
+    for label, queries in workloads:
+        p50, p99, worst = time_lookups(directory, queries, directory.resolve)
+        print(f"{label:<18} p50 {p50:7.1f}us  p99 {p99:7.1f}us  max {worst:8.1f}us")
+    p50, p99, worst = time_lookups(directory, [row['name'].split()[0] for row in sample], lambda q: directory.search(q, 5))
+    print(f"{'search (top 5)':<18} p50 {p50:7.1f}us  p99 {p99:7.1f}us  max {worst:8.1f}us")
+
+    for row in rng.sample(rows, args.edits):
+        row['name'] = make_name(rng, 3) + ' ' + make_name(rng, 3)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'email', 'aliases'])
+        writer.writeheader()
+        writer.writerows(rows)
+    directory.reload_interval = 0
+    started = time.perf_counter()
+    changed = directory.refresh()
+    print(f"incremental reload: {time.perf_counter() - started:.2f}s, {changed} contacts re-indexed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""MeetingAutomation.get_context with and without the ETag context cache.
+
+Runs the MCP server (memory storage) on a local port with --meetings stored meetings and
+replays --requests get_context calls spread over --topics recurring topics. Every
+--write-every requests a new meeting is stored, which changes the store version and makes
+the next request for every topic a full one again. "uncached" drops the cache before each
+call, which is what get_context did before: a full /context answer every time.
+
+    python benchmarks/bench_context_cache.py --meetings 50000 --requests 2000 --write-every 200
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['MCP_STORAGE_BACKEND'] = 'memory'
+os.environ.setdefault('MCP_API_KEY', 'bench_key')
+
+import requests  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+import meeting_automation  # noqa: E402
+import mcp_server  # noqa: E402
+from context_cache import ContextCache  # noqa: E402
+from meeting_automation import MeetingAutomation  # noqa: E402
+
+TOPICS = ['sprint planning', 'budget review', 'design sync', 'hiring panel', 'roadmap', 'incident review',
+          'customer escalation', 'quarterly goals', 'vendor contract', 'release readiness']
+
+
+def make_meeting(i, rng):
+    return {
+        'subject': f"{rng.choice(TOPICS)} {i % 50}", 'start_time': '2024-05-01T10:00:00',
+        'end_time': '2024-05-01T11:00:00', 'participants': [f"person{rng.randrange(300)}@example.com" for _ in range(3)],
+        'content': "1. Objectives and open items\n2. Discussion of blockers and decisions\n3. Action items and owners",
+        'timezone': 'UTC', 'created_at': '2024-05-01T00:00:00',
+    }
+
+
+def build():
+    automation = MeetingAutomation.__new__(MeetingAutomation)
+    automation.mcp_headers = {'Authorization': f"Bearer {mcp_server.API_KEY}", 'Content-Type': 'application/json'}
+    automation.context_cache = ContextCache()
+    return automation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--topics', type=int, default=40)
+    parser.add_argument('--write-every', type=int, default=200)
+    args = parser.parse_args()
+
+    mcp_server.start_services()
+    rng = random.Random(3)
+    for i in range(args.meetings):
+        mcp_server.store_meeting(make_meeting(i, rng))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, mcp_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    meeting_automation.MCP_API_URL = f"http://127.0.0.1:{server.server_port}"
+
+    calls = [(f"{rng.choice(TOPICS)} {rng.randrange(args.topics)}", [f"person{rng.randrange(300)}@example.com"])
+             for _ in range(args.topics)]
+    workload = [calls[rng.randrange(len(calls))] for _ in range(args.requests)]
+
+    # Count response body bytes as the client receives them
+    received = [0]
+    post = requests.post
+
+    def counting_post(*a, **kw):
+        response = post(*a, **kw)
+        received[0] += len(response.content)
+        return response
+
+    meeting_automation.requests.post = counting_post
+    print(f"{'mode':<9} {'mean':>9} {'p99':>9} {'body bytes':>11}  cache")
+    for mode in ('uncached', 'cached'):
+        automation, latencies, received[0] = build(), [], 0
+        for n, (topic, participants) in enumerate(workload, 1):
+            if mode == 'uncached':
+                automation.context_cache.clear()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                automation.get_context(topic, participants)
+            latencies.append(time.perf_counter() - started)
+            if n % args.write_every == 0:
+                mcp_server.store_meeting(make_meeting(n, rng))
+        latencies.sort()
+        stats = automation.context_cache.stats()
+        print(f"{mode:<9} {sum(latencies) / len(latencies) * 1e3:>7.2f}ms {latencies[int(len(latencies) * 0.99)] * 1e3:>7.2f}ms "
+              f"{received[0]:>11}  hits {stats['hits']} misses {stats['misses']} hit rate {stats['hit_rate']}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
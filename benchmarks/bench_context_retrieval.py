@@ -0,0 +1,127 @@
+"""Ranking quality, prompt size and latency of /context retrieval.
+
+A synthetic history is built from topics. Each topic has its own words and a team of
+regular participants. Every meeting also borrows common words ("review", "weekly", ...)
+and sometimes people from other teams. A query asks for one topic with a couple of
+generic words and part of its team. The meetings of that topic are the relevant ones.
+
+"legacy" is the lookup /context used before: the most recent meetings whose subject has
+every word of the topic or that share a participant, returned whole. It walks the history
+from the newest meeting, so its latency is only indicative. "bm25" is ContextRetriever.retrieve.
+precision@k and nDCG@k are measured against the relevant meetings; "results" is how many
+meetings came back (bm25 stops at the token budget). Prompt tokens are what the context
+adds to the agenda prompt.
+
+    python benchmarks/bench_context_retrieval.py --meetings 100000 --queries 500
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_retrieval import ContextRetriever  # noqa: E402
+from conversation_history import estimate_tokens  # noqa: E402
+from mcp_storage import MemoryStorage  # noqa: E402
+
+COMMON = ['review', 'weekly', 'sync', 'update', 'planning', 'status', 'team', 'project', 'check', 'follow']
+FILLER = ('Objectives for the session and open items carried over from last time. '
+          'Walk through blockers, decisions needed and owners for each action item. ')
+
+
+def word(rng):
+    return ''.join(rng.choice('bcdfghjklmnprstvz') + rng.choice('aeiou') for _ in range(rng.randint(2, 4)))
+
+
+def make_topics(rng, count):
+    return [{'words': [word(rng) for _ in range(6)],
+             'team': [f"{word(rng)}.{t}@example.com" for t in range(6)]} for t in range(count)]
+
+
+def make_meeting(rng, topic, topics):
+    subject = ' '.join(rng.sample(topic['words'], 2) + rng.sample(COMMON, 2))
+    participants = rng.sample(topic['team'], 3) + [rng.choice(rng.choice(topics)['team'])]
+    content = FILLER * 2 + ' '.join(rng.choices(topic['words'] + COMMON, k=20))
+    return {'subject': subject, 'start_time': '2024-05-01T10:00:00', 'end_time': '2024-05-01T11:00:00',
+            'participants': participants, 'content': content, 'timezone': 'UTC'}
+
+
+def legacy(meetings, topic, people, k):
+    words, people = set(re.findall(r'\w+', topic.lower())), set(people)
+    found = []
+    for meeting in reversed(meetings):
+        if len(found) == k:
+            break
+        if words <= meeting['words'] or people & meeting['people']:
+            found.append(meeting['meeting'])
+    return found[::-1]
+
+
+def ndcg(results, relevant, k):
+    gains = sum(1 / math.log2(rank + 2) for rank, item in enumerate(results[:k]) if item['id'] in relevant)
+    ideal = sum(1 / math.log2(rank + 2) for rank in range(min(k, len(relevant))))
+    return gains / ideal if ideal else 0.0
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=100000)
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    topics = make_topics(rng, args.topics)
+    storage, retriever = MemoryStorage(), ContextRetriever()
+    relevant, history = [set() for _ in topics], []
+    started = time.perf_counter()
+    for _ in range(args.meetings):
+        t = rng.randrange(len(topics))
+        meeting = storage.add_meeting(make_meeting(rng, topics[t], topics))
+        relevant[t].add(meeting['id'])
+        history.append({'meeting': meeting, 'words': set(re.findall(r'\w+', meeting['subject'].lower())),
+                        'people': set(meeting['participants'])})
+    stored = time.perf_counter() - started
+    started = time.perf_counter()
+    retriever.sync(storage)
+    print(f"{args.meetings} meetings stored in {stored:.1f}s, BM25 index built in {time.perf_counter() - started:.1f}s")
+
+    queries = []
+    for _ in range(args.queries):
+        t = rng.randrange(len(topics))
+        topic = ' '.join(rng.sample(topics[t]['words'], 2) + rng.sample(COMMON, 2))
+        queries.append((topic, rng.sample(topics[t]['team'], 2), relevant[t]))
+
+    methods = [
+        ('legacy', lambda topic, people: legacy(history, topic, people, args.k)),
+        ('bm25', lambda topic, people: retriever.retrieve(topic, people, args.k)),
+    ]
+    print(f"{'method':<8} {'results':>7} {'P@k':>6} {'nDCG@k':>7} {'tokens':>7} {'p50':>9} {'p99':>9}")
+    for label, retrieve in methods:
+        returned, precision, gain, tokens, latencies = 0, 0.0, 0.0, 0, []
+        for topic, people, wanted in queries:
+            started = time.perf_counter()
+            results = retrieve(topic, people)
+            latencies.append(time.perf_counter() - started)
+            returned += len(results)
+            precision += sum(item['id'] in wanted for item in results) / args.k
+            gain += ndcg(results, wanted, args.k)
+            tokens += estimate_tokens(json.dumps(results))
+        count = len(queries)
+        print(f"{label:<8} {returned / count:>7.1f} {precision / count:>6.2f} {gain / count:>7.2f} {tokens / count:>7.0f} "
+              f"{percentile(latencies, 0.5) * 1e3:>7.2f}ms {percentile(latencies, 0.99) * 1e3:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Render-and-serialize cost of confirmation emails: f-string + MIME tree vs. the template engine.
+
+    python benchmarks/bench_email_templates.py --count 10000
+"""
+import argparse
+import os
+import sys
+import time
+from email import message_from_string
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_templates import EmailTemplateEngine  # noqa: E402
+
+PARTICIPANTS = ['participant1@example.com', 'participant2@example.com']
+
+
+def make_meeting(i):
+    return {
+        'subject': f'Project Planning <{i}>',
+        'start_time': '2026-10-19T14:00:00',
+        'end_time': '2026-10-19T15:00:00',
+        'meet_link': f'https://meet.google.com/abc-defg-{i:04d}',
+        'calendar_link': f'https://calendar.google.com/event?eid={i}',
+        'content': '1. Objectives\n2. Discussion & next steps\n3. Action items\n' * 5
+    }
+
+
+def legacy(meeting):
+    """The pre-engine code path: f-string HTML and a fresh MIME tree per message"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f"Meeting Confirmation: {meeting['subject']}"
+    msg['From'] = 'bench@example.com'
+    msg['To'] = ', '.join(PARTICIPANTS)
+    html = f"""
+    <html>
+        <body>
+            <h2>Meeting Confirmation</h2>
+            <p>Your meeting has been scheduled:</p>
+            <ul>
+                <li>Subject: {meeting['subject']}</li>
+                <li>Start Time: {meeting['start_time']}</li>
+                <li>End Time: {meeting['end_time']}</li>
+                <li>Google Meet Link: <a href="{meeting['meet_link']}">{meeting['meet_link']}</a></li>
+                <li>Calendar Event: <a href="{meeting['calendar_link']}">View in Calendar</a></li>
+            </ul>
+            <h3>Agenda:</h3>
+            <p>{meeting['content']}</p>
+        </body>
+    </html>
+    """
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_string()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000)
+    args = parser.parse_args()
+
+    meetings = [make_meeting(i) for i in range(args.count)]
+    engine = EmailTemplateEngine()
+
+    start = time.perf_counter()
+    for meeting in meetings:
+        legacy(meeting)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for meeting in meetings:
+        engine.render('meeting_confirmation', meeting=meeting).as_string('bench@example.com', PARTICIPANTS)
+    engine_time = time.perf_counter() - start
+
+    # Sanity check: the pre-encoded output is a well-formed multipart/alternative message
+    parsed = message_from_string(engine.render('meeting_confirmation', meeting=meetings[0])
+                                 .as_string('bench@example.com', PARTICIPANTS))
+    kinds = [part.get_content_type() for part in parsed.walk()]
+    assert kinds == ['multipart/alternative', 'text/plain', 'text/html'], kinds
+    assert '&lt;0&gt;' in parsed.get_payload()[1].get_payload(decode=True).decode()
+
+    print(f"legacy f-string + MIME     {args.count} msgs  {legacy_time:7.3f}s  {args.count / legacy_time:9.0f} msg/s")
+    print(f"template engine (escaped)  {args.count} msgs  {engine_time:7.3f}s  {args.count / engine_time:9.0f} msg/s")
+
+
+if __name__ == '__main__':
+    main()
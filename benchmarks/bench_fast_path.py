@@ -0,0 +1,60 @@
+"""Fast-path hit rate and latency of the rule-based intent parser on real phrasings.
+
+Messages the rules cannot handle with enough confidence fall back to the LLM;
+the report estimates the time saved using a typical mistral latency.
+
+    python benchmarks/bench_fast_path.py --llm-latency 3.0
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import FAST_PATH_MIN_CONFIDENCE  # noqa: E402
+from llm_service import LLMService  # noqa: E402
+
+PHRASINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'intent_phrasings.txt')
+
+
+def load_phrasings():
+    with open(PHRASINGS_PATH) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--llm-latency', type=float, default=3.0, help='seconds per Ollama intent call')
+    parser.add_argument('--rounds', type=int, default=200, help='timing rounds over the corpus')
+    parser.add_argument('--verbose', action='store_true', help='show each phrasing and its outcome')
+    args = parser.parse_args()
+
+    phrasings = load_phrasings()
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = LLMService()
+        outcomes = [service.fast_path_intent(message) for message in phrasings]
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for message in phrasings:
+                service.fast_path_intent(message)
+        per_call = (time.perf_counter() - start) / (args.rounds * len(phrasings))
+
+    hits = sum(1 for result, confidence in outcomes if result and confidence >= FAST_PATH_MIN_CONFIDENCE)
+    if args.verbose:
+        for message, (result, confidence) in zip(phrasings, outcomes):
+            route = 'fast' if result and confidence >= FAST_PATH_MIN_CONFIDENCE else 'LLM '
+            print(f"  [{route}] {confidence:.1f}  {message}")
+    print(f"phrasings:           {len(phrasings)}")
+    print(f"fast-path hits:      {hits} ({hits / len(phrasings):.0%})")
+    print(f"fast-path latency:   {per_call * 1e6:.1f} us per message")
+    print(f"LLM latency assumed: {args.llm_latency:.1f} s per message")
+    before = len(phrasings) * args.llm_latency
+    after = (len(phrasings) - hits) * args.llm_latency + len(phrasings) * per_call
+    print(f"mean intent latency: {before / len(phrasings):.2f}s -> {after / len(phrasings):.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Intent prompt size and latency against conversation length, with and without the history budget.
+
+Every turn goes to the (fake) LLM; its latency grows with the prompt length like Ollama's
+prefill. "unbounded" reproduces the old behaviour of pasting the whole history into the prompt;
+"bounded" is LLMService's own history, whose rolling-summary updates are timed with the turn
+they happen on.
+
+    python benchmarks/bench_history.py --turns 200 --every 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_replay import NEW_CONTEXT, FakeOllamaClient  # noqa: E402
+from conversation_history import ConversationHistory, estimate_tokens  # noqa: E402
+from intent_cache import IntentCache  # noqa: E402
+from llm_service import LLMService  # noqa: E402
+
+FILLER = [
+    "hmm, I am not sure who else should be in the loop on the budget discussion",
+    "actually let me think about whether finance needs to see the draft first",
+    "ok so the quarterly numbers looked better than expected, worth mentioning",
+    "we also talked about moving the offsite to the second week of the month",
+]
+
+
+class RecordingClient(FakeOllamaClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.last_prompt_tokens = 0
+        self.summaries = 0
+
+    def generate(self, model=None, prompt='', stream=False, **kwargs):
+        if prompt.endswith('Updated summary:'):
+            self.summaries += 1
+            time.sleep(self.prefill_per_char * len(prompt))
+            new_messages = prompt.rsplit('New messages:', 1)[-1].rsplit('Updated summary:', 1)[0]
+            return {'response': f"The user is still working out an email; last said {new_messages.split()[-1]}", 'done': True}
+        self.last_prompt_tokens = estimate_tokens(prompt)
+        return super().generate(model=model, prompt=prompt, stream=stream, **kwargs)
+
+
+def run(history, turns, every, prefill_per_char):
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = LLMService(intent_cache=IntentCache(ttl=0), history=history)
+    client = service.ollama_client = RecordingClient(prefill_per_char=prefill_per_char)
+    context = json.loads(json.dumps(NEW_CONTEXT))
+    samples = {}
+    for turn in range(1, turns + 1):
+        message = f"{FILLER[turn % len(FILLER)]} ({turn})"
+        context['conversation_history'].append({'role': 'user', 'content': message})
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.understand_intent(message, context)
+        elapsed = time.perf_counter() - started
+        context['conversation_history'].append({'role': 'assistant', 'content': "Could you tell me who should receive this?"})
+        if turn % every == 0 or turn == 1:
+            samples[turn] = (client.last_prompt_tokens, elapsed)
+    return samples, client.summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--every', type=int, default=20, help='print every N-th turn')
+    parser.add_argument('--prefill-per-char', type=float, default=2e-6, help='simulated prefill seconds per prompt character')
+    args = parser.parse_args()
+
+    unbounded = ConversationHistory(context_window=10 ** 9, max_messages=10 ** 9)
+    before, _ = run(unbounded, args.turns, args.every, args.prefill_per_char)
+    after, summaries = run(None, args.turns, args.every, args.prefill_per_char)
+
+    scale = max(tokens for tokens, _ in before.values()) / 40
+    print(f"{'turn':>5} {'tokens before':>14} {'tokens after':>13} {'ms before':>10} {'ms after':>9}")
+    for turn in before:
+        tokens_before, ms_before = before[turn][0], before[turn][1] * 1000
+        tokens_after, ms_after = after[turn][0], after[turn][1] * 1000
+        print(f"{turn:>5} {tokens_before:>14} {tokens_after:>13} {ms_before:>10.2f} {ms_after:>9.2f}  "
+              f"{'#' * int(tokens_before / scale):<40} | {'#' * int(tokens_after / scale)}")
+    print(f"rolling summary updated {summaries} times in {args.turns} turns")
+
+
+if __name__ == '__main__':
+    main()
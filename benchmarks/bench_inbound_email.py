@@ -0,0 +1,88 @@
+"""Inbound email throughput: one /process_email request per message vs. /process_email/batch.
+
+Messages are a mix of plain text and multipart/alternative meeting requests, plus some
+with no meeting details. Requests go through Flask's test client, so the numbers cover
+parsing, extraction and storing the pending requests but not the network. The SQLite
+backend is used because that is where fanning out pays off: concurrent add_pending calls
+share the group commits.
+
+    python benchmarks/bench_inbound_email.py --messages 5000 --backend sqlite
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TIMES = ['tomorrow at 3pm', 'Monday at 10:30', 'next Friday at 9am', 'today at 16:00']
+DURATIONS = ['30 minutes', '1 hour', '45 min', '2 hours']
+
+
+def make_message(i, rng):
+    message = EmailMessage()
+    message['From'] = f"sender{i}@example.com"
+    message['Subject'] = f"Meeting request {i}"
+    if i % 10 == 9:
+        body = "Thanks for the update, nothing to schedule here.\n"
+    else:
+        people = ', '.join(f"person{rng.randrange(500)}@example.com" for _ in range(rng.randint(1, 4)))
+        body = (f"Hi all,\n\nCan we meet {rng.choice(TIMES)} for {rng.choice(DURATIONS)} to go over the "
+                f"plan?\nParticipants: {people}\n\nThanks\n" + "Previous discussion notes. " * 20)
+    message.set_content(body)
+    if i % 2:
+        message.add_alternative(f"<html><body><p>{body}</p></body></html>", subtype='html')
+    return message.as_string()
+
+
+def to_mbox(messages):
+    lines = []
+    for raw in messages:
+        lines.append("From sender@example.com Mon Jan  1 00:00:00 2024\n")
+        for line in raw.splitlines(keepends=True):
+            lines.append('>' + line if line.lstrip('>').startswith('From ') else line)
+        lines.append("\n")
+    return ''.join(lines).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='sqlite')
+    args = parser.parse_args()
+
+    os.environ['MCP_STORAGE_BACKEND'] = args.backend
+    os.environ['MCP_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'inbound.db')
+    import mcp_server
+
+    rng = random.Random(5)
+    messages = [make_message(i, rng) for i in range(args.messages)]
+    client = mcp_server.app.test_client()
+    headers = {'Authorization': f"Bearer {mcp_server.API_KEY}"}
+
+    def single():
+        return sum(client.post('/process_email', json={'email_content': raw}, headers=headers).status_code == 200
+                   for raw in messages)
+
+    def batch_json():
+        return client.post('/process_email/batch', json={'messages': messages},
+                           headers=headers).json['pending_confirmation']
+
+    def batch_mbox():
+        return client.post('/process_email/batch', data=to_mbox(messages),
+                           headers=dict(headers, **{'Content-Type': 'application/mbox'})).json['pending_confirmation']
+
+    print(f"{'mode':<14} {'seconds':>8} {'emails/min':>11} {'meetings':>9}")
+    for label, run in (('single', single), ('batch json', batch_json), ('batch mbox', batch_mbox)):
+        started = time.perf_counter()
+        pending = run()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<14} {elapsed:>8.2f} {args.messages / elapsed * 60:>11.0f} {pending:>9}")
+    mcp_server.storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""How much Ollama traffic the intent cache avoids when replaying the recorded chat corpus.
+
+    python benchmarks/bench_intent_cache.py --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_replay import FakeOllamaClient, load_corpus, replay  # noqa: E402
+from intent_cache import IntentCache  # noqa: E402
+from llm_service import LLMService  # noqa: E402
+
+
+def run(sessions, latency, cache):
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = LLMService(intent_cache=cache)
+        service.ollama_client = FakeOllamaClient(latency=latency)
+        start = time.perf_counter()
+        turns = replay(service, sessions)
+        elapsed = time.perf_counter() - start
+    return turns, service.ollama_client.calls, elapsed, service.intent_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated seconds per Ollama call')
+    parser.add_argument('--repeat', type=int, default=3, help='times to replay the corpus')
+    args = parser.parse_args()
+
+    sessions = load_corpus() * args.repeat
+    turns, baseline_calls, baseline_time, _ = run(sessions, args.latency, IntentCache(ttl=0))
+    _, cached_calls, cached_time, stats = run(sessions, args.latency, IntentCache())
+
+    print(f"turns replayed:        {turns}")
+    print(f"Ollama calls, no cache: {baseline_calls}  ({baseline_time:.2f}s)")
+    print(f"Ollama calls, cached:   {cached_calls}  ({cached_time:.2f}s)")
+    print(f"calls avoided:          {baseline_calls - cached_calls} ({1 - cached_calls / baseline_calls:.0%})")
+    print(f"cache stats:            {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Prefill time and end-to-end latency per intent turn: legacy prompt vs. JSON mode with a static system prefix.
+
+Replays the chat corpus against the local Ollama stub, which charges prefill time only for
+prompt characters past the prefix it saw on the previous request, like Ollama's KV cache.
+
+    python benchmarks/bench_intent_prompt.py --prefill-per-char 0.00005
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_replay import FakeOllamaClient, load_corpus, replay  # noqa: E402
+from intent_cache import IntentCache  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+from llm_service import LLMService  # noqa: E402
+from ollama_stub import OllamaStub  # noqa: E402
+
+
+class RecordingGateway(LLMGateway):
+    """Keeps prefill and wall time of every call"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.samples = []
+
+    def generate(self, model=None, prompt='', stream=False, **kwargs):
+        started = time.perf_counter()
+        response = super().generate(model=model, prompt=prompt, stream=stream, **kwargs)
+        self.samples.append((response['prompt_eval_duration'] / 1e9, time.perf_counter() - started))
+        return response
+
+
+def run(stub, sessions, json_mode):
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = LLMService(gateway=RecordingGateway(host=stub.url), intent_cache=IntentCache(ttl=0))
+        service.json_mode = json_mode
+        stub.last_prompt = ''
+        replay(service, sessions)
+    return service.ollama_client.samples
+
+
+def report(label, samples):
+    prefill = [p * 1000 for p, _ in samples]
+    total = [t * 1000 for _, t in samples]
+    print(f"{label:<22} {len(samples):>6} {statistics.mean(prefill):>12.1f} {statistics.median(prefill):>12.1f} "
+          f"{statistics.mean(total):>10.1f} {statistics.median(total):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prefill-per-char', type=float, default=0.00005, help='simulated prefill seconds per uncached prompt character')
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated decode seconds per call')
+    args = parser.parse_args()
+
+    answer = FakeOllamaClient()._answer
+    sessions = load_corpus()
+    with OllamaStub(latency=args.latency, prefill_per_char=args.prefill_per_char,
+                    respond=lambda request: answer(request['prompt'])) as stub:
+        legacy = run(stub, sessions, json_mode=False)
+        json_mode = run(stub, sessions, json_mode=True)
+
+    print(f"{'mode':<22} {'calls':>6} {'prefill mean':>12} {'prefill p50':>12} {'e2e mean':>10} {'e2e p50':>10}  (ms)")
+    report('legacy prompt', legacy)
+    report('JSON mode + prefix', json_mode)
+
+
+if __name__ == '__main__':
+    main()
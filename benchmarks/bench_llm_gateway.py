@@ -0,0 +1,57 @@
+"""Per-call overhead of a fresh LLMService/ollama.Client per joke vs. the shared LLM gateway.
+
+Runs against a local Ollama stub so only client construction, connection
+setup and HTTP overhead are measured.
+
+    python benchmarks/bench_llm_gateway.py --calls 300 --threads 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_gateway import LLMGateway  # noqa: E402
+from llm_service import LLMService  # noqa: E402
+from ollama_stub import OllamaStub  # noqa: E402
+
+
+def run(label, call, calls, threads):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: call(), range(calls)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / calls * 1000:8.2f} ms/call  ({calls / elapsed:7.0f} calls/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    with OllamaStub() as stub:
+        def per_call_client():
+            # What EmailService/MeetingAutomation did for every joke
+            service = LLMService(gateway=LLMGateway(host=stub.url))
+            service.generate_joke('computers')
+
+        run('new LLMService per call', per_call_client, args.calls, args.threads)
+        per_call_connections = len(stub.connections)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            shared = LLMService(gateway=LLMGateway(host=stub.url, max_concurrency=args.threads))
+        stub.connections.clear()
+        run('shared gateway', lambda: shared.generate_joke('computers'), args.calls, args.threads)
+
+        print(f"\nTCP connections opened: per-call={per_call_connections} shared={len(stub.connections)}")
+        print(f"gateway stats: {shared.ollama_client.stats}")
+
+
+if __name__ == '__main__':
+    main()
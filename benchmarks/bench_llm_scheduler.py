@@ -0,0 +1,62 @@
+"""Chat intent latency while agenda requests pile up, with and without the priority scheduler.
+
+The Ollama stub processes --parallel requests at a time in arrival order, like a single
+Ollama server. "unscheduled" lets every call through to it; "scheduled" admits
+--concurrency calls and serves waiting intents before agendas.
+
+    python benchmarks/bench_llm_scheduler.py --agendas 20 --intents 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_gateway import LLMGateway  # noqa: E402
+from llm_scheduler import AGENDA, INTENT  # noqa: E402
+from ollama_stub import OllamaStub  # noqa: E402
+
+
+def run(stub, concurrency, agendas, intents):
+    gateway = LLMGateway(host=stub.url, max_concurrency=concurrency)
+    started = time.perf_counter()
+    workers = [threading.Thread(target=gateway.generate, kwargs={'prompt': 'Generate a meeting agenda', 'task': AGENDA})
+               for _ in range(agendas)]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.05)
+
+    latencies = []
+    for _ in range(intents):
+        sent = time.perf_counter()
+        gateway.generate(prompt='User message: schedule a meeting tomorrow at 2pm', task=INTENT)
+        latencies.append((time.perf_counter() - sent) * 1000)
+    for worker in workers:
+        worker.join()
+    total = time.perf_counter() - started
+    return latencies, total, gateway.scheduler.stats()['max_queue_depth']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agendas', type=int, default=20)
+    parser.add_argument('--intents', type=int, default=5)
+    parser.add_argument('--parallel', type=int, default=2, help='requests the stub processes at once')
+    parser.add_argument('--concurrency', type=int, default=2, help='scheduler concurrency limit')
+    parser.add_argument('--agenda-latency', type=float, default=0.2)
+    parser.add_argument('--intent-latency', type=float, default=0.03)
+    args = parser.parse_args()
+
+    latency = lambda request: args.agenda_latency if 'agenda' in request['prompt'] else args.intent_latency
+    print(f"{'mode':<12} {'intent p50':>10} {'intent max':>10} {'all done':>9} {'max queue':>9}")
+    for label, concurrency in (('unscheduled', 10 ** 6), ('scheduled', args.concurrency)):
+        with OllamaStub(latency=latency, parallel=args.parallel) as stub:
+            latencies, total, depth = run(stub, concurrency, args.agendas, args.intents)
+        print(f"{label:<12} {statistics.median(latencies):>8.0f}ms {max(latencies):>8.0f}ms {total:>8.2f}s {depth:>9}")
+
+
+if __name__ == '__main__':
+    main()
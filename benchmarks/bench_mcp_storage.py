@@ -0,0 +1,83 @@
+"""Read/write throughput of the MCP storage backends.
+
+Writes are add_meeting calls from --threads concurrent clients (the Flask server handles
+requests on threads). "sqlite, batch 1" commits every write on its own, to show what the
+group-commit writer saves. Reads are random get_meeting calls and first pages of a
+participant's meetings (GET /meetings?participant=...) against the stored meetings.
+
+    python benchmarks/bench_mcp_storage.py --meetings 20000 --threads 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_storage import MemoryStorage, SQLiteStorage  # noqa: E402
+from meeting_query import parse_query  # noqa: E402
+
+TOPICS = ['sprint planning', 'budget review', 'design sync', 'hiring panel', 'roadmap', 'incident review']
+
+
+def make_meeting(i, rng):
+    return {
+        'subject': f"{rng.choice(TOPICS)} {i % 100}",
+        'start_time': f"2024-05-{1 + i % 28:02d}T{9 + i % 8:02d}:00:00",
+        'end_time': f"2024-05-{1 + i % 28:02d}T{10 + i % 8:02d}:00:00",
+        'participants': [f"person{rng.randrange(2000)}@example.com" for _ in range(3)],
+        'content': "1. Objectives\n2. Discussion\n3. Action items",
+        'timezone': 'UTC',
+        'created_at': '2024-05-01T00:00:00',
+    }
+
+
+def run_threads(threads, count, work):
+    per_thread = count // threads
+
+    def worker(offset):
+        for i in range(offset, offset + per_thread):
+            work(i)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=20000)
+    parser.add_argument('--reads', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    backends = [
+        ('memory', lambda: MemoryStorage()),
+        ('sqlite, batch 1', lambda: SQLiteStorage(os.path.join(directory, 'single.db'), batch_size=1)),
+        ('sqlite', lambda: SQLiteStorage(os.path.join(directory, 'batched.db'))),
+    ]
+    print(f"{'backend':<16} {'writes/s':>10} {'get/s':>10} {'pages/s':>10}  commits")
+    for label, factory in backends:
+        storage = factory()
+        rng = random.Random(1)
+        meetings = [make_meeting(i, rng) for i in range(args.meetings)]
+        writes = run_threads(args.threads, args.meetings, lambda i: storage.add_meeting(meetings[i]))
+        stored = storage.meeting_count()
+        gets = run_threads(args.threads, args.reads, lambda i: storage.get_meeting(1 + (i * 7919) % stored))
+        pages = run_threads(args.threads, args.reads // 10, lambda i: storage.query_meetings(
+            parse_query({'participant': f"person{i % 2000}@example.com", 'limit': 10})))
+        commits = storage.stats['transactions'] if hasattr(storage, 'stats') else '-'
+        print(f"{label:<16} {writes:>10.0f} {gets:>10.0f} {pages:>10.0f}  {commits}")
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""/context and participant lookups over a large MCP meeting history.
+
+"scan" is the loop get_context ran before the indexes, applied to the whole history
+(history_length = number of stored meetings). "participant" is the first page of
+GET /meetings?participant=..., answered by MeetingIndex postings in MemoryStorage, and
+checked against a scan of the same history. "bm25" is ContextRetriever.retrieve, which
+replaced the subject-word lookup. Subjects come from a small vocabulary, and participants
+from a pool of --people addresses.
+
+    python benchmarks/bench_meeting_index.py --meetings 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_retrieval import ContextRetriever  # noqa: E402
+from mcp_storage import MemoryStorage  # noqa: E402
+from meeting_query import parse_query  # noqa: E402
+
+TOPICS = ['sprint planning', 'budget review', 'design sync', 'hiring panel', 'quarterly roadmap', 'incident review',
+          'customer call', 'one on one', 'retro', 'launch readiness', 'security audit', 'vendor negotiation']
+QUALIFIERS = ['', 'weekly', 'monthly', 'q1', 'q2', 'q3', 'q4', 'team', 'platform', 'mobile', 'data', 'infra']
+
+
+def make_meeting(i, addresses, rng):
+    subject = f"{rng.choice(QUALIFIERS)} {rng.choice(TOPICS)} {i % 1000}".strip()
+    return {'subject': subject, 'participants': rng.sample(addresses, 3), 'content': f"Agenda for {subject}"}
+
+
+def scan(meetings, topic, participants, history_length):
+    relevant_context = []
+    for meeting in meetings[-history_length:]:
+        if topic.lower() in meeting['subject'].lower() or any(p in meeting['participants'] for p in participants):
+            relevant_context.append(meeting)
+    return relevant_context[-10:]
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def timed(queries, run):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        run(*query)
+        latencies.append(time.perf_counter() - started)
+    return percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=1000000)
+    parser.add_argument('--people', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scan-queries', type=int, default=5, help='the scan is slow; time fewer queries')
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    addresses = [f'person{i}@example.com' for i in range(args.people)]
+    storage = MemoryStorage()
+    started = time.perf_counter()
+    for i in range(args.meetings):
+        storage.add_meeting(make_meeting(i, addresses, rng))
+    stored = time.perf_counter() - started
+    retriever = ContextRetriever()
+    started = time.perf_counter()
+    retriever.sync(storage)
+    indexed = time.perf_counter() - started
+    print(f"{args.meetings} meetings: stored with participant index in {stored:.1f}s "
+          f"({stored / args.meetings * 1e6:.1f} us per insert), BM25 index built in {indexed:.1f}s")
+
+    queries = [(f"{rng.choice(QUALIFIERS[1:])} {rng.choice(TOPICS)}", rng.sample(addresses, 2)) for _ in range(args.queries)]
+    queries += [(f"unheard of {i}", rng.sample(addresses, 1)) for i in range(args.queries // 4)]
+    meetings = storage.list_meetings()
+
+    def participant_page(participant):
+        return storage.query_meetings(parse_query({'participant': participant, 'limit': 10}))[0]
+
+    agree = sum([m['id'] for m in participant_page(people[0])] ==
+                [m['id'] for m in meetings if people[0] in m['participants']][:10]
+                for _, people in queries[:args.scan_queries])
+
+    print(f"{'lookup':<12} {'p50':>10} {'p99':>10}")
+    rows = [
+        ('scan', timed(queries[:args.scan_queries], lambda topic, people: scan(meetings, topic, people, len(meetings)))),
+        ('participant', timed(queries, lambda topic, people: participant_page(people[0]))),
+        ('bm25', timed(queries, lambda topic, people: retriever.retrieve(topic, people, 10))),
+    ]
+    for label, (p50, p99) in rows:
+        print(f"{label:<12} {p50 * 1e3:>8.2f}ms {p99 * 1e3:>8.2f}ms")
+    print(f"participant pages equal to a scan on {agree}/{args.scan_queries} queries")
+    print(f"participant index: {storage._index.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""GET /meetings response time and peak RSS against history size (SQLite storage).
+
+"full list" is what the endpoint did before: load every meeting and serialize it as one
+JSON document. "first page" is a default-size page, and "ndjson export" streams every
+meeting, chunk by chunk, into a byte counter. Each measurement runs in a fresh process
+so that peak RSS (ru_maxrss) belongs to that measurement alone.
+
+    python benchmarks/bench_meetings_endpoint.py --sizes 10000 50000 200000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_storage import SQLiteStorage  # noqa: E402
+from meeting_query import iter_ndjson, page_response, parse_query  # noqa: E402
+
+MODES = ('full list', 'first page', 'ndjson export')
+
+
+def populate(path, count):
+    storage = SQLiteStorage(path)
+    content = "1. Objectives\n2. Discussion of the open items from last week\n3. Action items and owners\n" * 3
+    for i in range(count):
+        storage.add_meeting({
+            'subject': f"Planning session {i}", 'start_time': f"2024-{1 + i % 12:02d}-10T10:00:00",
+            'end_time': f"2024-{1 + i % 12:02d}-10T11:00:00", 'participants': [f"p{i % 500}@example.com", "lead@example.com"],
+            'content': content, 'timezone': 'UTC', 'created_at': '2024-01-01T00:00:00',
+        })
+    storage.close()
+
+
+def measure(path, mode):
+    """Runs in the child process; prints seconds, response bytes and peak RSS in MB as JSON"""
+    storage = SQLiteStorage(path)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if mode == 'full list':
+        size = len(json.dumps(storage.list_meetings()))
+    elif mode == 'first page':
+        query = parse_query({})
+        page, next_id = storage.query_meetings(query)
+        size = len(json.dumps(page_response(page, next_id, query['fields'])))
+    else:
+        size = sum(len(chunk) for chunk in iter_ndjson(storage.query_meetings, parse_query({})))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    storage.close()
+    print(json.dumps({'seconds': elapsed, 'bytes': size, 'peak_mb': peak / 1024, 'growth_mb': (peak - before) / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 200000])
+    parser.add_argument('--measure', nargs=2, metavar=('DB', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    directory = tempfile.mkdtemp()
+    print(f"{'meetings':>9} {'mode':<14} {'time':>9} {'response':>10} {'RSS growth':>11}")
+    for count in args.sizes:
+        path = os.path.join(directory, f"meetings_{count}.db")
+        populate(path, count)
+        for mode in MODES:
+            output = subprocess.run([sys.executable, __file__, '--measure', path, mode],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{count:>9} {mode:<14} {result['seconds'] * 1e3:>7.1f}ms {result['bytes'] / 1e6:>8.1f}MB "
+                  f"{result['growth_mb']:>9.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
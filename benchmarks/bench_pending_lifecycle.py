@@ -0,0 +1,98 @@
+"""Pending meeting requests under sustained traffic, with and without PendingLifecycle.
+
+Requests are added to MemoryStorage as fast as possible for --seconds, each with a --ttl
+second lifetime; --confirm of them are confirmed straight away. "no expiry" is what the
+server did before: unanswered requests stay forever. The table samples the number of
+open requests, heap entries and traced memory while the traffic runs. The last line is
+the cost of track + resolve at --backlog open requests.
+
+    python benchmarks/bench_pending_lifecycle.py --seconds 6 --ttl 1 --confirm 0.5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_storage import MemoryStorage  # noqa: E402
+from pending_lifecycle import PendingLifecycle  # noqa: E402
+
+
+def make_pending(rng):
+    return {'subject': 'Sync', 'proposed_time': 'tomorrow at 2pm', 'duration': 30, 'status': 'pending',
+            'participants': [f"person{rng.randrange(500)}@example.com"], 'content': 'Lets meet ' * 20,
+            'created_at': datetime.now().isoformat()}
+
+
+def run(args, with_lifecycle):
+    rng = random.Random(11)
+    storage = MemoryStorage()
+    lifecycle = PendingLifecycle(storage, ttl=args.ttl, max_pending=args.max_pending).start() if with_lifecycle else None
+    tracemalloc.start()
+    started = last_sample = time.monotonic()
+    added, samples = 0, []
+    while time.monotonic() - started < args.seconds:
+        pending = make_pending(rng)
+        if lifecycle:
+            pending['expires_at'] = lifecycle.expires_at()
+        pending = storage.add_pending(pending)
+        added += 1
+        if lifecycle:
+            lifecycle.track(pending)
+        if rng.random() < args.confirm and storage.take_pending(pending['id']) is not None and lifecycle:
+            lifecycle.resolve(pending['id'], 'confirmed')
+        if time.monotonic() - last_sample >= args.seconds / 6:
+            last_sample = time.monotonic()
+            stats = lifecycle.stats() if lifecycle else {'pending': len(storage.list_pending()), 'scheduled': 0}
+            samples.append((last_sample - started, added, stats['pending'], stats['scheduled'],
+                            tracemalloc.get_traced_memory()[0] / 1e6))
+    tracemalloc.stop()
+    if lifecycle:
+        lifecycle.stop()
+    return samples
+
+
+def per_operation(args):
+    storage = MemoryStorage()
+    lifecycle = PendingLifecycle(storage, ttl=3600, max_pending=args.backlog * 2).start()
+    rng = random.Random(3)
+    for _ in range(args.backlog):
+        pending = make_pending(rng)
+        pending['expires_at'] = lifecycle.expires_at(rng.uniform(600, 3600))
+        lifecycle.track(storage.add_pending(pending))
+    records = []
+    for _ in range(10000):
+        pending = make_pending(rng)
+        pending['expires_at'] = lifecycle.expires_at(rng.uniform(600, 3600))
+        records.append(storage.add_pending(pending))
+    started = time.perf_counter()
+    for pending in records:
+        lifecycle.track(pending)
+        lifecycle.resolve(pending['id'], 'confirmed')
+    elapsed = time.perf_counter() - started
+    lifecycle.stop()
+    return elapsed / len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=6)
+    parser.add_argument('--ttl', type=float, default=1)
+    parser.add_argument('--confirm', type=float, default=0.5)
+    parser.add_argument('--max-pending', type=int, default=100000)
+    parser.add_argument('--backlog', type=int, default=100000)
+    args = parser.parse_args()
+
+    for label, with_lifecycle in (('no expiry', False), ('lifecycle', True)):
+        print(f"{label}: {'elapsed':>8} {'added':>9} {'open':>9} {'heap':>9} {'memory':>9}")
+        for elapsed, added, pending, scheduled, memory in run(args, with_lifecycle):
+            print(f"{'':<{len(label) + 1}} {elapsed:>7.1f}s {added:>9} {pending:>9} {scheduled:>9} {memory:>7.1f}MB")
+    print(f"track + resolve with {args.backlog} open requests: {per_operation(args) * 1e6:.1f}us")
+
+
+if __name__ == '__main__':
+    main()
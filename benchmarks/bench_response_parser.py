@@ -0,0 +1,94 @@
+"""Success rate and throughput of the LLM response parser on the recorded reply corpus.
+
+"legacy" is the regex clean-up _process_llm_response used before llm_response_parser.
+A reply counts as parsed when the extracted intent and every field check in its header
+match; truncated replies check that the cut-off value was dropped rather than returned. Exits non-zero if the current parser misses any record, so it doubles as a
+regression check.
+
+    python benchmarks/bench_response_parser.py --repeat 200
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_response_parser import extract_json_object  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'mistral_responses.txt')
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Return [(name, expected intent or None, {field: exact str}, {field: substring}, reply text)]"""
+    records = []
+    with open(path) as f:
+        text = f.read()
+    for chunk in re.split(r'^### ', text, flags=re.M)[1:]:
+        header, body = chunk.split('\n', 1)
+        name, *checks = [part.strip() for part in header.split('|')]
+        expected = dict(check.split('=', 1) for check in checks if '~=' not in check)
+        contains = dict(check.split('~=', 1) for check in checks if '~=' in check)
+        intent = expected.pop('intent', None)
+        records.append((name, None if intent == 'none' else intent, expected, contains, body.rstrip('\n')))
+    return records
+
+
+def legacy_extract(llm_response):
+    """The pre-parser clean-up chain, kept for comparison"""
+    try:
+        llm_response = llm_response.strip()
+        llm_response = re.sub(r'```json\n|\n```', '', llm_response)
+        llm_response = re.sub(r'//.*$', '', llm_response, flags=re.MULTILINE)
+        json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
+        if not json_match:
+            return None
+        json_str = json_match.group(0).replace('\n', ' ').replace('\r', '')
+        json_str = re.sub(r',\s*}', '}', json_str)
+        json_str = re.sub(r',\s*]', ']', json_str)
+        return json.loads(json_str)
+    except Exception:
+        return None
+
+
+def matches(parsed, intent, exact, contains):
+    if parsed is None:
+        return intent is None
+    if parsed.get('intent') != intent:
+        return False
+    if any(str(parsed.get(field)) != value for field, value in exact.items()):
+        return False
+    return all(needle in str(parsed.get(field)) for field, needle in contains.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help='passes over the corpus for the throughput figure')
+    parser.add_argument('--verbose', action='store_true', help='list every record that fails')
+    args = parser.parse_args()
+
+    records = load_corpus()
+    failures = {}
+    for label, extract in (('legacy', legacy_extract), ('parser', extract_json_object)):
+        failed = [name for name, intent, exact, contains, text in records
+                  if not matches(extract(text), intent, exact, contains)]
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for *_, text in records:
+                extract(text)
+        elapsed = time.perf_counter() - started
+        rate = args.repeat * len(records) / elapsed
+        print(f"{label:<7} parsed {len(records) - len(failed):>3}/{len(records)}  {rate:>9.0f} replies/s")
+        if args.verbose and failed:
+            print(f"        failed: {', '.join(failed)}")
+        failures[label] = failed
+
+    if failures['parser']:
+        print(f"parser regressions: {', '.join(failures['parser'])}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""End-to-end schedule_meeting latency: the old sequential stages vs. the concurrent pipeline.
+
+Every external call is replaced by a sleep of the given length, so the numbers show how
+the stages overlap rather than real service speed.
+
+    python benchmarks/bench_schedule_pipeline.py --agenda 0.8 --calendar 0.4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agenda_cache import AgendaCache  # noqa: E402
+from meeting_automation import MeetingAutomation  # noqa: E402
+
+
+class FakeCalendar:
+    def __init__(self, create, patch):
+        self.create, self.patch = create, patch
+
+    def create_meeting(self, **kwargs):
+        time.sleep(self.create)
+        return {'id': 'evt1', 'meetLink': 'https://meet.google.com/abc', 'htmlLink': 'https://calendar.google.com/evt1'}
+
+    def update_description(self, event_id, description):
+        time.sleep(self.patch)
+
+
+class FakeOllama:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def generate(self, prompt='', stream=False, **kwargs):
+        time.sleep(self.latency)
+        return {'response': "1. Objectives\n2. Discussion\n3. Outcomes\n4. Action items"}
+
+
+def build(args):
+    automation = MeetingAutomation.__new__(MeetingAutomation)
+    automation.meeting_history = []
+    automation.pipeline_executor = ThreadPoolExecutor(max_workers=8)
+    automation.agenda_cache = AgendaCache(path=os.path.join(tempfile.mkdtemp(), 'agenda_cache.json'), ttl=0)
+    automation.calendar_service = FakeCalendar(args.calendar, args.patch)
+    automation.ollama_client = FakeOllama(args.agenda)
+
+    def get_context(topic, participants):
+        time.sleep(args.context)
+        return '[]'
+
+    def record(meeting_data):
+        time.sleep(args.mcp)
+        return dict(meeting_data, id=1)
+
+    def confirm(meeting, participants, queued=False):
+        time.sleep(args.email)
+        return None
+
+    automation.get_context = get_context
+    automation._record_meeting = record
+    automation.send_meeting_confirmation = confirm
+    return automation
+
+
+def sequential(automation):
+    """The stage order schedule_meeting + send_meeting_confirmation used to follow"""
+    content = automation.generate_meeting_content('Planning', ['a@example.com'])
+    event = automation.calendar_service.create_meeting(description=content)
+    meeting = automation._record_meeting({'subject': 'Planning', 'content': content, 'meet_link': event['meetLink']})
+    automation.send_meeting_confirmation(meeting, ['a@example.com'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for stage, default in (('context', 0.1), ('agenda', 0.8), ('calendar', 0.4), ('patch', 0.1), ('mcp', 0.1), ('email', 0.3)):
+        parser.add_argument(f'--{stage}', type=float, default=default, help=f'seconds for the {stage} stage')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    automation = build(args)
+    start = datetime.now() + timedelta(days=1)
+    results = {}
+    for label, run in (('sequential', lambda: sequential(automation)),
+                       ('pipeline', lambda: automation.run_scheduling_pipeline('Planning', start, ['a@example.com'],
+                                                                               confirmation='send'))):
+        best = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                outcome = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = (best, outcome)
+
+    slowest = max(args.context + args.agenda, args.calendar) + max(args.patch, args.mcp, args.email)
+    print(f"sequential: {results['sequential'][0]:.2f}s")
+    print(f"pipeline:   {results['pipeline'][0]:.2f}s  (critical path {slowest:.2f}s)")
+    print(f"stage timings: {results['pipeline'][1]['timings']}")
+
+
+if __name__ == '__main__':
+    main()
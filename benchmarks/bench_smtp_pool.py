@@ -0,0 +1,75 @@
+"""Messages per second with and without the SMTP connection pool.
+
+Runs against a local SMTP sink that adds a configurable delay to the greeting
+and to AUTH, standing in for the TLS handshake and login round-trips of a
+real provider.
+
+    python benchmarks/bench_smtp_pool.py --messages 200 --threads 4
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smtp_pool import SMTPConnectionPool  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+
+def build_message(i):
+    msg = MIMEText(f"Benchmark message {i}", 'plain')
+    msg['From'] = 'bench@example.com'
+    msg['To'] = f'recipient{i}@example.com'
+    msg['Subject'] = f'Benchmark {i}'
+    return msg
+
+
+def send_unpooled(host, port, msg):
+    """What every send path did before: connect, log in, send one message, quit"""
+    with smtplib.SMTP(host, port) as server:
+        server.login('bench@example.com', 'benchpassword123')
+        server.send_message(msg)
+
+
+def run(label, send, messages, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, range(messages)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {messages:>6} msgs  {elapsed:8.3f}s  {messages / elapsed:10.1f} msg/s")
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--connect-delay', type=float, default=0.02, help='seconds added to each greeting')
+    parser.add_argument('--auth-delay', type=float, default=0.02, help='seconds added to each AUTH')
+    args = parser.parse_args()
+
+    with SMTPSink(connect_delay=args.connect_delay, auth_delay=args.auth_delay) as sink:
+        host, port = sink.address
+        messages = [build_message(i) for i in range(args.messages)]
+
+        unpooled = run('unpooled', lambda i: send_unpooled(host, port, messages[i]), args.messages, args.threads)
+        unpooled_connections = sink.connections
+
+        pool = SMTPConnectionPool(server=host, port=port, email='bench@example.com', password='benchpassword123',
+                                  use_ssl=False, use_tls=False, max_size=args.pool_size)
+        pooled = run('pooled', lambda i: pool.send_message(messages[i]), args.messages, args.threads)
+        pool.close()
+
+        print(f"\nconnections opened: unpooled={unpooled_connections} "
+              f"pooled={sink.connections - unpooled_connections}")
+        print(f"pool stats: {pool.stats}")
+        print(f"speedup: {pooled / unpooled:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Throughput of temporal_parser.
+
+Phrases are resolved against a fixed reference (Wednesday 2024-05-15 10:00). "legacy" is
+the strptime cascade LLMService.parse_time used before, timed on the phrases it could
+read. Throughput is measured cold (memo cleared before each pass) and warm. The phrase
+tables that check the results are in tests/test_temporal_parser.py.
+
+    python benchmarks/bench_temporal_parser.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import temporal_parser  # noqa: E402
+
+REFERENCE = datetime(2024, 5, 15, 10, 0)  # a Wednesday
+
+THROUGHPUT_TEXTS = ['2:00 PM tomorrow', '10:00 AM today', '9:30 AM tomorrow', '3:00 PM tomorrow',
+                    '10:00 AM this Friday', 'next monday 9am', '2-3pm tomorrow', 'from 10am to 11:30am']
+
+
+def legacy_parse_time(time_str, now):
+    """The pre-parser strptime cascade, kept for comparison (prints removed)"""
+    current_date = now
+    if 'tomorrow' in time_str.lower():
+        current_date += timedelta(days=1)
+        time_parts = time_str.lower().replace('tomorrow', '').strip()
+    elif 'today' in time_str.lower():
+        time_parts = time_str.lower().replace('today', '').strip()
+    else:
+        time_parts = time_str
+    time_parts = time_parts.upper().strip()
+    if 'AM' in time_parts or 'PM' in time_parts:
+        for fmt in ('%I:%M %p', '%I %p', '%I%M %p'):
+            try:
+                return datetime.combine(current_date.date(), datetime.strptime(time_parts, fmt).time())
+            except ValueError:
+                continue
+    return None
+
+
+def rate(fn, texts, repeat, before_pass=None):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if before_pass:
+            before_pass()
+        for text in texts:
+            fn(text)
+    return repeat * len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help='passes over the phrase list per measurement')
+    args = parser.parse_args()
+
+    legacy_texts = [text for text in THROUGHPUT_TEXTS if legacy_parse_time(text, REFERENCE)]
+    parse = lambda text: temporal_parser.parse_time(text, reference=REFERENCE)
+    print(f"legacy  {rate(lambda text: legacy_parse_time(text, REFERENCE), legacy_texts, args.repeat):>10.0f} phrases/s"
+          f"  (reads {len(legacy_texts)}/{len(THROUGHPUT_TEXTS)} phrases)")
+    print(f"cold    {rate(parse, THROUGHPUT_TEXTS, args.repeat, temporal_parser._parse.cache_clear):>10.0f} phrases/s")
+    print(f"warm    {rate(parse, THROUGHPUT_TEXTS, args.repeat):>10.0f} phrases/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Helpers for replaying the recorded chat corpus against LLMService without a running Ollama."""
+import json
+import os
+import re
+import threading
+import time
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'chat_corpus.txt')
+
+NEW_CONTEXT = {
+    'intent': None,
+    'time': None,
+    'duration': 30,
+    'recipients': [],
+    'subject': '',
+    'content': '',
+    'last_question': None,
+    'conversation_history': [],
+    'generate_joke': False,
+    'joke_topic': '',
+    'is_recurring': False,
+    'recurrence_rule': ''
+}
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Return the corpus as a list of sessions, each a list of user messages"""
+    sessions, current = [], []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('#'):
+                continue
+            if not line.strip():
+                if current:
+                    sessions.append(current)
+                    current = []
+                continue
+            current.append(line)
+    if current:
+        sessions.append(current)
+    return sessions
+
+
+class FakeOllamaClient:
+    """Stands in for ollama.Client: answers with mistral-style JSON and counts calls"""
+
+    def __init__(self, latency=0.0, prefill_per_char=0.0):
+        self.latency = latency
+        self.prefill_per_char = prefill_per_char
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        message = prompt.rsplit('User message:', 1)[-1].lower()
+        if 'joke' in prompt.lower() and 'user message:' not in prompt.lower():
+            return "Why do programmers prefer dark mode? Because light attracts bugs!"
+        intent = 'schedule_meeting' if re.search(r'meeting|schedule|set up', message) else 'send_email'
+        emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.]+', message)
+        names = [name for name in ('salah', 'abdullah', 'sallu') if name in message]
+        time_match = re.search(r'(tomorrow|today)?\s*(?:at\s*)?(\d{1,2}(?::\d{2})?\s*[ap]m)', message)
+        return json.dumps({
+            'intent': intent,
+            'time': f"{time_match.group(2).upper()} {time_match.group(1) or ''}".strip() if time_match else '',
+            'duration': '30',
+            'recipients': emails + names,
+            'subject': '',
+            'content': '',
+            'generate_joke': 'joke' in message,
+            'joke_topic': 'computers' if 'joke' in message else '',
+            'is_recurring': 'every' in message,
+            'recurrence_rule': ''
+        }, indent=2)
+
+    def generate(self, model=None, prompt='', stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt) + len(kwargs.get('system') or '')
+        time.sleep(self.latency + self.prefill_per_char * len(prompt))
+        return {'response': self._answer(prompt), 'done': True}
+
+
+def replay(llm_service, sessions):
+    """Feed every session through understand_intent, filling slots the way /chat does"""
+    turns = 0
+    for session in sessions:
+        context = json.loads(json.dumps(NEW_CONTEXT))
+        for message in session:
+            turns += 1
+            context['conversation_history'].append({'role': 'user', 'content': message})
+            understanding = llm_service.understand_intent(message, context) or {}
+            for key in ('intent', 'time', 'recipients', 'subject', 'content'):
+                if understanding.get(key):
+                    context[key] = understanding[key]
+            reply = "OK"
+            for slot in ('recipients', 'subject', 'content'):
+                if not context[slot]:
+                    context['last_question'] = slot
+                    reply = f"What {slot}?"
+                    break
+            context['conversation_history'].append({'role': 'assistant', 'content': reply})
+    return turns
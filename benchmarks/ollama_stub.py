@@ -0,0 +1,107 @@
+"""Local stand-in for the Ollama HTTP API (/api/generate only).
+
+Answers every prompt with a canned response, optionally after a delay (a number
+or a function of the request), at most `parallel` requests at a time like
+OLLAMA_NUM_PARALLEL, and supports both stream=false (one JSON object) and stream=true (NDJSON chunks).
+Responses carry the same timing fields Ollama reports; prompt_eval_duration
+grows with the number of prompt characters that are not already cached, i.e.
+not covered by the `context` tokens sent with the request or by the common
+prefix with the previous prompt, roughly like a real KV-cache prefill.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        prompt = (request.get('system') or '') + (request.get('prompt') or '')
+        with stub.lock:
+            stub.requests += 1
+            stub.connections.add(self.client_address)
+            cached_chars = max(len(request.get('context') or []) * 4,
+                               len(os.path.commonprefix([stub.last_prompt, prompt])))
+            stub.last_prompt = prompt
+        prefill_chars = max(len(prompt) - cached_chars, 0)
+        prefill = stub.prefill_per_char * prefill_chars
+        latency = stub.latency(request) if callable(stub.latency) else stub.latency
+        if stub.slots:
+            with stub.slots:
+                time.sleep(latency + prefill)
+        else:
+            time.sleep(latency + prefill)
+        text = stub.respond(request)
+        context = list(range((len(prompt) + len(text)) // 4))
+
+        if request.get('stream', True):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            words = text.split(' ')
+            for i, word in enumerate(words):
+                chunk = {'model': request.get('model'), 'response': word + (' ' if i < len(words) - 1 else ''), 'done': False}
+                self._write_chunk(json.dumps(chunk) + '\n')
+            done = {'model': request.get('model'), 'response': '', 'done': True, 'context': context,
+                    'prompt_eval_count': prefill_chars // 4, 'prompt_eval_duration': int(prefill * 1e9)}
+            self._write_chunk(json.dumps(done) + '\n')
+            self._write_chunk('')
+        else:
+            body = json.dumps({'model': request.get('model'), 'response': text, 'done': True, 'context': context,
+                               'prompt_eval_count': prefill_chars // 4, 'prompt_eval_duration': int(prefill * 1e9),
+                               'total_duration': int((latency + prefill) * 1e9)}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+class OllamaStub:
+    """Threaded HTTP server that mimics Ollama's /api/generate"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, prefill_per_char=0.0, respond=None, parallel=None):
+        self.latency = latency
+        self.slots = threading.Semaphore(parallel) if parallel else None
+        self.prefill_per_char = prefill_per_char
+        self.respond = respond or (lambda request: "Why do programmers prefer dark mode? Because light attracts bugs!")
+        self.requests = 0
+        self.last_prompt = ''
+        self.connections = set()
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,96 @@
+"""Minimal threaded SMTP sink used as a local stand-in for the real mail server.
+
+It speaks just enough SMTP for smtplib (EHLO, AUTH PLAIN, MAIL, RCPT, DATA,
+NOOP, RSET, QUIT), discards every message and can add artificial latency to
+the greeting and to AUTH so the cost of a real TLS handshake and login shows
+up in benchmarks.
+"""
+import socketserver
+import threading
+import time
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        time.sleep(sink.connect_delay)
+        with sink.lock:
+            sink.connections += 1
+        self._reply('220 localhost smtp-sink ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-localhost\r\n250-8BITMIME\r\n250-AUTH PLAIN\r\n250 SIZE 52428800\r\n')
+            elif verb == 'HELO':
+                self._reply('250 localhost')
+            elif verb == 'AUTH':
+                time.sleep(sink.auth_delay)
+                self._reply('235 2.7.0 Authentication successful')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[-1].strip().strip('<>').lower()
+                if address in sink.refuse:
+                    self._reply('550 5.1.1 User unknown')
+                else:
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b'.\r\n':
+                        break
+                with sink.lock:
+                    sink.messages += 1
+                self._reply('250 OK queued')
+            elif verb in ('MAIL', 'NOOP', 'RSET'):
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """Local SMTP server that accepts and drops everything"""
+
+    def __init__(self, host='127.0.0.1', port=0, connect_delay=0.0, auth_delay=0.0, refuse=()):
+        self.connect_delay = connect_delay
+        self.auth_delay = auth_delay
+        self.refuse = {address.lower() for address in refuse}
+        self.messages = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _SinkHandler)
+        self._server.sink = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -4,6 +4,7 @@ from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 import os.path
 import pickle
+import threading
 import uuid
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
@@ -12,6 +13,8 @@ class GoogleCalendarService:
     def __init__(self):
         self.creds = None
         self.service = None
+        # The API client's HTTP transport is not thread-safe; calls are serialized
+        self._lock = threading.Lock()
         self.initialize_credentials()
 
     def initialize_credentials(self):
@@ -67,17 +70,46 @@ class GoogleCalendarService:
                 event['recurrence'] = [recurrence_rule]
             
             # Insert event
-            event = self.service.events().insert(
-                calendarId='primary',
-                body=event,
-                conferenceDataVersion=1,
-                sendUpdates='all'
-            ).execute()
+            with self._lock:
+                event = self.service.events().insert(
+                    calendarId='primary',
+                    body=event,
+                    conferenceDataVersion=1,
+                    sendUpdates='all'
+                ).execute()
             
             return {
+                'id': event['id'],
                 'meetLink': event['conferenceData']['entryPoints'][0]['uri'],
                 'htmlLink': event['htmlLink']
             }
         except Exception as e:
             print(f"Error creating meeting: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+    def update_description(self, event_id, description):
+        """Replace the description of an existing event without notifying attendees again"""
+        try:
+            with self._lock:
+                self.service.events().patch(
+                    calendarId='primary',
+                    eventId=event_id,
+                    body={'description': description},
+                    sendUpdates='none'
+                ).execute()
+        except Exception as e:
+            print(f"Error updating meeting description: {str(e)}")
+            raise
+
+    def delete_meeting(self, event_id):
+        """Cancel an event; attendees get Google's cancellation notice"""
+        try:
+            with self._lock:
+                self.service.events().delete(
+                    calendarId='primary',
+                    eventId=event_id,
+                    sendUpdates='all'
+                ).execute()
+        except Exception as e:
+            print(f"Error deleting meeting: {str(e)}")
+            raise
@@ -7,21 +7,99 @@ load_dotenv()
 # MCP Configuration
 MCP_API_URL = os.getenv('MCP_API_URL', 'http://localhost:8000')
 MCP_API_KEY = os.getenv('MCP_API_KEY')
+MCP_STORAGE_BACKEND = os.getenv('MCP_STORAGE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+MCP_DB_PATH = os.getenv('MCP_DB_PATH', 'mcp.db')
+MCP_WRITE_BATCH = int(os.getenv('MCP_WRITE_BATCH', '256'))  # writes committed together by the SQLite writer
+MCP_READ_CONNECTIONS = int(os.getenv('MCP_READ_CONNECTIONS', '8'))  # SQLite reader connections shared by request threads
+MEETINGS_PAGE_SIZE = 100  # default GET /meetings page size
+MEETINGS_MAX_PAGE_SIZE = 1000
+MEETINGS_EXPORT_CHUNK = 500  # meetings fetched per step of a streamed NDJSON export
 
 # Ollama Configuration
 OLLAMA_API_URL = os.getenv('OLLAMA_API_URL', 'http://localhost:11434')
 OLLAMA_MODEL = 'mistral'  # Hardcoded to use mistral model
+# Per-task models, e.g. a small fast model for chat intents and a larger one for agendas
+OLLAMA_INTENT_MODEL = os.getenv('OLLAMA_INTENT_MODEL', OLLAMA_MODEL)
+OLLAMA_AGENDA_MODEL = os.getenv('OLLAMA_AGENDA_MODEL', OLLAMA_MODEL)
+OLLAMA_JOKE_MODEL = os.getenv('OLLAMA_JOKE_MODEL', OLLAMA_MODEL)
+OLLAMA_MAX_CONCURRENCY = int(os.getenv('OLLAMA_MAX_CONCURRENCY', '2'))  # generate calls in flight; the rest queue by priority
+OLLAMA_MAX_CONNECTIONS = int(os.getenv('OLLAMA_MAX_CONNECTIONS', '8'))  # shared keep-alive HTTP pool size
+OLLAMA_KEEPALIVE_EXPIRY = 60  # seconds an idle HTTP connection to Ollama is kept open
+OLLAMA_TIMEOUT = 120  # seconds
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')  # how long Ollama keeps the model (and its KV cache) loaded
+INTENT_JSON_MODE = os.getenv('INTENT_JSON_MODE', 'true').lower() == 'true'  # static system prefix + format='json'
+
+# Joke Pool Configuration
+JOKE_POOL_SIZE = int(os.getenv('JOKE_POOL_SIZE', '3'))  # pre-generated jokes kept per topic
+JOKE_POOL_TOPICS = [t.strip() for t in os.getenv('JOKE_POOL_TOPICS', 'computer,programming,meetings').split(',') if t.strip()]
+JOKE_POOL_MAX_TOPICS = int(os.getenv('JOKE_POOL_MAX_TOPICS', '16'))  # configured + recently requested topics kept warm
+JOKE_POOL_IDLE_POLL = 1.0  # seconds between checks for an idle Ollama
+
+# Intent Fast Path Configuration
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv('FAST_PATH_MIN_CONFIDENCE', '0.9'))  # below this the LLM is asked
+
+# Intent Cache Configuration
+INTENT_CACHE_SIZE = int(os.getenv('INTENT_CACHE_SIZE', '1024'))  # entries
+INTENT_CACHE_TTL = int(os.getenv('INTENT_CACHE_TTL', '3600'))  # seconds
+
+# Contacts Configuration
+CONTACTS_PATH = os.getenv('CONTACTS_PATH', 'contacts.json')  # .json, .csv or .vcf
+CONTACTS_RELOAD_INTERVAL = float(os.getenv('CONTACTS_RELOAD_INTERVAL', '2.0'))  # seconds between file change checks
+CONTACTS_MIN_PREFIX = int(os.getenv('CONTACTS_MIN_PREFIX', '3'))  # shortest partial name resolved without asking
 
 # Email Configuration
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
 SMTP_EMAIL = os.getenv('SMTP_EMAIL')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+SMTP_USE_SSL = os.getenv('SMTP_USE_SSL', 'true' if SMTP_PORT == 465 else 'false').lower() == 'true'
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'  # STARTTLS on plain connections
+SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', '30'))  # seconds
+
+# SMTP Connection Pool Configuration
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '4'))  # max concurrent sessions
+SMTP_POOL_IDLE_TIMEOUT = int(os.getenv('SMTP_POOL_IDLE_TIMEOUT', '120'))  # seconds before an idle session is dropped
+SMTP_POOL_NOOP_INTERVAL = int(os.getenv('SMTP_POOL_NOOP_INTERVAL', '10'))  # seconds idle before a NOOP health check
+SMTP_READINESS_TTL = int(os.getenv('SMTP_READINESS_TTL', '300'))  # seconds a connectivity probe stays valid
+SMTP_READINESS_RETRY_INTERVAL = 30  # seconds between probes while SMTP is unreachable
+BULK_EMAIL_SESSIONS = int(os.getenv('BULK_EMAIL_SESSIONS', '3'))  # parallel sessions for mail-merge sends
+
+# Outbound Mail Queue Configuration
+MAIL_SPOOL_DIR = os.getenv('MAIL_SPOOL_DIR', 'mail_spool')
+MAIL_QUEUE_WORKERS = int(os.getenv('MAIL_QUEUE_WORKERS', '2'))
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', '6'))
+MAIL_RETRY_BASE_DELAY = 2  # seconds, doubled after every failed attempt
+MAIL_RETRY_MAX_DELAY = 300  # seconds
+MAIL_SPOOL_RETENTION = 24 * 60 * 60  # seconds to keep delivery status of finished messages
+
+# Agenda Cache Configuration
+AGENDA_CACHE_PATH = os.getenv('AGENDA_CACHE_PATH', 'agenda_cache.json')
+AGENDA_CACHE_SIZE = int(os.getenv('AGENDA_CACHE_SIZE', '256'))  # entries
+AGENDA_CACHE_TTL = int(os.getenv('AGENDA_CACHE_TTL', str(7 * 24 * 60 * 60)))  # seconds
+AGENDA_CACHE_FLUSH_DELAY = float(os.getenv('AGENDA_CACHE_FLUSH_DELAY', '2.0'))  # seconds changes wait before the cache file is rewritten
 
 # Meeting Configuration
 DEFAULT_MEETING_DURATION = 60  # minutes
+MEETING_PIPELINE_WORKERS = int(os.getenv('MEETING_PIPELINE_WORKERS', '8'))  # threads running scheduling stages
+INBOUND_EMAIL_WORKERS = int(os.getenv('INBOUND_EMAIL_WORKERS', '8'))  # threads extracting and recording inbound meeting requests
+AGENDA_PLACEHOLDER = "The agenda is being prepared and will appear here shortly."
 DEFAULT_TIMEZONE = 'UTC'
+PENDING_TTL = int(os.getenv('PENDING_TTL', str(48 * 60 * 60)))  # seconds an unconfirmed meeting request stays open
+PENDING_MAX_TTL = int(os.getenv('PENDING_MAX_TTL', str(14 * 24 * 60 * 60)))  # longest ttl a request may ask for
+PENDING_REMINDER_BEFORE = int(os.getenv('PENDING_REMINDER_BEFORE', '0'))  # seconds before expiry to remind participants; 0 = off
+PENDING_MAX_REQUESTS = int(os.getenv('PENDING_MAX_REQUESTS', '100000'))  # open requests kept; the oldest is dropped beyond this
+TEMPORAL_CACHE_SIZE = int(os.getenv('TEMPORAL_CACHE_SIZE', '4096'))  # memoized time / duration phrases
 
 # Context Configuration
 CONTEXT_WINDOW_SIZE = 2048  # tokens
-MAX_HISTORY_LENGTH = 10  # number of previous meetings to consider 
\ No newline at end of file
+MAX_HISTORY_LENGTH = 10  # number of previous meetings / chat messages to consider
+HISTORY_RESPONSE_RESERVE = 256  # tokens of the context window left free for the model's answer
+HISTORY_SUMMARY_SHARE = 0.25  # fraction of the history budget the rolling summary of older turns may use
+HISTORY_SUMMARY_LINE_CHARS = 120  # evicted messages are clipped to this length when the summarizer is unavailable
+CONTEXT_RETRIEVAL_SHARE = 0.5  # fraction of the context window past meetings may fill in an agenda prompt
+CONTEXT_SNIPPET_CHARS = 300  # agenda text kept per retrieved meeting
+CONTEXT_SUBJECT_WEIGHT = 3  # subject words count this many times against agenda words
+CONTEXT_PARTICIPANT_BOOST = 2.0  # score added when all participants were in a past meeting
+BM25_K1 = 1.2
+BM25_B = 0.75
+CONTEXT_CACHE_SIZE = int(os.getenv('CONTEXT_CACHE_SIZE', '512'))  # /context responses kept for conditional requests
@@ -0,0 +1,390 @@
+"""Contact directory loaded from a CSV, JSON or vCard file
+
+Three indexes answer a lookup in order:
+  exact   normalized full name, name words, aliases, address and mailbox -> contacts
+  prefix  the exact keys in sorted order; a prefix is a contiguous slice found by bisect
+  fuzzy   one-character deletions of every name word (symmetric delete), which finds
+          words up to two edits away, plus a nickname table (bob -> robert)
+The file is polled for changes at most every CONTACTS_RELOAD_INTERVAL seconds. On a
+change only the contacts that were added, removed or edited are re-indexed.
+"""
+import bisect
+import csv
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from config import *
+
+Contact = namedtuple('Contact', 'name email aliases')
+
+_WHITESPACE = re.compile(r'\s+')
+_NON_NAME = re.compile(r"[^\w@.'\- ]+")
+_ALIAS_SPLIT = re.compile(r'\s*[;|]\s*')
+_VCARD_LINE = re.compile(r'^(?P<prop>[A-Za-z\-]+)(?P<params>(?:;[^:]*)?):(?P<value>.*)$')
+
+# Common English nicknames; each group is interchangeable for lookups
+_NICKNAME_GROUPS = (
+    ('robert', 'bob', 'rob', 'bobby'), ('william', 'bill', 'will', 'billy'), ('richard', 'rick', 'dick', 'rich'),
+    ('james', 'jim', 'jimmy'), ('john', 'jack', 'johnny'), ('michael', 'mike', 'mikey'), ('joseph', 'joe', 'joey'),
+    ('thomas', 'tom', 'tommy'), ('charles', 'charlie', 'chuck'), ('christopher', 'chris'), ('daniel', 'dan', 'danny'),
+    ('matthew', 'matt'), ('anthony', 'tony'), ('andrew', 'andy', 'drew'), ('steven', 'steve'), ('edward', 'ed', 'eddie'),
+    ('elizabeth', 'liz', 'beth', 'lizzy'), ('jennifer', 'jen', 'jenny'), ('katherine', 'kate', 'kathy', 'katie'),
+    ('margaret', 'maggie', 'meg', 'peggy'), ('patricia', 'pat', 'patty'), ('susan', 'sue', 'susie'),
+    ('alexander', 'alex'), ('benjamin', 'ben'), ('samuel', 'sam'), ('nicholas', 'nick'), ('jonathan', 'jon'),
+    ('abdullah', 'abdul'), ('muhammad', 'mohammed', 'mohammad', 'mo'),
+)
+NICKNAMES = {name: group for group in _NICKNAME_GROUPS for name in group}
+
+
+def normalize(text):
+    """Casefold, strip accents and punctuation, collapse whitespace"""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', _NON_NAME.sub(' ', text.casefold())).strip()
+
+
+def delete_distance(a, b):
+    """Damerau-Levenshtein distance between two words that share a one-deletion variant
+
+    Such words are at most two edits apart, so comparing positions is enough: different
+    lengths or a single mismatch is one edit, and so is a swap of adjacent letters.
+    """
+    if a == b:
+        return 0
+    if len(a) != len(b):
+        return 1
+    mismatches = [i for i in range(len(a)) if a[i] != b[i]]
+    if len(mismatches) == 1:
+        return 1
+    if len(mismatches) == 2 and mismatches[1] == mismatches[0] + 1 and a[mismatches[0]] == b[mismatches[1]] \
+            and a[mismatches[1]] == b[mismatches[0]]:
+        return 1
+    return 2
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _contact(name, email, aliases=()):
+    email = (email or '').strip().lower()
+    if '@' not in email:
+        return None
+    name = _WHITESPACE.sub(' ', (name or '').strip()) or email.split('@')[0]
+    return Contact(name, email, tuple(alias.strip() for alias in aliases if alias and alias.strip()))
+
+
+def _read_json(f):
+    data = json.load(f)
+    if isinstance(data, dict):
+        # {"salah": "salah@example.com"} like the old hardcoded table
+        return [_contact(name, email) for name, email in data.items()]
+    contacts = []
+    for entry in data:
+        aliases = entry.get('aliases') or entry.get('nicknames') or []
+        if isinstance(aliases, str):
+            aliases = _ALIAS_SPLIT.split(aliases)
+        contacts.append(_contact(entry.get('name'), entry.get('email'), aliases))
+    return contacts
+
+
+def _read_csv(f):
+    contacts = []
+    for row in csv.DictReader(f):
+        row = {(key or '').strip().lower(): value for key, value in row.items()}
+        aliases = _ALIAS_SPLIT.split(row.get('aliases') or row.get('nicknames') or '')
+        contacts.append(_contact(row.get('name'), row.get('email'), aliases))
+    return contacts
+
+
+def _read_vcard(f):
+    contacts, card = [], None
+    lines = f.read().replace('\r\n', '\n').replace('\n ', '').replace('\n\t', '').split('\n')  # unfold
+    for line in lines:
+        match = _VCARD_LINE.match(line.strip())
+        if not match:
+            continue
+        prop, params, value = match.group('prop').upper(), match.group('params').upper(), match.group('value').strip()
+        if prop == 'BEGIN':
+            card = {'name': '', 'emails': [], 'aliases': []}
+        elif card is None:
+            continue
+        elif prop == 'FN':
+            card['name'] = value
+        elif prop == 'N' and not card['name']:
+            family, given = (value.split(';') + [''])[:2]
+            card['name'] = f"{given} {family}".strip()
+        elif prop == 'NICKNAME':
+            card['aliases'].extend(value.split(','))
+        elif prop == 'EMAIL':
+            # Preferred address first
+            if 'PREF' in params:
+                card['emails'].insert(0, value)
+            else:
+                card['emails'].append(value)
+        elif prop == 'END':
+            if card['emails']:
+                contacts.append(_contact(card['name'], card['emails'][0], card['aliases']))
+            card = None
+    return contacts
+
+
+_READERS = {'.json': _read_json, '.csv': _read_csv, '.vcf': _read_vcard, '.vcard': _read_vcard}
+
+
+def read_contacts(path):
+    """Parse a contacts file into Contact tuples; the format follows the extension"""
+    reader = _READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported contacts file: {path}")
+    with open(path, newline='', encoding='utf-8') as f:
+        return [contact for contact in reader(f) if contact]
+
+
+class ContactDirectory:
+    """Exact, prefix and fuzzy name -> email lookup over a contacts file"""
+
+    def __init__(self, path=None, reload_interval=None, contacts=None):
+        self.path = CONTACTS_PATH if path is None else path
+        self.reload_interval = CONTACTS_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._contacts = {}  # email -> Contact
+        self._exact = {}  # key -> set of emails
+        self._keys = []  # sorted exact keys, the prefix index
+        self._deletes = {}  # name word with one letter dropped -> set of name words
+        self._file_state = None
+        self._checked_at = 0.0
+        self.stats = {'contacts': 0, 'reloads': 0, 'reindexed': 0, 'exact': 0, 'prefix': 0, 'fuzzy': 0, 'misses': 0}
+        if contacts is not None:
+            self.update(contacts)
+        else:
+            self.refresh(force=True)
+
+    # Indexing
+
+    @staticmethod
+    def _keys_for(contact):
+        """(exact keys, name words for the fuzzy index)"""
+        name = normalize(contact.name)
+        aliases = [normalize(alias) for alias in contact.aliases]
+        words = set(name.split())
+        for alias in aliases:
+            words.update(alias.split())
+        keys = words | {name, contact.email, normalize(contact.email.split('@')[0])}
+        keys.update(aliases)
+        keys.discard('')
+        return keys, {word for word in words if len(word) > 2 and word.isalpha()}
+
+    def _index(self, contact, touched):
+        self._contacts[contact.email] = contact
+        keys, words = self._keys_for(contact)
+        for key in keys:
+            emails = self._exact.get(key)
+            if emails is None:
+                emails = self._exact[key] = set()
+                touched.add(key)
+                if key in words:
+                    for variant in _deletes(key) | {key}:
+                        self._deletes.setdefault(variant, set()).add(key)
+            emails.add(contact.email)
+
+    def _unindex(self, contact, touched):
+        del self._contacts[contact.email]
+        keys, _ = self._keys_for(contact)
+        for key in keys:
+            emails = self._exact.get(key)
+            if emails is None:
+                continue
+            emails.discard(contact.email)
+            if emails:
+                continue
+            del self._exact[key]
+            touched.add(key)
+            for variant in _deletes(key) | {key}:
+                words = self._deletes.get(variant)
+                if words is not None:
+                    words.discard(key)
+                    if not words:
+                        del self._deletes[variant]
+
+    def update(self, contacts):
+        """Make the directory hold exactly these contacts, re-indexing only what changed"""
+        incoming = {contact.email: contact for contact in contacts}
+        touched = set()  # exact keys that appeared or disappeared
+        with self._lock:
+            changed = 0
+            for email in [email for email in self._contacts if email not in incoming]:
+                self._unindex(self._contacts[email], touched)
+                changed += 1
+            for email, contact in incoming.items():
+                current = self._contacts.get(email)
+                if current == contact:
+                    continue
+                if current is not None:
+                    self._unindex(current, touched)
+                self._index(contact, touched)
+                changed += 1
+            self._update_prefix_index(touched)
+            self.stats['contacts'] = len(self._contacts)
+            self.stats['reindexed'] += changed
+            return changed
+
+    def _update_prefix_index(self, touched):
+        if len(touched) > 1000:
+            # Bulk load: one sort beats thousands of list insertions
+            self._keys = sorted(self._exact)
+            return
+        for key in touched:
+            i = bisect.bisect_left(self._keys, key)
+            present = i < len(self._keys) and self._keys[i] == key
+            if key in self._exact and not present:
+                self._keys.insert(i, key)
+            elif key not in self._exact and present:
+                del self._keys[i]
+
+    def refresh(self, force=False):
+        """Re-read the file if it changed since the last load; returns the number of contacts re-indexed"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return 0
+        # One reloader at a time; lookups keep using the current indexes while the file is parsed
+        if not self._reload_lock.acquire(blocking=force):
+            return 0
+        try:
+            self._checked_at = now
+            if not self.path:
+                return 0
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return 0
+            state = (stat.st_mtime_ns, stat.st_size)
+            if state == self._file_state:
+                return 0
+            try:
+                contacts = read_contacts(self.path)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"Error loading contacts from {self.path}: {e}")
+                return 0
+            self._file_state = state
+            self.stats['reloads'] += 1
+            return self.update(contacts)
+        finally:
+            self._reload_lock.release()
+
+    # Lookups
+
+    def _prefix_emails(self, prefix, limit):
+        emails = []
+        i = bisect.bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix) and len(emails) < limit:
+            for email in sorted(self._exact[self._keys[i]]):
+                if email not in emails:
+                    emails.append(email)
+            i += 1
+        return emails[:limit]
+
+    def _fuzzy_words(self, word):
+        """Indexed name words within edit distance of word, closest first"""
+        limit = 1 if len(word) < 5 else 2
+        candidates = set()
+        for variant in _deletes(word) | {word}:
+            candidates.update(self._deletes.get(variant, ()))
+        scored = [(delete_distance(word, candidate), candidate) for candidate in candidates]
+        return [(distance, candidate) for distance, candidate in sorted(scored) if distance <= limit]
+
+    def _word_matches(self, word):
+        """[(distance, indexed word)] for a query word: itself if known, else nicknames and close spellings"""
+        if word in self._exact:
+            return [(0, alternative) for alternative in NICKNAMES.get(word, (word,)) if alternative in self._exact]
+        matches = [(0, alternative) for alternative in NICKNAMES.get(word, ()) if alternative in self._exact]
+        return matches + self._fuzzy_words(word)
+
+    def _fuzzy_emails(self, query):
+        """[(email, total distance)] for contacts matching every word of query by nickname or close spelling"""
+        per_word = [self._word_matches(word) for word in query.split()]
+        if not all(per_word):
+            return []
+        # Start from the word with the fewest contacts so later words only filter
+        per_word.sort(key=lambda matches: sum(len(self._exact[word]) for _, word in matches))
+        totals = {}
+        for distance, word in per_word[0]:
+            for email in self._exact[word]:
+                totals[email] = min(totals.get(email, distance), distance)
+        for matches in per_word[1:]:
+            best = {}
+            for distance, word in matches:
+                emails = self._exact[word]
+                for email in totals if len(totals) < len(emails) else emails:
+                    if email in emails and email in totals:
+                        best[email] = min(best.get(email, distance), distance)
+            totals = {email: totals[email] + distance for email, distance in best.items()}
+            if not totals:
+                return []
+        return sorted(totals.items(), key=lambda item: (item[1], item[0]))
+
+    def _match(self, key, limit):
+        """(tier, [(email, score)]) from the first index that knows key; lower scores are better"""
+        with self._lock:
+            emails = self._exact.get(key)
+            if emails:
+                return 'exact', [(email, 0) for email in sorted(emails)[:limit]]
+            emails = self._prefix_emails(key, limit)
+            if emails:
+                return 'prefix', [(email, 0) for email in emails]
+            return 'fuzzy', self._fuzzy_emails(key)[:limit]
+
+    def search(self, query, limit=10):
+        """Return up to limit (Contact, tier) pairs for a name, alias, address or partial name"""
+        self.refresh()
+        key = normalize(query or '')
+        if not key:
+            return []
+        tier, matches = self._match(key, limit)
+        self.stats[tier if matches else 'misses'] += 1
+        return [(self._contacts[email], tier) for email, _ in matches]
+
+    def resolve(self, name):
+        """Return the email for a name when one contact is clearly the best match, else None
+
+        A partial name shorter than CONTACTS_MIN_PREFIX is never resolved, even when only one
+        contact starts with it; search() still offers that contact as a suggestion.
+        """
+        if not name:
+            return None
+        if '@' in name:
+            return name.strip().lower()
+        self.refresh()
+        key = normalize(name)
+        if not key:
+            return None
+        tier, matches = self._match(key, 2)
+        self.stats[tier if matches else 'misses'] += 1
+        if tier == 'prefix' and len(key) < CONTACTS_MIN_PREFIX:
+            return None
+        # A close spelling wins only when it is strictly closer than the runner-up
+        if len(matches) == 1 or len(matches) == 2 and matches[0][1] < matches[1][1]:
+            return matches[0][0]
+        return None
+
+    def __len__(self):
+        return len(self._contacts)
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_contact_directory():
+    """Return the process-wide directory, loading it on first use"""
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            _directory = ContactDirectory()
+        return _directory
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from config import *
+
+
+class ContextCache:
+    """LRU cache of MCP /context responses with their ETags
+
+    Entries are never trusted on their own: every lookup is revalidated with If-None-Match
+    and the MCP server answers 304 while its meeting store has not changed, which skips
+    ranking, serialization and the response body.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or CONTEXT_CACHE_SIZE
+        self._entries = OrderedDict()  # key -> (etag, context)
+        self._lock = threading.Lock()
+        self.hits = 0  # 304 Not Modified
+        self.misses = 0  # full responses
+        self.changes = 0  # full responses that replaced a cached entry
+        self.stale = 0  # cached context served because the MCP server was unreachable
+
+    @staticmethod
+    def key(topic, participants, history_length):
+        people = sorted({p.strip().lower() for p in participants or [] if isinstance(p, str)})
+        encoded = json.dumps([topic, people, history_length]).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def get(self, key):
+        """The cached (etag, context) pair, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def not_modified(self):
+        """Record a 304 for an entry returned by get()"""
+        with self._lock:
+            self.hits += 1
+
+    def put(self, key, etag, context):
+        """Record a full response; responses without an ETag are counted but not cached"""
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self.changes += 1
+                del self._entries[key]
+            if etag:
+                self._entries[key] = (etag, context)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def fallback(self, key):
+        """Last known context for a key when the MCP server cannot be reached, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.stale += 1
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'changes': self.changes,
+                'stale': self.stale,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_context_cache():
+    """Return the shared MCP context cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ContextCache()
+        return _cache
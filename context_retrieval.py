@@ -0,0 +1,197 @@
+"""BM25 ranking of stored meetings as context for a new meeting's agenda
+
+Each meeting is a document made of its subject (counted CONTEXT_SUBJECT_WEIGHT times)
+and its agenda text. Postings are kept as Python lists while meetings arrive and turned
+into NumPy arrays on first use. A query only scores meetings in its postings, skipping
+lists that can no longer change the top k, with a few vector operations per list.
+Meetings that share participants with the new meeting get an additive boost. Only the
+best snippets that fit the token budget are returned.
+"""
+import json
+import math
+import re
+import threading
+import numpy as np
+from config import *
+from conversation_history import estimate_tokens
+from meeting_query import parse_query
+
+_WORD = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset((
+    'a an and are as at be by for from has have in is it its of on or our that the their this to was we were '
+    'will with you your meeting meetings discuss discussion 1 2 3 4 5'
+).split())
+_SNIPPET_FIELDS = ('id', 'subject', 'start_time', 'participants')
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall((text or '').lower()) if word not in _STOPWORDS and len(word) > 1]
+
+
+class ContextRetriever:
+    """Incremental BM25 index over meetings with a participant-overlap boost"""
+
+    def __init__(self, k1=None, b=None, participant_boost=None, token_budget=None, snippet_chars=None):
+        self.k1 = BM25_K1 if k1 is None else k1
+        self.b = BM25_B if b is None else b
+        self.participant_boost = CONTEXT_PARTICIPANT_BOOST if participant_boost is None else participant_boost
+        self.token_budget = token_budget or int(CONTEXT_WINDOW_SIZE * CONTEXT_RETRIEVAL_SHARE)
+        self.snippet_chars = snippet_chars or CONTEXT_SNIPPET_CHARS
+        self._snippets = []  # doc number -> compact meeting dict returned as context
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._total_length = 0.0
+        self._postings = {}  # term -> ([doc numbers], [term frequencies])
+        self._arrays = {}  # term -> (doc number array, tf array), '@address' -> doc number array; built on demand
+        self._by_participant = {}  # address -> [doc numbers]
+        self.last_id = 0  # highest meeting id indexed; meeting ids only grow
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _snippet(self, meeting):
+        snippet = {key: meeting[key] for key in _SNIPPET_FIELDS if key in meeting}
+        content = ' '.join(str(meeting.get('content') or '').split())
+        if len(content) > self.snippet_chars:
+            content = content[:self.snippet_chars].rsplit(' ', 1)[0] + ' ...'
+        snippet['content'] = content
+        return snippet
+
+    def add(self, meeting):
+        terms = tokenize(meeting.get('subject')) * CONTEXT_SUBJECT_WEIGHT + tokenize(meeting.get('content'))
+        frequencies = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        with self._lock:
+            if meeting['id'] <= self.last_id:
+                return  # already indexed
+            self.last_id = meeting['id']
+            doc = len(self._snippets)
+            self._snippets.append(self._snippet(meeting))
+            if doc == len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            self._lengths[doc] = len(terms)
+            self._total_length += len(terms)
+            for term, count in frequencies.items():
+                docs, counts = self._postings.setdefault(term, ([], []))
+                docs.append(doc)
+                counts.append(count)
+                self._arrays.pop(term, None)
+            for address in {p.strip().lower() for p in meeting.get('participants') or [] if isinstance(p, str)}:
+                self._by_participant.setdefault(address, []).append(doc)
+                self._arrays.pop('@' + address, None)
+
+    def add_all(self, meetings):
+        for meeting in meetings:
+            self.add(meeting)
+
+    def sync(self, storage):
+        """Index the meetings an mcp_storage backend got since the last sync, a chunk at a time
+
+        Other worker processes may share the storage, so this runs before every ranking; when
+        nothing is new it costs one empty page query.
+        """
+        with self._sync_lock:
+            query = dict(parse_query({}), limit=MEETINGS_EXPORT_CHUNK, after=self.last_id)
+            while True:
+                page, query['after'] = storage.query_meetings(query)
+                self.add_all(page)
+                if query['after'] is None:
+                    return len(self)
+
+    def _term_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            docs, counts = self._postings[term]
+            arrays = self._arrays[term] = (np.array(docs, dtype=np.int64), np.array(counts, dtype=np.float32))
+        return arrays
+
+    def _participant_array(self, address):
+        key = '@' + address
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._arrays[key] = np.array(self._by_participant[address], dtype=np.int64)
+        return array
+
+    def _weights(self, docs, tf, weight, average_length):
+        """Score contribution of one posting list to the given docs; tf is None for participants"""
+        if tf is None:
+            return np.full(len(docs), weight, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self._lengths[docs] / average_length)
+        return (weight * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+
+    def rank(self, topic, participants, k):
+        """[(score, doc number)] for the k best meetings, best first"""
+        with self._lock:
+            count = len(self._snippets)
+            if not count or k <= 0:
+                return []
+            terms = [term for term in set(tokenize(topic)) if term in self._postings]
+            addresses = {p.strip().lower() for p in participants or [] if isinstance(p, str)}
+            posting_lists = [self._by_participant[a] for a in addresses if a in self._by_participant]
+            if not terms and not posting_lists:
+                return []
+            # Score only meetings found in the query's postings. Lists are taken in order of the most
+            # they can add to a score (MaxScore): once the k-th best partial score beats what the
+            # remaining lists could add together, a meeting missing from the lists taken so far
+            # cannot reach the top k, and the remaining lists are only looked up for the candidates.
+            average_length = self._total_length / count
+            lists = []
+            for term in terms:
+                term_docs, tf = self._term_arrays(term)
+                idf = math.log(1 + (count - len(term_docs) + 0.5) / (len(term_docs) + 0.5))
+                lists.append((idf * (self.k1 + 1), term_docs, tf, idf))
+            for address in addresses:
+                if address in self._by_participant:
+                    boost = self.participant_boost / len(addresses)
+                    lists.append((boost, self._participant_array(address), None, boost))
+            lists.sort(key=lambda entry: entry[0], reverse=True)
+            remaining = sum(entry[0] for entry in lists)
+            candidates = np.empty(0, dtype=np.int64)
+            candidate_scores = np.empty(0, dtype=np.float32)
+            taken = 0
+            for bound, list_docs, tf, weight in lists:
+                taken += 1
+                remaining -= bound
+                docs = np.concatenate([candidates, list_docs])
+                weights = np.concatenate([candidate_scores, self._weights(list_docs, tf, weight, average_length)])
+                # Both runs are ascending, which a stable sort merges in linear time
+                order = np.argsort(docs, kind='stable')
+                docs, weights = docs[order], weights[order]
+                starts = np.flatnonzero(np.concatenate(([True], docs[1:] != docs[:-1])))
+                candidates, candidate_scores = docs[starts], np.add.reduceat(weights, starts)
+                if len(candidates) >= k:
+                    threshold = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+                    if threshold > remaining:
+                        break
+            for _, list_docs, tf, weight in lists[taken:]:
+                positions = np.minimum(np.searchsorted(list_docs, candidates), len(list_docs) - 1)
+                found = list_docs[positions] == candidates
+                candidate_scores[found] += self._weights(
+                    candidates[found], None if tf is None else tf[positions[found]], weight, average_length)
+            if len(candidates) > k:
+                best = np.argpartition(-candidate_scores, k - 1)[:k]
+                candidates, candidate_scores = candidates[best], candidate_scores[best]
+            # Highest score first; ties go to the newer meeting
+            order = np.lexsort((-candidates, -candidate_scores))
+            return [(float(candidate_scores[i]), int(candidates[i])) for i in order]
+
+    def retrieve(self, topic, participants, k=None, token_budget=None):
+        """Compact meeting dicts, most relevant first, that together fit the token budget"""
+        k = k or MAX_HISTORY_LENGTH
+        budget = token_budget or self.token_budget
+        results, used = [], 2  # the surrounding JSON brackets
+        for _, doc in self.rank(topic, participants, k):
+            snippet = self._snippets[doc]
+            tokens = estimate_tokens(json.dumps(snippet)) + 1
+            if used + tokens > budget:
+                continue  # a shorter, lower-ranked snippet may still fit
+            results.append(snippet)
+            used += tokens
+        return results
+
+    def recent(self, k):
+        """The k newest meetings, for requests with neither a topic nor participants"""
+        with self._lock:
+            return self._snippets[-k:][::-1] if k > 0 else []
+
+    def __len__(self):
+        return len(self._snippets)
@@ -0,0 +1,107 @@
+from config import *
+
+SUMMARY_KEY = 'history_summary'
+
+
+def estimate_tokens(text):
+    """Rough token count for English text (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _line(message):
+    role = "User" if message['role'] == 'user' else "Assistant"
+    return f"{role}: {message['content']}"
+
+
+class ConversationHistory:
+    """Keeps the conversation part of a prompt inside CONTEXT_WINDOW_SIZE
+
+    The most recent messages (at most MAX_HISTORY_LENGTH) are sent verbatim. Once that
+    overflows, the oldest are evicted down to half of it and summarize(summary, lines,
+    max_tokens) folds just those lines into the rolling summary. The summary is cached in
+    the chat context under 'history_summary', so each message is summarized once per
+    session. Without a summarizer, or when it fails, evicted lines are kept clipped to
+    HISTORY_SUMMARY_LINE_CHARS and the oldest drop out once they outgrow their share.
+    """
+
+    def __init__(self, context_window=None, max_messages=None, response_reserve=None,
+                 summary_share=None, summary_line_chars=None, summarize=None):
+        self.context_window = context_window or CONTEXT_WINDOW_SIZE
+        self.max_messages = max_messages or MAX_HISTORY_LENGTH
+        self.response_reserve = HISTORY_RESPONSE_RESERVE if response_reserve is None else response_reserve
+        self.summary_share = HISTORY_SUMMARY_SHARE if summary_share is None else summary_share
+        self.summary_line_chars = summary_line_chars or HISTORY_SUMMARY_LINE_CHARS
+        self.summarize = summarize
+
+    def budget(self, prompt_tokens):
+        """Tokens left for history once the rest of the prompt and the answer are accounted for"""
+        return max(self.context_window - self.response_reserve - prompt_tokens, 0)
+
+    def _summary_state(self, context, history):
+        state = context.get(SUMMARY_KEY)
+        # A fresh conversation_history list means the chat was reset
+        if not state or state['upto'] > len(history):
+            state = {'upto': 0, 'summary': '', 'tokens': 0}
+            context[SUMMARY_KEY] = state
+        return state
+
+    def _clipped(self, summary, lines, summary_budget):
+        """Fallback summary: the evicted lines clipped, oldest dropped once over budget"""
+        kept = summary.split("\n") if summary else []
+        for line in lines:
+            if len(line) > self.summary_line_chars:
+                line = line[:self.summary_line_chars - 3].rstrip() + "..."
+            kept.append(line)
+        tokens = sum(estimate_tokens(line) + 1 for line in kept)
+        while kept and tokens > summary_budget:
+            tokens -= estimate_tokens(kept.pop(0)) + 1
+        return "\n".join(kept)
+
+    def _fold(self, state, lines, summary_budget):
+        summary = None
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(state['summary'], lines, summary_budget)
+            except Exception as e:
+                print(f"Error summarizing conversation history: {str(e)}")
+        if summary:
+            summary = summary.strip()[:summary_budget * 4]
+        else:
+            summary = self._clipped(state['summary'], lines, summary_budget)
+        state['summary'] = summary
+        state['tokens'] = estimate_tokens(summary) + 1 if summary else 0
+        state['upto'] += len(lines)
+
+    def render(self, context, prompt_tokens=0):
+        """Return the conversation text for a prompt whose other parts take prompt_tokens"""
+        history = (context or {}).get('conversation_history') or []
+        if not history:
+            return ""
+        budget = self.budget(prompt_tokens)
+        summary_budget = int(budget * self.summary_share)
+        state = self._summary_state(context, history)
+
+        recent = [_line(message) for message in history[state['upto']:]]
+        recent_tokens = sum(estimate_tokens(line) + 1 for line in recent)
+        # Evict down to half of max_messages at once, so the summary is updated every few
+        # turns rather than on every one; the newest message always stays verbatim
+        keep = max(self.max_messages // 2, 1)
+        evicted = []
+        if len(recent) > self.max_messages or state['tokens'] + recent_tokens > budget:
+            while len(recent) > 1 and (len(recent) > keep or summary_budget + recent_tokens > budget):
+                recent_tokens -= estimate_tokens(recent[0]) + 1
+                evicted.append(recent.pop(0))
+        if evicted:
+            self._fold(state, evicted, summary_budget)
+
+        remaining = budget - state['tokens'] - (recent_tokens - estimate_tokens(recent[-1]) - 1)
+        if estimate_tokens(recent[-1]) > remaining:
+            recent[-1] = recent[-1][:max(remaining, 0) * 4]
+
+        parts = []
+        if state['summary']:
+            parts.append("Summary of earlier conversation:")
+            parts.append(state['summary'])
+            parts.append("Recent messages:")
+        parts.extend(recent)
+        return "\n".join(parts) + "\n"
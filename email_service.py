@@ -1,20 +1,24 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from smtp_pool import get_smtp_pool
 
 class EmailService:
-    def __init__(self, sender_email, password):
+    def __init__(self, sender_email, password, llm_service=None):
         self.sender_email = sender_email
         self.password = password
+        self.llm_service = llm_service
+        self.smtp_pool = get_smtp_pool(email=sender_email, password=password)
 
     def send_email(self, recipients, subject, content, generate_joke=False, joke_topic='computer'):
         """Send an email to the specified recipients."""
         try:
             # Generate joke if requested
             if generate_joke:
-                from llm_service import LLMService
-                llm_service = LLMService()
-                joke = llm_service.generate_joke(joke_topic)
+                if self.llm_service is None:
+                    from llm_service import LLMService
+                    self.llm_service = LLMService()
+                from joke_pool import get_joke_pool
+                joke = get_joke_pool(self.llm_service).take(joke_topic)
                 content = f"Here's a joke about {joke_topic}s:\n\n{joke}\n\n{content}"
             
             # Create message
@@ -26,10 +30,8 @@ class EmailService:
             # Add body
             msg.attach(MIMEText(content, 'plain'))
             
-            # Send email
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp_server:
-                smtp_server.login(self.sender_email, self.password)
-                smtp_server.send_message(msg)
+            # Send email over a pooled session on the configured SMTP server
+            self.smtp_pool.send_message(msg)
             
             return True, "Email sent successfully"
         except Exception as e:
@@ -0,0 +1,124 @@
+import os
+import quopri
+import threading
+import uuid
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+
+def _encode_body(text):
+    """Quoted-printable encode a UTF-8 body with CRLF line endings"""
+    encoded = quopri.encodestring(text.encode('utf-8'))
+    return encoded.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n').decode('ascii')
+
+
+def _encode_header(value):
+    """Leave ASCII header values alone and RFC 2047 encode anything else"""
+    try:
+        value.encode('ascii')
+        return value
+    except UnicodeEncodeError:
+        return Header(value, 'utf-8').encode()
+
+
+class RenderedEmail:
+    """A rendered template: subject, plain text and HTML, ready to be serialized"""
+
+    def __init__(self, template, subject, text, html):
+        self.template = template
+        self.subject = subject
+        self.text = text
+        self.html = html
+
+    def as_string(self, from_addr, to_addrs):
+        """Serialize as a multipart/alternative message using the template's pre-encoded MIME parts"""
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        text = _encode_body(self.text)
+        html = _encode_body(self.html)
+        boundary = self.template.boundary
+        if boundary in text or boundary in html:
+            boundary = f"=={uuid.uuid4().hex}=="
+            parts = self.template.mime_parts(boundary)
+        else:
+            parts = self.template.parts
+        headers = (
+            f"From: {from_addr}\r\n"
+            f"To: {', '.join(to_addrs)}\r\n"
+            f"Subject: {_encode_header(self.subject)}\r\n"
+            f"Date: {formatdate(localtime=True)}\r\n"
+            f"Message-ID: {make_msgid()}\r\n"
+        )
+        return headers + parts[0] + text + parts[1] + html + parts[2]
+
+
+class CompiledEmailTemplate:
+    """Subject, text and HTML templates compiled once, plus the static MIME scaffolding around them"""
+
+    def __init__(self, environment, name):
+        self.name = name
+        self.subject = environment.get_template(f"{name}.subject")
+        self.text = environment.get_template(f"{name}.txt")
+        self.html = environment.get_template(f"{name}.html")
+        self.boundary = f"=={uuid.uuid4().hex}=="
+        self.parts = self.mime_parts(self.boundary)
+
+    @staticmethod
+    def mime_parts(boundary):
+        """The fixed header/boundary text that surrounds the two encoded bodies"""
+        part_headers = "Content-Type: text/{}; charset=\"utf-8\"\r\nContent-Transfer-Encoding: quoted-printable\r\n\r\n"
+        return (
+            "MIME-Version: 1.0\r\n"
+            f"Content-Type: multipart/alternative; boundary=\"{boundary}\"\r\n\r\n"
+            f"--{boundary}\r\n" + part_headers.format('plain'),
+            f"\r\n--{boundary}\r\n" + part_headers.format('html'),
+            f"\r\n--{boundary}--\r\n"
+        )
+
+    def render(self, **context):
+        subject = ' '.join(self.subject.render(**context).split())
+        return RenderedEmail(self, subject, self.text.render(**context), self.html.render(**context))
+
+
+class EmailTemplateEngine:
+    """Loads email templates from templates/email and caches each compiled template"""
+
+    def __init__(self, template_dir=None):
+        self.environment = Environment(
+            loader=FileSystemLoader(template_dir or TEMPLATE_DIR),
+            autoescape=select_autoescape(enabled_extensions=('html',), default_for_string=False),
+            auto_reload=False,
+            keep_trailing_newline=True
+        )
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(name)
+                if compiled is None:
+                    compiled = CompiledEmailTemplate(self.environment, name)
+                    self._compiled[name] = compiled
+        return compiled
+
+    def render(self, name, **context):
+        """Render a template's subject, plain text and HTML together"""
+        return self.get(name).render(**context)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_template_engine():
+    """Return the process-wide email template engine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = EmailTemplateEngine()
+        return _engine
@@ -0,0 +1,133 @@
+"""Parsing and meeting extraction for inbound emails
+
+Messages arrive as raw RFC 822 text, one at a time or many in an mbox stream. They are
+parsed with BytesFeedParser; an mbox is split into messages while it is read, so a large
+mailbox is never held in memory as a whole. Only the text/plain body (the plain part of a multipart message) is searched for meeting details.
+The compat32 policy keeps headers as plain strings; only the Subject is decoded, which is
+far cheaper than building header objects for every header of every message.
+"""
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.feedparser import BytesFeedParser
+from email.header import decode_header, make_header
+import threading
+from config import *
+import temporal_parser
+
+_PARTICIPANT = re.compile(r'(?:^|\s)([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+# mbox separator lines, and body lines that mboxrd escaped because they looked like one
+_MBOX_FROM = re.compile(rb'From ')
+_MBOX_ESCAPED = re.compile(rb'>+From ')
+_READ_CHUNK = 64 * 1024
+
+
+class ExtractionError(ValueError):
+    """The message has no usable meeting details; reported per message"""
+
+
+def parse_message(raw):
+    """Parse one raw RFC 822 message (str or bytes)"""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8', 'surrogateescape')
+    parser = BytesFeedParser()
+    parser.feed(raw)
+    return parser.close()
+
+
+def _lines(stream):
+    """Lines of a binary stream read in large chunks (WSGI input streams read lines a byte at a time)"""
+    rest = b''
+    for chunk in iter(lambda: stream.read(_READ_CHUNK), b''):
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if rest:
+        yield rest
+
+
+def iter_mbox(stream):
+    """Yield the raw messages of a binary mbox stream one at a time, while it is read"""
+    lines = None
+    for line in _lines(stream):
+        if _MBOX_FROM.match(line):
+            if lines is not None:
+                yield b''.join(lines)
+            lines = []
+            continue
+        if lines is None:
+            continue  # anything before the first separator is not a message
+        if _MBOX_ESCAPED.match(line):
+            line = line[1:]
+        lines.append(line)
+    if lines is not None:
+        yield b''.join(lines)
+
+
+def plain_text(message):
+    """The first inline text/plain part of a message, or '' when it has none"""
+    for part in message.walk():
+        if part.get_content_type() == 'text/plain' and part.get_content_disposition() != 'attachment':
+            payload = part.get_payload(decode=True) or b''
+            try:
+                return payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+            except LookupError:
+                return payload.decode('utf-8', 'replace')
+    return ''
+
+
+def subject(message):
+    value = message.get('subject', '')
+    try:
+        return str(make_header(decode_header(value)))
+    except (LookupError, UnicodeError, ValueError):
+        return str(value)
+
+
+def extract_meeting(message):
+    """Subject, proposed time, duration, participants and content of a meeting request"""
+    body = plain_text(message)
+    proposed_time = temporal_parser.find_time_text(body)
+    # Clean up email addresses and remove duplicates, keeping their order
+    participants = list(dict.fromkeys(address.strip('- ') for address in _PARTICIPANT.findall(body)))
+    if not proposed_time or not participants:
+        raise ExtractionError('Could not extract meeting details from email')
+    return {
+        'subject': subject(message),
+        'proposed_time': proposed_time,
+        'duration': temporal_parser.parse_duration(body, default=30),
+        'participants': participants,
+        # Keep the body as plain text; templates escape it and preserve line breaks
+        'content': body.strip(),
+    }
+
+
+def process_all(messages, handle, executor=None, window=None):
+    """Run handle(message) for every message on the worker pool; yields results in input order
+
+    messages may be a lazy iterator (e.g. iter_mbox): at most `window` messages are read
+    ahead and in flight at once.
+    """
+    executor = executor or get_inbound_executor()
+    window = window or INBOUND_EMAIL_WORKERS * 4
+    pending = deque()
+    for message in messages:
+        pending.append(executor.submit(handle, message))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inbound_executor():
+    """Return the shared worker pool for inbound email processing"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=INBOUND_EMAIL_WORKERS, thread_name_prefix="inbound-email")
+        return _executor
@@ -0,0 +1,85 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from config import *
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = re.compile(r'[\s.!?,;]+$')
+
+# Chat slots that change what a message means ("yes" after "who should I invite?" vs. after "what subject?")
+SLOT_KEYS = ('intent', 'last_question', 'recipients', 'subject', 'content')
+
+
+class IntentCache:
+    """LRU + TTL cache of understand_intent results keyed on normalized message and slot state"""
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = max_size or INTENT_CACHE_SIZE
+        self.ttl = INTENT_CACHE_TTL if ttl is None else ttl
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(message):
+        """Lowercase, collapse whitespace and drop trailing punctuation"""
+        message = _WHITESPACE.sub(' ', message.strip().lower())
+        return _TRAILING_PUNCTUATION.sub('', message)
+
+    @staticmethod
+    def slot_digest(context):
+        """Short digest of the chat slots that influence how a message is understood"""
+        slots = {key: (context or {}).get(key) for key in SLOT_KEYS}
+        encoded = json.dumps(slots, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def key(self, message, context=None):
+        return f"{self.slot_digest(context)}:{self.normalize(message)}"
+
+    def get(self, key):
+        """Return a private copy of a cached result, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Cache a result; resolved times are dropped so they are re-resolved on every hit"""
+        result = copy.deepcopy(result)
+        result['time'] = None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,138 @@
+import threading
+from collections import OrderedDict, deque
+from config import *
+from llm_service import FALLBACK_JOKE
+
+_MAX_REMEMBERED = 4096  # stocked jokes remembered for de-duplication
+
+
+def normalize_topic(topic):
+    return ' '.join((topic or '').lower().split()) or 'computer'
+
+
+class JokePool:
+    """Small per-topic inventory of pre-generated jokes, refilled while Ollama is idle
+
+    take() never waits on the LLM: it serves a stored joke (each joke is handed out once)
+    or, for a cold topic, FALLBACK_JOKE while the topic is warmed in the background.
+    Configured topics are always kept warm; requested ones are kept on an LRU basis.
+    """
+
+    def __init__(self, llm_service, size=None, topics=None, max_topics=None, idle_poll=None):
+        self.llm_service = llm_service
+        self.size = size or JOKE_POOL_SIZE
+        self.pinned = [normalize_topic(t) for t in (JOKE_POOL_TOPICS if topics is None else topics)]
+        self.max_topics = max(max_topics or JOKE_POOL_MAX_TOPICS, len(self.pinned))
+        self.idle_poll = idle_poll or JOKE_POOL_IDLE_POLL
+
+        self._jokes = OrderedDict((topic, deque()) for topic in self.pinned)  # topic -> unserved jokes
+        self._served = OrderedDict()  # recently stocked jokes, so none is repeated
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'served': 0, 'fallbacks': 0, 'generated': 0, 'duplicates': 0, 'errors': 0}
+
+    def _touch(self, topic):
+        """Mark a topic as recently requested, evicting the least recently used unpinned one"""
+        if topic in self._jokes:
+            self._jokes.move_to_end(topic)
+            return
+        self._jokes[topic] = deque()
+        for stale in list(self._jokes):
+            if len(self._jokes) <= self.max_topics:
+                break
+            if stale not in self.pinned:
+                del self._jokes[stale]
+
+    def take(self, topic):
+        """Return a joke about topic without blocking on the LLM"""
+        topic = normalize_topic(topic)
+        with self._cond:
+            self._touch(topic)
+            jokes = self._jokes[topic]
+            if jokes:
+                self.stats['served'] += 1
+                joke = jokes.popleft()
+            else:
+                self.stats['fallbacks'] += 1
+                joke = FALLBACK_JOKE
+            self._cond.notify()
+        return joke
+
+    def warm(self, topic):
+        """Ask for jokes about topic to be generated ahead of the first take()"""
+        with self._cond:
+            self._touch(normalize_topic(topic))
+            self._cond.notify()
+
+    def _next_topic(self):
+        """Most recently requested topic that is below its target, or None"""
+        for topic in reversed(self._jokes):
+            if len(self._jokes[topic]) < self.size:
+                return topic
+        return None
+
+    def _llm_busy(self):
+        return getattr(self.llm_service.ollama_client, 'in_flight', 0) > 0
+
+    def _refill_loop(self):
+        failures = 0
+        while not self._stop.is_set():
+            with self._cond:
+                topic = self._next_topic()
+                if topic is None:
+                    self._cond.wait()
+                    continue
+            if self._llm_busy():
+                # Interactive requests come first; try again shortly
+                self._stop.wait(self.idle_poll)
+                continue
+            joke = self.llm_service.generate_joke(topic)
+            with self._cond:
+                if joke == FALLBACK_JOKE:
+                    self.stats['errors'] += 1
+                elif joke in self._served:
+                    self.stats['duplicates'] += 1
+                else:
+                    self.stats['generated'] += 1
+                    self._served[joke] = None
+                    if len(self._served) > _MAX_REMEMBERED:
+                        self._served.popitem(last=False)
+                    if topic in self._jokes:
+                        self._jokes[topic].append(joke)
+                    failures = 0
+                    continue
+            # Failed or repeated: back off before asking again
+            failures += 1
+            self._stop.wait(self.idle_poll * 2 ** min(failures, 6))
+
+    def start(self):
+        """Start refilling in the background"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refill_loop, name="joke-pool", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def status(self):
+        with self._cond:
+            return dict(self.stats, stock={topic: len(jokes) for topic, jokes in self._jokes.items()})
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_joke_pool(llm_service):
+    """Return the started joke pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JokePool(llm_service).start()
+        return _pool
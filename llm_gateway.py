@@ -0,0 +1,77 @@
+import threading
+import httpx
+import ollama
+from config import *
+from llm_scheduler import DEFAULT, LLMScheduler, model_for
+
+
+class LLMGateway:
+    """Process-wide Ollama client with a keep-alive HTTP connection pool
+
+    Exposes the same generate() call as ollama.Client, so it can be handed to anything
+    that used its own client. httpx clients are thread-safe, so one instance serves all
+    request threads. Calls pass through an LLMScheduler: task= picks the priority class
+    and, unless model= is given, the model configured for that task.
+    """
+
+    def __init__(self, host=None, max_connections=None, keepalive_expiry=None, timeout=None, max_concurrency=None):
+        self.host = host or OLLAMA_API_URL
+        limits = httpx.Limits(
+            max_connections=max_connections or OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=max_connections or OLLAMA_MAX_CONNECTIONS,
+            keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY if keepalive_expiry is None else keepalive_expiry
+        )
+        self.client = ollama.Client(host=self.host, limits=limits, timeout=timeout or OLLAMA_TIMEOUT)
+        self.scheduler = LLMScheduler(max_concurrency)
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'streams': 0, 'errors': 0}
+        self.in_flight = 0  # requests currently running, used by background work to detect idleness
+
+    def _count(self, key, in_flight=0):
+        with self._lock:
+            if key:
+                self.stats[key] += 1
+            self.in_flight += in_flight
+
+    def _stream(self, task, kwargs):
+        # Everything happens on first iteration, so a stream that is never read holds no slot
+        self.scheduler.acquire(task)
+        self._count('streams', 1)
+        try:
+            yield from self.client.generate(stream=True, **kwargs)
+        except Exception:
+            self._count('errors')
+            raise
+        finally:
+            self._count(None, -1)
+            self.scheduler.release(task)
+
+    def generate(self, model=None, prompt='', stream=False, task=DEFAULT, **kwargs):
+        kwargs.update(model=model or model_for(task), prompt=prompt)
+        if stream:
+            # The slot is taken when iteration starts and held until the stream is consumed or closed
+            return self._stream(task, kwargs)
+        self.scheduler.acquire(task)
+        self._count('calls', 1)
+        try:
+            return self.client.generate(stream=False, **kwargs)
+        except Exception:
+            self._count('errors')
+            raise
+        finally:
+            self._count(None, -1)
+            self.scheduler.release(task)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway():
+    """Return the shared LLM gateway, creating it on first use"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            print(f"Connecting to Ollama at {OLLAMA_API_URL}")
+            _gateway = LLMGateway()
+        return _gateway
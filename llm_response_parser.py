@@ -0,0 +1,164 @@
+"""Tolerant extraction of the JSON object in a model reply
+
+Models wrap the object in prose or ``` fences, use single quotes, Python literals,
+comments and trailing commas, or stop mid-object when they hit the token limit.
+extract_json_object() rewrites the first object it finds into strict JSON in one pass
+(comments are only recognised outside strings, so URLs in values survive) and closes
+whatever is still open at the end of the text. A string cut off by the end of the text is
+dropped along with its key, so a truncated value is never returned as if it were whole.
+"""
+import json
+import re
+
+_FENCE = re.compile(r'```[a-zA-Z]*[ \t]*\n?(.*?)(?:```|$)', re.S)
+_BARE_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_\-]*')
+_NUMBER = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+# Runs of characters that are copied unchanged inside a string with the given quote
+_STRING_RUN = {'"': re.compile(r'[^"\\\n\r\t]+'), "'": re.compile(r'[^\'"\\\n\r\t]+')}
+_LITERALS = {'true': 'true', 'false': 'false', 'null': 'null',
+             'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+def _strip_dangling(out):
+    """Drop a trailing comma, or a key whose value never arrived, before closing a container"""
+    while out and out[-1] in ' \t\r\n':
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+    elif out and out[-1] == ':':
+        # Remove '"key":' back to the previous separator
+        out.pop()
+        while out and out[-1] not in '{,':
+            out.pop()
+        if out and out[-1] == ',':
+            out.pop()
+
+
+def _repair(text, start):
+    """Rewrite text[start:] (which begins with '{') as strict JSON; returns a string"""
+    out = []
+    stack = []
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in '"\'':
+            # String literal, re-emitted with double quotes
+            quote = ch
+            plain = _STRING_RUN[quote]
+            opened = len(out)
+            out.append('"')
+            i += 1
+            closed = False
+            while i < n:
+                run = plain.match(text, i)
+                if run:
+                    out.append(run.group(0))
+                    i = run.end()
+                    continue
+                ch = text[i]
+                if ch == '\\' and i + 1 < n:
+                    nxt = text[i + 1]
+                    out.append(nxt if nxt == "'" else '\\' + nxt)
+                    i += 2
+                    continue
+                if ch == quote:
+                    i += 1
+                    closed = True
+                    break
+                if ch == '"':
+                    out.append('\\"')
+                elif ch == '\n':
+                    out.append('\\n')
+                elif ch == '\r':
+                    pass
+                elif ch == '\t':
+                    out.append('\\t')
+                else:
+                    out.append(ch)
+                i += 1
+            if not closed:
+                # Cut off mid-string: drop it; closing up removes the key or comma before it
+                del out[opened:]
+                break
+            out.append('"')
+            continue
+        if ch == '/' and text.startswith('//', i):
+            newline = text.find('\n', i)
+            i = n if newline == -1 else newline
+            continue
+        if ch == '/' and text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            out.append(ch)
+        elif ch in '}]':
+            if not stack:
+                break
+            _strip_dangling(out)
+            out.append(stack.pop())
+            if not stack:
+                return ''.join(out)
+        elif ch in ',:':
+            out.append(ch)
+        elif ch in ' \t\r\n':
+            out.append(' ')
+        else:
+            number = _NUMBER.match(text, i)
+            word = None if number else _BARE_WORD.match(text, i)
+            if number:
+                out.append(number.group(0).rstrip('.'))
+                i = number.end()
+            elif word:
+                token = word.group(0)
+                out.append(_LITERALS.get(token) or json.dumps(token))
+                i = word.end()
+            else:
+                # Stray character outside any string (e.g. prose after a missing brace)
+                i += 1
+            continue
+        i += 1
+
+    # Truncated reply: close everything that is still open
+    while stack:
+        _strip_dangling(out)
+        out.append(stack.pop())
+    return ''.join(out)
+
+
+def _loads_object(text):
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def extract_json_object(text, max_cuts=3):
+    """Return the first JSON object in a model reply as a dict, or None"""
+    if not text:
+        return None
+    parsed = _loads_object(text)
+    if parsed is not None:
+        return parsed
+    fenced = _FENCE.search(text)
+    candidates = [fenced.group(1), text] if fenced else [text]
+    for candidate in candidates:
+        start = candidate.find('{')
+        while start != -1:
+            parsed = _loads_object(candidate[start:candidate.rfind('}') + 1])
+            if parsed is not None:
+                return parsed
+            # If the repaired text still does not parse (a reply cut off inside a key, say),
+            # retry without the last, incomplete member
+            end = len(candidate)
+            for _ in range(max_cuts + 1):
+                parsed = _loads_object(_repair(candidate[:end], start))
+                if parsed is not None:
+                    return parsed
+                end = candidate.rfind(',', start, end)
+                if end == -1:
+                    break
+            start = candidate.find('{', start + 1)
+    return None
@@ -0,0 +1,82 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from config import *
+
+# Task classes in priority order: interactive chat first, background jokes last
+INTENT = 'intent'
+AGENDA = 'agenda'
+DEFAULT = 'default'  # untagged calls
+JOKE = 'joke'
+TASK_PRIORITIES = {INTENT: 0, AGENDA: 1, DEFAULT: 1, JOKE: 2}
+TASK_MODELS = {INTENT: OLLAMA_INTENT_MODEL, AGENDA: OLLAMA_AGENDA_MODEL, DEFAULT: OLLAMA_MODEL, JOKE: OLLAMA_JOKE_MODEL}
+
+
+def model_for(task):
+    return TASK_MODELS.get(task, OLLAMA_MODEL)
+
+
+class LLMScheduler:
+    """Admits at most max_concurrency Ollama calls at a time, highest priority first
+
+    Waiting calls are served by task priority (INTENT, AGENDA, JOKE) and FIFO within a
+    class, so a backlog of agendas cannot starve interactive intent parsing.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or OLLAMA_MAX_CONCURRENCY
+        self.running = 0
+        self._waiting = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._queued = Counter()
+        self._admitted = Counter()
+        self._completed = Counter()
+        self._wait_seconds = Counter()
+        self.max_queue_depth = 0
+
+    def acquire(self, task):
+        """Block until task may run; returns the seconds it waited"""
+        entry = (TASK_PRIORITIES.get(task, TASK_PRIORITIES[DEFAULT]), next(self._sequence))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self._queued[task] += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+            while self.running >= self.max_concurrency or self._waiting[0] != entry:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._queued[task] -= 1
+            self.running += 1
+            waited = time.monotonic() - started
+            self._admitted[task] += 1
+            self._wait_seconds[task] += waited
+            # Another slot may still be free for the next waiter in line
+            self._cond.notify_all()
+        return waited
+
+    def release(self, task):
+        with self._cond:
+            self.running -= 1
+            self._completed[task] += 1
+            self._cond.notify_all()
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'running': self.running,
+                'queue_depth': len(self._waiting),
+                'max_queue_depth': self.max_queue_depth,
+                'queued': {task: n for task, n in self._queued.items() if n},
+                'completed': dict(self._completed),
+                'avg_wait_ms': {task: round(self._wait_seconds[task] / n * 1000, 1)
+                                for task, n in self._admitted.items() if n},
+                'models': dict(TASK_MODELS)
+            }
@@ -1,100 +1,47 @@
-import os
-from datetime import datetime, timedelta
-import ollama
+import re
+import time
 from config import *
+from llm_gateway import get_llm_gateway
+from llm_scheduler import INTENT, JOKE, model_for
+from intent_cache import IntentCache
+from conversation_history import ConversationHistory, estimate_tokens
+from contact_directory import get_contact_directory
+from llm_response_parser import extract_json_object
+import temporal_parser
 
-class LLMService:
-    def __init__(self):
-        print("Initializing LLM Service...")
-        self.ollama_client = ollama.Client(host=OLLAMA_API_URL)
-        self.known_contacts = {
-            'salah': 'salahuddin0758@gmail.com',
-            'abdullah': 'aamcse@gmail.com',
-            'sallu': 'salauddin0758@gmail.com',
-            # Add more contacts as needed
-        }
-        print("LLM Service initialized successfully!")
+# Fast-path grammar for formulaic requests, compiled once
+_EMAIL_COMMAND = re.compile(r'^(?:please\s+)?(?:send|write)\s+(?:an?\s+)?(?:e-?mail|mail|message)(?:\s+to\s+(?P<rest>.+))?$', re.I | re.S)
+_MEETING_COMMAND = re.compile(r'^(?:please\s+)?(?:schedule|set\s*up|book|arrange)\s+(?:an?\s+)?(?:meeting|call)\b(?P<rest>.*)$', re.I | re.S)
+_CONTENT_CLAUSE = re.compile(r'\s+(?:saying|that says)\s*:?\s+(?P<value>.+)$', re.I | re.S)
+_JOKE_CLAUSE = re.compile(r'\s+with\s+an?\s+joke\s+about\s+(?P<value>.+?)(?=\s+about\s|$)', re.I)
+_SUBJECT_CLAUSE = re.compile(r'\s+(?:about|titled|called|regarding)\s+(?P<value>.+)$', re.I)
+_DURATION_CLAUSE = re.compile(r'\s+(?:for\s+|with\s+)?(?P<value>\d+\s*(?:minutes?|mins?|m|hours?|hrs?|h))\b', re.I)
+_TIME_CLAUSE = re.compile(
+    r'\s+(?:(?P<day>today|tomorrow)\s+)?(?:at\s+)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>[ap])\.?m\.?\b'
+    r'(?:\s+(?P<day_after>today|tomorrow))?', re.I)
+_DAY_ONLY = re.compile(r'\s+(?P<day>today|tomorrow)\b', re.I)
+_RECIPIENTS_CLAUSE = re.compile(r'^\s*(?:(?:with|to)\s+)?(?P<value>.+?)\s*$', re.I | re.S)
+_RECIPIENT_SPLIT = re.compile(r'\s*(?:,|\band\b|&)\s*', re.I)
+_RECIPIENT_TOKEN = re.compile(r'^(?:[\w.%+-]+@[\w.-]+\.[a-z]{2,}|[a-z][a-z.\'-]*)$', re.I)
+# Phrasings the rules do not model; these always go to the LLM
+_NEEDS_LLM = re.compile(r'\b(?:every|each|weekly|daily|monthly|recurring|next|except|unless|instead|cancel|reschedule)\b', re.I)
 
-    def parse_time(self, time_str):
-        """Parse time from natural language"""
-        print(f"Parsing time: {time_str}")  # Debug print
-        current_date = datetime.now()
-        
-        # Handle "tomorrow"
-        if 'tomorrow' in time_str.lower():
-            current_date += timedelta(days=1)
-            time_parts = time_str.lower().replace('tomorrow', '').strip()
-        # Handle "today"
-        elif 'today' in time_str.lower():
-            time_parts = time_str.lower().replace('today', '').strip()
-        else:
-            time_parts = time_str
 
-        # Normalize time format
-        time_parts = time_parts.upper().strip()
-        
-        # Handle AM/PM times
-        if 'AM' in time_parts or 'PM' in time_parts:
-            try:
-                # Try parsing with colon
-                time = datetime.strptime(time_parts, '%I:%M %p').time()
-                print(f"Parsed time with colon: {time}")  # Debug print
-                return datetime.combine(current_date.date(), time)
-            except ValueError:
-                try:
-                    # Try parsing without colon
-                    time = datetime.strptime(time_parts, '%I %p').time()
-                    print(f"Parsed time without colon: {time}")  # Debug print
-                    return datetime.combine(current_date.date(), time)
-                except ValueError:
-                    try:
-                        # Try parsing with space between time and AM/PM
-                        time = datetime.strptime(time_parts, '%I%M %p').time()
-                        print(f"Parsed time with space: {time}")  # Debug print
-                        return datetime.combine(current_date.date(), time)
-                    except ValueError:
-                        print(f"Failed to parse time: {time_parts}")  # Debug print
-                        return None
-
-        print(f"Time string does not contain AM/PM: {time_parts}")  # Debug print
-        return None
+def _text_field(parsed, key):
+    """parsed[key] when the model returned a string there, otherwise ''"""
+    value = parsed.get(key)
+    return value if isinstance(value, str) else ''
 
-    def parse_duration(self, duration_str):
-        """Parse duration from natural language"""
-        duration_str = duration_str.lower()
-        if 'm' in duration_str or 'min' in duration_str:
-            try:
-                return int(''.join(filter(str.isdigit, duration_str)))
-            except ValueError:
-                return 30  # default duration
-        elif 'h' in duration_str or 'hour' in duration_str:
-            try:
-                hours = int(''.join(filter(str.isdigit, duration_str)))
-                return hours * 60
-            except ValueError:
-                return 60  # default duration
-        return 30  # default duration
 
-    def resolve_contact(self, name):
-        """Resolve contact name to email"""
-        name = name.lower()
-        if '@' in name:  # Already an email
-            return name
-        return self.known_contacts.get(name)
-
-    def understand_intent(self, message, context=None):
-        """Understand user intent using LLM"""
-        print(f"\nProcessing message: {message}")
-        print(f"Current context: {context}")  # Debug print
-        
-        # Build conversation history for context
-        conversation_context = ""
-        if context and 'conversation_history' in context:
-            for msg in context['conversation_history']:
-                role = "User" if msg['role'] == 'user' else "Assistant"
-                conversation_context += f"{role}: {msg['content']}\n"
-        
-        system_prompt = f"""You are an AI assistant that helps understand meeting and email related requests.
+def _flag_field(parsed, key):
+    """parsed[key] as a boolean; models answer true, "true" or "True" interchangeably"""
+    return parsed.get(key) is True or str(parsed.get(key)).lower() == 'true'
+
+
+FALLBACK_JOKE = "Here's a classic computer joke: Why do programmers prefer dark mode? Because light attracts bugs!"
+
+# Intent extraction prompt; {conversation_context} is filled by ConversationHistory
+_INTENT_PROMPT = """You are an AI assistant that helps understand meeting and email related requests.
         Current conversation context:
         {conversation_context}
         
@@ -149,35 +96,81 @@ class LLMService:
             "recurrence_rule": "FREQ=WEEKLY;BYDAY=FR;UNTIL=20240430T235959Z"
         }}
         """
+_INTENT_PROMPT_TOKENS = estimate_tokens(_INTENT_PROMPT.format(conversation_context=''))
 
-        try:
-            print(f"Using Ollama model: {OLLAMA_MODEL}")
-            response = self.ollama_client.generate(
-                model=OLLAMA_MODEL,
-                prompt=f"{system_prompt}\n\nUser message: {message}\nResponse:"
-            )
-            print(f"Ollama response: {response['response']}")
-            
-            # Process the LLM response to extract structured information
-            result = self._process_llm_response(response['response'], message)
-            print(f"Processed result: {result}")
-            return result
-        except Exception as e:
-            print(f"Error in LLM understanding: {str(e)}")
-            print(f"Error type: {type(e)}")
-            return None
+# JSON-mode intent extraction. The instructions never change, so they go in the system
+# prompt ahead of anything per-turn: every request then starts with the same tokens and
+# Ollama reuses the cached prefill for them while the model stays loaded (OLLAMA_KEEP_ALIVE).
+_INTENT_SYSTEM = """You extract meeting and email requests from a chat into JSON.
+Reply with a single JSON object with exactly these keys:
+{"intent": "schedule_meeting" or "send_email",
+ "time": "time as written, e.g. '2:00 PM tomorrow' or '10:00 AM today', or ''",
+ "duration": "duration in minutes, e.g. '30'",
+ "recipients": ["names or email addresses"],
+ "subject": "meeting or email subject",
+ "content": "email content if applicable",
+ "generate_joke": true or false,
+ "joke_topic": "topic for the joke if applicable",
+ "is_recurring": true or false,
+ "recurrence_rule": "RRULE for recurring meetings, e.g. 'FREQ=WEEKLY;BYDAY=FR;UNTIL=20240430T235959Z'"}
+Use the conversation so far: if the assistant just asked for recipients, a subject or content,
+the user message is the answer to that question.
 
-    def _process_llm_response(self, llm_response, original_message):
-        """Process LLM response and extract structured information"""
-        import json
-        import re
+Example:
+User message: schedule a meeting tomorrow at 2pm with salahuddin0758@gmail.com
+{"intent": "schedule_meeting", "time": "2:00 PM tomorrow", "duration": "30", "recipients": ["salahuddin0758@gmail.com"], "subject": "Meeting", "content": "", "generate_joke": false, "joke_topic": "", "is_recurring": false, "recurrence_rule": ""}
+
+Example:
+User message: set up a meeting every friday in apr to salauddin0758@gmail.com
+{"intent": "schedule_meeting", "time": "10:00 AM this Friday", "duration": "30", "recipients": ["salauddin0758@gmail.com"], "subject": "Weekly Meeting", "content": "", "generate_joke": false, "joke_topic": "", "is_recurring": true, "recurrence_rule": "FREQ=WEEKLY;BYDAY=FR;UNTIL=20240430T235959Z"}"""
+_INTENT_SYSTEM_TOKENS = estimate_tokens(_INTENT_SYSTEM)
+_INTENT_TURN = "Conversation so far:\n{conversation_context}\nUser message: {message}"
+
+# Folds newly evicted turns into the rolling conversation summary kept by ConversationHistory
+_SUMMARY_PROMPT = """Update the summary of a conversation between a user and a meeting and email assistant.
+Keep names, email addresses, times, subjects and any request that is still open. Reply with the
+updated summary only, in at most {words} words.
+
+Summary so far:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+
+class LLMService:
+    def __init__(self, gateway=None, intent_cache=None, history=None, contacts=None):
+        print("Initializing LLM Service...")
+        self.ollama_client = gateway or get_llm_gateway()
+        self.intent_cache = intent_cache or IntentCache()
+        self.history = history or ConversationHistory(summarize=self.summarize_history)
+        self.json_mode = INTENT_JSON_MODE
+        self.fast_path_stats = {'hits': 0, 'misses': 0, 'seconds': 0.0}
+        self.contacts = contacts or get_contact_directory()
+        print("LLM Service initialized successfully!")
+
+    def parse_time(self, time_str):
+        """Parse time from natural language"""
+        return temporal_parser.parse_time(time_str)
+
+    def parse_duration(self, duration_str):
+        """Parse duration from natural language"""
+        return temporal_parser.parse_duration(duration_str, default=30)
+
+    def resolve_contact(self, name):
+        """Resolve contact name to email; None when unknown or ambiguous"""
+        return self.contacts.resolve(name)
 
-        # Default structure for the response
-        result = {
+    def _empty_result(self):
+        return {
             'intent': None,
             'time': None,
+            'time_text': '',  # time as the model phrased it, before parse_time
             'duration': 30,  # default duration in minutes
             'recipients': [],
+            'unresolved_recipients': [],  # names the contact directory could not pin to one address
             'subject': '',
             'content': '',
             'generate_joke': False,
@@ -186,77 +179,206 @@ class LLMService:
             'recurrence_rule': ''
         }
 
+    def _take(self, pattern, text):
+        """Remove the first match of a clause pattern; returns (match, remaining text)"""
+        match = pattern.search(text)
+        if not match:
+            return None, text
+        return match, text[:match.start()] + text[match.end():]
+
+    def _resolve_recipients(self, text):
+        """Resolve a 'salah, bob@x.com and abdullah' list; returns (emails, all_resolved)"""
+        emails, resolved = [], True
+        for token in _RECIPIENT_SPLIT.split(text.strip()):
+            if not token:
+                continue
+            email = self.resolve_contact(token) if _RECIPIENT_TOKEN.match(token) else None
+            if email:
+                emails.append(email)
+            else:
+                resolved = False
+        return emails, resolved
+
+    def fast_path_intent(self, message):
+        """Deterministic parser for formulaic requests; returns (result, confidence)"""
+        message = message.strip()
+        if _NEEDS_LLM.search(message):
+            return None, 0.0
+        result = self._empty_result()
+        
+        email_command = _EMAIL_COMMAND.match(message)
+        meeting_command = _MEETING_COMMAND.match(message) if not email_command else None
+        if not email_command and not meeting_command:
+            return None, 0.0
+        
+        rest = ' ' + ((email_command or meeting_command).group('rest') or '').strip()
+        confidence = 1.0
+        
+        if email_command:
+            result['intent'] = 'send_email'
+            match, rest = self._take(_CONTENT_CLAUSE, rest)
+            if match:
+                result['content'] = match.group('value').strip()
+            match, rest = self._take(_JOKE_CLAUSE, rest)
+            if match:
+                result['generate_joke'] = True
+                result['joke_topic'] = match.group('value').strip()
+        else:
+            result['intent'] = 'schedule_meeting'
+            match, rest = self._take(_DURATION_CLAUSE, rest)
+            if match:
+                result['duration'] = self.parse_duration(match.group('value'))
+            match, rest = self._take(_TIME_CLAUSE, rest)
+            if match:
+                day = match.group('day') or match.group('day_after') or 'today'
+                ampm = 'AM' if match.group('ampm').lower() == 'a' else 'PM'
+                result['time_text'] = f"{int(match.group('hour'))}:{match.group('minute') or '00'} {ampm} {day.lower()}"
+                result['time'] = self.parse_time(result['time_text'])
+                if result['time'] is None:
+                    confidence -= 0.5
+            else:
+                match, rest = self._take(_DAY_ONLY, rest)
+                if match:
+                    # A day without a clock time is ambiguous; leave it to the model
+                    confidence -= 0.5
+        
+        match, rest = self._take(_SUBJECT_CLAUSE, rest)
+        if match:
+            result['subject'] = match.group('value').strip().rstrip('.')
+        
+        if rest.strip():
+            recipients = _RECIPIENTS_CLAUSE.match(rest).group('value')
+            result['recipients'], resolved = self._resolve_recipients(recipients)
+            if not resolved:
+                confidence -= 0.5
+        
+        return result, confidence
+
+    def _generate(self, prompt, on_token=None, task=INTENT, **options):
+        """Call Ollama and return the response text, streaming chunks to on_token when given"""
+        if on_token is None:
+            return self.ollama_client.generate(prompt=prompt, task=task, **options)['response']
+        parts = []
+        for chunk in self.ollama_client.generate(prompt=prompt, stream=True, task=task, **options):
+            parts.append(chunk['response'])
+            on_token(chunk['response'])
+        return ''.join(parts)
+
+    def understand_intent(self, message, context=None, on_token=None):
+        """Understand user intent, trying the rule-based fast path and the cache before the LLM
+
+        on_token, when given, receives the model's output as it streams in.
+        """
+        print(f"\nProcessing message: {message}")
+        
+        started = time.perf_counter()
+        result, confidence = self.fast_path_intent(message)
+        self.fast_path_stats['seconds'] += time.perf_counter() - started
+        if result is not None and confidence >= FAST_PATH_MIN_CONFIDENCE:
+            self.fast_path_stats['hits'] += 1
+            print(f"Fast-path result (confidence {confidence:.1f}): {result}")
+            return result
+        self.fast_path_stats['misses'] += 1
+        
+        cache_key = self.intent_cache.key(message, context)
+        cached = self.intent_cache.get(cache_key)
+        if cached is not None:
+            # Relative times ("tomorrow at 2pm") are resolved again against the current date
+            if cached['time_text']:
+                cached['time'] = self.parse_time(cached['time_text'])
+            print(f"Intent cache hit: {cached}")
+            return cached
+        
+        # Recent turns verbatim plus a rolling summary of older ones, within CONTEXT_WINDOW_SIZE
+        prompt_tokens = (_INTENT_SYSTEM_TOKENS if self.json_mode else _INTENT_PROMPT_TOKENS) + estimate_tokens(message)
+        conversation_context = self.history.render(context, prompt_tokens) if context else ""
+
         try:
-            # Clean up the response
-            llm_response = llm_response.strip()
-            
-            # Remove any markdown code block markers and comments
-            llm_response = re.sub(r'```json\n|\n```', '', llm_response)
-            llm_response = re.sub(r'//.*$', '', llm_response, flags=re.MULTILINE)
+            print(f"Using Ollama model: {model_for(INTENT)}")
+            if self.json_mode:
+                prompt = _INTENT_TURN.format(conversation_context=conversation_context, message=message)
+                response_text = self._generate(prompt, on_token, system=_INTENT_SYSTEM, format='json',
+                                               keep_alive=OLLAMA_KEEP_ALIVE)
+            else:
+                system_prompt = _INTENT_PROMPT.format(conversation_context=conversation_context)
+                response_text = self._generate(f"{system_prompt}\n\nUser message: {message}\nResponse:", on_token)
+            print(f"Ollama response: {response_text}")
             
-            # Extract JSON from the response
-            json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                # Clean up the JSON string
-                json_str = json_str.replace('\n', ' ').replace('\r', '')
-                # Fix common JSON formatting issues
-                json_str = re.sub(r',\s*}', '}', json_str)  # Remove trailing commas
-                json_str = re.sub(r',\s*]', ']', json_str)  # Remove trailing commas in arrays
-                
-                # Parse the JSON
-                parsed = json.loads(json_str)
-                
-                # Map the parsed values to our result structure
-                result['intent'] = parsed.get('intent')
-                result['time'] = parsed.get('time')
-                result['duration'] = parsed.get('duration', 30)
-                result['recipients'] = parsed.get('recipients', [])
-                result['subject'] = parsed.get('subject', '')
-                result['content'] = parsed.get('content', '')
-                result['generate_joke'] = parsed.get('generate_joke', False)
-                result['joke_topic'] = parsed.get('joke_topic', '')
-                result['is_recurring'] = parsed.get('is_recurring', False)
-                result['recurrence_rule'] = parsed.get('recurrence_rule', '')
-
-                # Convert string recipients to list if needed
-                if isinstance(result['recipients'], str):
-                    result['recipients'] = [result['recipients']]
-
-                # Convert duration to integer if it's a string
-                if isinstance(result['duration'], str):
-                    try:
-                        result['duration'] = int(result['duration'])
-                    except ValueError:
-                        result['duration'] = 30
-
-                # Parse time if it's a string
-                if isinstance(result['time'], str) and result['time']:
-                    result['time'] = self.parse_time(result['time'])
-
-                # Resolve contact names to emails
-                resolved_recipients = []
-                for recipient in result['recipients']:
-                    email = self.resolve_contact(recipient)
-                    if email:
-                        resolved_recipients.append(email)
-                result['recipients'] = resolved_recipients
-
+            # Process the LLM response to extract structured information
+            result = self._process_llm_response(response_text, message)
+            print(f"Processed result: {result}")
+            if result['intent']:
+                self.intent_cache.put(cache_key, result)
+            return result
         except Exception as e:
-            print(f"Error parsing LLM response: {str(e)}")
-            print(f"Raw response: {llm_response}")
-            # Fall back to basic intent detection if JSON parsing fails
-            if any(word in original_message.lower() for word in ['meeting', 'schedule', 'set up']):
-                result['intent'] = 'schedule_meeting'
-            elif any(word in original_message.lower() for word in ['email', 'send', 'message']):
-                result['intent'] = 'send_email'
-            elif any(word in original_message.lower() for word in ['help', 'what can you do']):
-                result['intent'] = 'help'
-
-        return result 
-
-    def generate_joke(self, topic="computer"):
-        """Generate a joke about a specific topic using LLM"""
+            print(f"Error in LLM understanding: {str(e)}")
+            print(f"Error type: {type(e)}")
+            return None
+
+    def summarize_history(self, summary, lines, max_tokens):
+        """Fold lines evicted from the verbatim history into the rolling summary"""
+        prompt = _SUMMARY_PROMPT.format(words=max(max_tokens * 3 // 4, 1), summary=summary or "(none yet)",
+                                        messages="\n".join(lines))
+        return self._generate(prompt, task=INTENT)
+
+    def _result_from_parsed(self, parsed):
+        """Map the model's JSON object onto the result structure, coercing loosely typed values"""
+        result = self._empty_result()
+        result['intent'] = _text_field(parsed, 'intent') or None
+        result['subject'] = _text_field(parsed, 'subject')
+        result['content'] = _text_field(parsed, 'content')
+        result['generate_joke'] = _flag_field(parsed, 'generate_joke')
+        result['joke_topic'] = _text_field(parsed, 'joke_topic')
+        result['is_recurring'] = _flag_field(parsed, 'is_recurring')
+        result['recurrence_rule'] = _text_field(parsed, 'recurrence_rule')
+
+        # Duration may come back as 45, "45", "45 minutes" or "1 hour"
+        duration = parsed.get('duration')
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            result['duration'] = int(duration)
+        elif isinstance(duration, str):
+            result['duration'] = temporal_parser.parse_duration(duration, default=result['duration'])
+
+        # Parse time if it's a string
+        if _text_field(parsed, 'time'):
+            result['time_text'] = _text_field(parsed, 'time')
+            result['time'] = self.parse_time(result['time_text'])
+
+        # Resolve contact names to emails; a single recipient may come back as a plain string
+        recipients = parsed.get('recipients') or []
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        for recipient in recipients if isinstance(recipients, list) else []:
+            email = self.resolve_contact(recipient) if isinstance(recipient, str) else None
+            if email:
+                result['recipients'].append(email)
+            elif isinstance(recipient, str) and recipient.strip():
+                result['unresolved_recipients'].append(recipient.strip())
+        return result
+
+    def _process_llm_response(self, llm_response, original_message):
+        """Process LLM response and extract structured information
+
+        Fenced, commented, single-quoted and truncated replies are repaired by
+        extract_json_object; keywords are only used when the reply has no object at all.
+        """
+        parsed = extract_json_object(llm_response)
+        if parsed is not None:
+            return self._result_from_parsed(parsed)
+
+        print(f"No JSON object in LLM response: {llm_response}")
+        result = self._empty_result()
+        # Fall back to basic intent detection
+        if any(word in original_message.lower() for word in ['meeting', 'schedule', 'set up']):
+            result['intent'] = 'schedule_meeting'
+        elif any(word in original_message.lower() for word in ['email', 'send', 'message']):
+            result['intent'] = 'send_email'
+        elif any(word in original_message.lower() for word in ['help', 'what can you do']):
+            result['intent'] = 'help'
+        return result
+
+    def generate_joke(self, topic="computer", on_token=None):
+        """Generate a joke about a specific topic using LLM, streaming it to on_token when given"""
         print(f"Generating joke about: {topic}")
         
         joke_prompt = f"""Generate a funny joke about {topic}. 
@@ -264,13 +386,9 @@ class LLMService:
         Return only the joke text, no additional formatting or explanation."""
         
         try:
-            response = self.ollama_client.generate(
-                model=OLLAMA_MODEL,
-                prompt=joke_prompt
-            )
-            joke = response['response'].strip()
+            joke = self._generate(joke_prompt, on_token, task=JOKE).strip()
             print(f"Generated joke: {joke}")
             return joke
         except Exception as e:
             print(f"Error generating joke: {str(e)}")
-            return f"Here's a classic computer joke: Why do programmers prefer dark mode? Because light attracts bugs!" 
\ No newline at end of file
+            return FALLBACK_JOKE 
\ No newline at end of file
@@ -0,0 +1,219 @@
+import heapq
+import json
+import os
+import smtplib
+import threading
+import time
+import uuid
+from email.utils import getaddresses
+from config import *
+from smtp_pool import get_smtp_pool
+
+QUEUED = 'queued'
+RETRYING = 'retrying'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+class MailQueue:
+    """Outbound mail queue backed by an on-disk spool and drained by retry workers"""
+
+    def __init__(self, spool_dir=None, pool=None, workers=None, max_attempts=None,
+                 retry_base_delay=None, retry_max_delay=None, retention=None):
+        self.spool_dir = spool_dir or MAIL_SPOOL_DIR
+        self.pool = pool or get_smtp_pool()
+        self.workers = workers or MAIL_QUEUE_WORKERS
+        self.max_attempts = max_attempts or MAIL_MAX_ATTEMPTS
+        self.retry_base_delay = MAIL_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.retry_max_delay = MAIL_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        self.retention = MAIL_SPOOL_RETENTION if retention is None else retention
+
+        self._records = {}  # message id -> spool record
+        self._due = []  # heap of (next_attempt, message id)
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._last_prune = 0
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def _path(self, message_id):
+        return os.path.join(self.spool_dir, f"{message_id}.json")
+
+    def _write(self, record):
+        """Atomically persist a spool record"""
+        path = self._path(record['id'])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def _load_spool(self):
+        """Reload undelivered messages left behind by a previous run"""
+        for name in os.listdir(self.spool_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.spool_dir, name)) as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable spool file {name}: {str(e)}")
+                continue
+            self._records[record['id']] = record
+            if record['status'] in (QUEUED, RETRYING):
+                heapq.heappush(self._due, (record['next_attempt'], record['id']))
+        if self._due:
+            print(f"Recovered {len(self._due)} undelivered message(s) from {self.spool_dir}")
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+            self._load_spool()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"mail-queue-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, msg, from_addr=None, to_addrs=None):
+        """Spool a message for delivery and return its id immediately"""
+        if from_addr is None:
+            from_addr = msg['Sender'] or msg['From']
+        if to_addrs is None:
+            fields = msg.get_all('To', []) + msg.get_all('Cc', []) + msg.get_all('Bcc', [])
+            to_addrs = [address for _, address in getaddresses(fields)]
+        elif isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        del msg['Bcc']
+        return self.enqueue_raw(from_addr, to_addrs, msg.as_string())
+
+    def enqueue_raw(self, from_addr, to_addrs, raw_message):
+        """Spool an already serialized message and return its id immediately"""
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        now = time.time()
+        record = {
+            'id': uuid.uuid4().hex,
+            'status': QUEUED,
+            'from': from_addr,
+            'to': list(to_addrs),
+            'raw': raw_message,
+            'attempts': 0,
+            'next_attempt': now,
+            'last_error': None,
+            'created_at': now,
+            'sent_at': None
+        }
+        self._write(record)
+        with self._condition:
+            self._records[record['id']] = record
+            heapq.heappush(self._due, (now, record['id']))
+            self._condition.notify()
+        return record['id']
+
+    def status(self, message_id):
+        """Return the delivery status of a queued message, or None if unknown"""
+        with self._condition:
+            record = self._records.get(message_id)
+            if record is None:
+                return None
+            return {key: value for key, value in record.items() if key != 'raw'}
+
+    def _next_due(self):
+        """Block until a message is due and claim it"""
+        with self._condition:
+            while self._running:
+                self._prune()
+                if self._due:
+                    next_attempt, message_id = self._due[0]
+                    wait = next_attempt - time.time()
+                    if wait <= 0:
+                        heapq.heappop(self._due)
+                        record = self._records.get(message_id)
+                        if record and record['status'] in (QUEUED, RETRYING):
+                            return record
+                        continue
+                else:
+                    wait = None
+                self._condition.wait(wait)
+            return None
+
+    def _worker(self):
+        while True:
+            record = self._next_due()
+            if record is None:
+                return
+            self._deliver(record)
+
+    def _is_permanent(self, error):
+        if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+            return True
+        return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+    def _deliver(self, record):
+        try:
+            self.pool.sendmail(record['from'], record['to'], record['raw'])
+            error = None
+        except Exception as e:
+            error = e
+
+        with self._condition:
+            record['attempts'] += 1
+            if error is None:
+                record['status'] = SENT
+                record['sent_at'] = time.time()
+                record['last_error'] = None
+                record.pop('raw', None)
+            else:
+                record['last_error'] = f"{type(error).__name__}: {str(error)}"
+                if self._is_permanent(error) or record['attempts'] >= self.max_attempts:
+                    print(f"Giving up on message {record['id']}: {record['last_error']}")
+                    record['status'] = FAILED
+                    record.pop('raw', None)
+                else:
+                    delay = min(self.retry_base_delay * 2 ** (record['attempts'] - 1), self.retry_max_delay)
+                    record['status'] = RETRYING
+                    record['next_attempt'] = time.time() + delay
+                    print(f"Delivery of {record['id']} failed, retrying in {delay:.0f}s: {record['last_error']}")
+                    heapq.heappush(self._due, (record['next_attempt'], record['id']))
+                    self._condition.notify()
+            self._write(record)
+
+    def _prune(self):
+        """Forget delivered and failed messages older than the retention period"""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        cutoff = now - self.retention
+        expired = [message_id for message_id, record in self._records.items()
+                   if record['status'] in (SENT, FAILED) and (record['sent_at'] or record['created_at']) < cutoff]
+        for message_id in expired:
+            del self._records[message_id]
+            try:
+                os.remove(self._path(message_id))
+            except OSError:
+                pass
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_mail_queue(name='default', pool=None):
+    """Return the started, process-wide mail queue with the given spool name"""
+    with _queues_lock:
+        queue = _queues.get(name)
+        if queue is None:
+            queue = MailQueue(spool_dir=os.path.join(MAIL_SPOOL_DIR, name), pool=pool).start()
+            _queues[name] = queue
+        return queue
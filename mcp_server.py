@@ -1,15 +1,20 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response
 from flask_cors import CORS
+import hashlib
 import json
 from datetime import datetime, timedelta
 import os
+import threading
 from functools import wraps
-import re
-from email.parser import Parser
-from email.policy import default
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from smtp_pool import get_smtp_pool
+from mail_queue import get_mail_queue
+from email_templates import get_template_engine
+import temporal_parser
+from mcp_storage import open_storage
+from meeting_query import QueryError, parse_query, page_response, iter_ndjson
+from context_retrieval import ContextRetriever
+from inbound_email import ExtractionError, parse_message, iter_mbox, extract_meeting, process_all
+from pending_lifecycle import PendingLifecycle, parse_ttl
 
 app = Flask(__name__)
 CORS(app)
@@ -20,11 +25,34 @@ SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
 SMTP_EMAIL = os.getenv('SMTP_EMAIL')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+# Base URL for links in mail sent outside a request (pending request reminders)
+PUBLIC_URL = os.getenv('MCP_PUBLIC_URL', 'http://localhost:8000').rstrip('/')
 
-# In-memory storage for meetings and context
-meetings = []
-context_history = []
-pending_meetings = {}  # Store pending meeting requests that need confirmation
+# Meetings and pending meeting requests that need confirmation (MCP_STORAGE_BACKEND: memory or sqlite)
+storage = None
+
+# BM25 index over the stored meetings, used to pick the context for new agendas. It is
+# caught up from storage before each ranking, so meetings stored by other workers count too.
+retriever = None
+
+# Expires unanswered meeting requests (and reminds participants first when PENDING_REMINDER_BEFORE is set)
+pending_requests = None
+
+_services_lock = threading.Lock()
+
+# Context responses carry the store version in their ETag. It is read from storage, so
+# every worker sharing a database hands out the same tag for the same meetings.
+def store_version():
+    return f"{storage.store_id}-{storage.meeting_version()}"
+
+def context_etag(version, topic, participants, history_length):
+    """ETag for a /context answer: the store version plus a hash of the normalized query,
+    so a tag handed out for one query never validates another"""
+    addresses = sorted({p.strip().lower() for p in participants or [] if isinstance(p, str)})
+    query = f"{topic.strip().lower()}|{','.join(addresses)}|{history_length}"
+    return f"{version}-{hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]}"
+
+smtp_pool = get_smtp_pool(SMTP_SERVER, SMTP_PORT, SMTP_EMAIL, SMTP_PASSWORD)
 
 def require_api_key(f):
     @wraps(f)
@@ -34,43 +62,46 @@ def require_api_key(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def store_meeting(meeting):
+    """Save a meeting; /context indexes it from storage on its next request"""
+    return storage.add_meeting(meeting)
+
+def send_reminder_email(pending):
+    """Queue a reminder for a meeting request that is about to expire unanswered"""
+    participants = pending['participants']
+    email = get_template_engine().render('meeting_reminder', meeting=pending, participants=participants,
+                                         confirmation_link=f"{PUBLIC_URL}/confirm_meeting/{pending['id']}")
+    get_mail_queue('mcp', pool=smtp_pool).enqueue_raw(SMTP_EMAIL, participants, email.as_string(SMTP_EMAIL, participants))
+
+def start_services():
+    """Open storage, index its meetings and start the pending request sweeper; once per process
+
+    Not done at import: the debug reloader imports this module in a watcher process that
+    never serves requests, and tools that only import it should not start threads.
+    """
+    global storage, retriever, pending_requests
+    if pending_requests is not None:
+        return
+    with _services_lock:
+        if pending_requests is None:
+            storage = open_storage()
+            retriever = ContextRetriever()
+            retriever.sync(storage)
+            pending_requests = PendingLifecycle(storage, on_reminder=send_reminder_email).start()
+
+@app.before_request
+def ensure_services():
+    start_services()
+
 def send_confirmation_email(meeting, participants):
-    """Send confirmation email to all participants"""
+    """Queue a confirmation email to all participants"""
     try:
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"Meeting Confirmed: {meeting['subject']}"
-        msg['From'] = SMTP_EMAIL
-        msg['To'] = ', '.join(participants)
-        
-        html = f"""
-        <html>
-            <body>
-                <h2>Meeting Confirmed</h2>
-                <p>Your meeting has been confirmed with the following details:</p>
-                
-                <ul>
-                    <li><strong>Subject:</strong> {meeting['subject']}</li>
-                    <li><strong>Start Time:</strong> {meeting['start_time']}</li>
-                    <li><strong>Duration:</strong> {meeting['duration']} minutes</li>
-                    <li><strong>Participants:</strong> {', '.join(participants)}</li>
-                </ul>
-                
-                <p>This meeting has been added to your calendar.</p>
-                
-                <h3>Meeting Details:</h3>
-                <pre style="white-space: pre-wrap;">{meeting['content']}</pre>
-            </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(html, 'html'))
+        email = get_template_engine().render('meeting_confirmed', meeting=meeting, participants=participants)
+        raw_message = email.as_string(SMTP_EMAIL, participants)
         
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        message_id = get_mail_queue('mcp', pool=smtp_pool).enqueue_raw(SMTP_EMAIL, participants, raw_message)
             
-        return True, "Confirmation email sent successfully"
+        return True, f"Confirmation email queued ({message_id})"
     except Exception as e:
         return False, f"Failed to send confirmation email: {str(e)}"
 
@@ -80,8 +111,11 @@ def index():
         'status': 'running',
         'message': 'MCP Server is running',
         'endpoints': {
-            '/context': 'POST - Get meeting context',
-            '/meetings': 'GET/POST - Manage meetings'
+            '/context': 'POST - Get meeting context (ETag / If-None-Match aware)',
+            '/meetings': 'GET/POST - Manage meetings',
+            '/meetings/export': 'GET - Stream all meetings as NDJSON',
+            '/process_email/batch': 'POST - Process many emails (JSON list or application/mbox)',
+            '/pending/stats': 'GET - Meeting request lifecycle counts'
         }
     })
 
@@ -97,16 +131,28 @@ def get_context():
         participants = data.get('participants', [])
         history_length = data.get('history_length', 10)
         
-        # Get relevant context from history
-        relevant_context = []
-        for meeting in meetings[-history_length:]:
-            if topic.lower() in meeting['subject'].lower() or any(p in meeting['participants'] for p in participants):
-                relevant_context.append(meeting)
+        # Read before catching up and ranking, so the tag never claims meetings the answer does not include
+        version = store_version()
+        etag = context_etag(version, topic, participants, history_length)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
         
-        return jsonify({
+        # The best-scoring past meetings, most relevant first, within the prompt's token budget
+        retriever.sync(storage)
+        if topic.strip() or participants:
+            relevant_context = retriever.retrieve(topic, participants, history_length)
+        else:
+            relevant_context = retriever.recent(history_length)
+        
+        response = jsonify({
             'context': json.dumps(relevant_context),
+            'version': version,
             'status': 'success'
         })
+        response.set_etag(etag)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -124,7 +170,6 @@ def create_meeting():
                 return jsonify({'error': f'Missing required field: {field}'}), 400
 
         meeting = {
-            'id': len(meetings) + 1,
             'subject': data['subject'],
             'start_time': data['start_time'],
             'end_time': data['end_time'],
@@ -136,7 +181,7 @@ def create_meeting():
             'created_at': datetime.now().isoformat()
         }
         
-        meetings.append(meeting)
+        meeting = store_meeting(meeting)
         return jsonify(meeting)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -144,7 +189,53 @@ def create_meeting():
 @app.route('/meetings', methods=['GET'])
 @require_api_key
 def get_meetings():
-    return jsonify(meetings)
+    """One page of meetings; see meeting_query for the filters and cursor"""
+    try:
+        query = parse_query(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    page, next_id = storage.query_meetings(query)
+    return jsonify(page_response(page, next_id, query['fields']))
+
+@app.route('/meetings/export', methods=['GET'])
+@require_api_key
+def export_meetings():
+    """Every matching meeting as NDJSON, read from storage a chunk at a time while streaming"""
+    try:
+        query = parse_query(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(iter_ndjson(storage.query_meetings, query), mimetype='application/x-ndjson')
+
+@app.route('/email_status/<message_id>', methods=['GET'])
+@require_api_key
+def email_status(message_id):
+    status = get_mail_queue('mcp', pool=smtp_pool).status(message_id)
+    if status is None:
+        return jsonify({'error': 'Unknown message id'}), 404
+    return jsonify(status)
+
+def register_meeting_request(message, base_url, ttl=None):
+    """Extract a meeting request from a parsed email and store it pending confirmation for ttl seconds"""
+    pending_meeting = extract_meeting(message)
+    pending_meeting.update({
+        'status': 'pending',
+        'created_at': datetime.now().isoformat(),
+        'expires_at': pending_requests.expires_at(ttl)
+    })
+    pending_meeting = storage.add_pending(pending_meeting)
+    pending_requests.track(pending_meeting)
+    meeting_id = pending_meeting['id']
+    return {
+        'status': 'pending_confirmation',
+        'meeting_id': meeting_id,
+        'confirmation_link': f"{base_url}/confirm_meeting/{meeting_id}",
+        'meeting_details': pending_meeting
+    }
+
+def confirmation_base_url():
+    # Get the base URL of the server
+    return request.host_url.rstrip('/') or "http://localhost:8000"
 
 @app.route('/process_email', methods=['POST'])
 @require_api_key
@@ -157,73 +248,61 @@ def process_email():
         email_content = data.get('email_content', '')
         if not email_content:
             return jsonify({'error': 'No email content provided'}), 400
-            
-        # Parse email content
-        email = Parser(policy=default).parsestr(email_content)
-        
-        # Extract meeting details using regex patterns
-        subject = email.get('subject', '')
-        body = email.get_payload()
-        
-        # Format the email content to preserve structure
-        formatted_content = body.strip().replace('\n', '<br>')
-        
-        # Look for common meeting patterns
-        time_pattern = r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)|tomorrow at \d{1,2}:\d{2}\s*(?:AM|PM|am|pm)|today at \d{1,2}:\d{2}\s*(?:AM|PM|am|pm))'
-        duration_pattern = r'(\d+)\s*(?:min|minutes|hour|hours)'
-        participants_pattern = r'(?:^|\s)([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        
-        # Extract details
-        time_match = re.search(time_pattern, body, re.IGNORECASE)
-        duration_match = re.search(duration_pattern, body, re.IGNORECASE)
-        participants = re.findall(participants_pattern, body)
-        
-        # Clean up email addresses and remove duplicates
-        participants = list(set([email.strip('- ') for email in participants]))
-        
-        # Extract duration in minutes
-        duration = 30  # default duration
-        if duration_match:
-            duration_value = int(duration_match.group(1))
-            if 'hour' in duration_match.group(0).lower():
-                duration = duration_value * 60
-            else:
-                duration = duration_value
-        
-        if not time_match or not participants:
-            return jsonify({'error': 'Could not extract meeting details from email'}), 400
-            
-        # Create pending meeting request
-        meeting_id = len(pending_meetings) + 1
-        pending_meeting = {
-            'id': meeting_id,
-            'subject': subject,
-            'proposed_time': time_match.group(1),
-            'duration': duration,
-            'participants': participants,
-            'content': formatted_content,
-            'status': 'pending',
-            'created_at': datetime.now().isoformat()
-        }
-        
-        pending_meetings[meeting_id] = pending_meeting
-        
-        # Create full confirmation URL
-        base_url = request.host_url.rstrip('/')  # Get the base URL of the server
-        if not base_url:
-            base_url = "http://localhost:8000"  # Default fallback URL
-        confirmation_url = f"{base_url}/confirm_meeting/{meeting_id}"
-        
-        return jsonify({
-            'status': 'pending_confirmation',
-            'meeting_id': meeting_id,
-            'confirmation_link': confirmation_url,
-            'meeting_details': pending_meeting
-        })
         
+        return jsonify(register_meeting_request(parse_message(email_content), confirmation_base_url(),
+                                                parse_ttl(data.get('ttl'))))
+    except ValueError as e:
+        # No meeting details (ExtractionError) or a malformed ttl
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/process_email/batch', methods=['POST'])
+@require_api_key
+def process_email_batch():
+    """Many inbound emails at once: {"messages": [raw, ...], "ttl": seconds} or an application/mbox body (?ttl=)
+
+    Messages are handled on the inbound worker pool; results come back in input order, one
+    per message, with the /process_email response or an error.
+    """
+    base_url = confirmation_base_url()
+    ttl = request.args.get('ttl')
+    if request.mimetype == 'application/mbox':
+        messages = iter_mbox(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('messages'), list):
+            return jsonify({'error': 'Provide {"messages": [...]} or an application/mbox body'}), 400
+        messages = data['messages']
+        ttl = data.get('ttl', ttl)
+    try:
+        ttl = parse_ttl(ttl)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def handle(message):
+        try:
+            return register_meeting_request(parse_message(message), base_url, ttl)
+        except ExtractionError as e:
+            return {'status': 'error', 'error': str(e)}
+        except Exception as e:
+            return {'status': 'error', 'error': f"Failed to process email: {str(e)}"}
+
+    results = list(process_all(messages, handle))
+    pending = sum(1 for result in results if result['status'] == 'pending_confirmation')
+    return jsonify({
+        'results': results,
+        'processed': len(results),
+        'pending_confirmation': pending,
+        'errors': len(results) - pending
+    })
+
+@app.route('/pending/stats', methods=['GET'])
+@require_api_key
+def pending_stats():
+    """Open, confirmed, rejected, expired and evicted meeting requests"""
+    return jsonify(pending_requests.stats())
+
 @app.route('/confirm_meeting/<int:meeting_id>', methods=['GET', 'POST'])
 def confirm_meeting(meeting_id):
     try:
@@ -244,38 +323,39 @@ def confirm_meeting(meeting_id):
         if not action:
             return jsonify({'error': 'Confirmation status not provided'}), 400
             
-        if meeting_id not in pending_meetings:
+        meeting = storage.get_pending(meeting_id)
+        if meeting is None:
             return jsonify({'error': 'Meeting request not found'}), 404
-            
-        meeting = pending_meetings[meeting_id]
+        if pending_requests.is_overdue(meeting):
+            pending_requests.expire(meeting_id)
+            return jsonify({'error': 'Meeting request expired'}), 410
         
         if action == 'confirm' or action is True:
-            # Convert proposed time to datetime
-            proposed_time = meeting['proposed_time']
-            if 'tomorrow' in proposed_time.lower():
-                start_time = datetime.now() + timedelta(days=1)
-            elif 'today' in proposed_time.lower():
-                start_time = datetime.now()
-            else:
-                # Parse time string
-                start_time = datetime.strptime(proposed_time, '%I:%M %p')
-                if start_time < datetime.now():
-                    start_time += timedelta(days=1)
+            # Convert proposed time to datetime; "today"/"tomorrow" are relative to when the email arrived
+            start_time = temporal_parser.parse_time(meeting['proposed_time'],
+                                                    reference=datetime.fromisoformat(meeting['created_at']),
+                                                    prefer_future=True)
+            if start_time is None:
+                return jsonify({'error': f"Could not parse proposed time '{meeting['proposed_time']}'"}), 400
+            
+            # Claim the request so a second confirmation of the same link cannot create it twice
+            if storage.take_pending(meeting_id) is None:
+                return jsonify({'error': 'Meeting request not found'}), 404
+            pending_requests.resolve(meeting_id, 'confirmed')
             
             # Create the meeting
             meeting = {
-                'id': len(meetings) + 1,
                 'subject': meeting['subject'],
                 'start_time': start_time.isoformat(),
                 'end_time': (start_time + timedelta(minutes=meeting['duration'])).isoformat(),
+                'duration': meeting['duration'],
                 'participants': meeting['participants'],
                 'content': meeting['content'],
                 'timezone': 'UTC',
                 'created_at': datetime.now().isoformat()
             }
             
-            meetings.append(meeting)
-            del pending_meetings[meeting_id]
+            meeting = store_meeting(meeting)
             
             # Send confirmation emails
             success, message = send_confirmation_email(meeting, meeting['participants'])
@@ -290,7 +370,8 @@ def confirm_meeting(meeting_id):
             })
         else:
             # Meeting rejected
-            del pending_meetings[meeting_id]
+            if storage.take_pending(meeting_id) is not None:
+                pending_requests.resolve(meeting_id, 'rejected')
             if request.method == 'GET':
                 return render_template('confirmation_rejected.html')
             return jsonify({
@@ -308,9 +389,17 @@ if __name__ == '__main__':
     print(f"API Key: {API_KEY}")
     print("Available endpoints:")
     print("- GET  / : Server status")
-    print("- POST /context : Get meeting context")
-    print("- GET  /meetings : List all meetings")
+    print("- POST /context : Get meeting context (send If-None-Match to get 304 when nothing changed)")
+    print("- GET  /meetings : List meetings a page at a time (filters: participant, start_from, start_to, status)")
+    print("- GET  /meetings/export : Stream all matching meetings as NDJSON")
     print("- POST /meetings : Create a new meeting")
     print("- POST /process_email : Process an email and schedule a meeting")
+    print("- POST /process_email/batch : Process many emails (JSON list or application/mbox)")
     print("- POST /confirm_meeting/<meeting_id> : Confirm or reject a meeting")
+    print("- GET  /pending/stats : Pending, confirmed, rejected and expired meeting request counts")
+    print("- GET  /email_status/<message_id> : Delivery status of a queued email")
+    # The reloader re-runs this file in a child process that does the serving; start the
+    # services there before the first request rather than in the watching parent
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_services()
     app.run(host='0.0.0.0', port=8000, debug=True) 
\ No newline at end of file
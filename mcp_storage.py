@@ -0,0 +1,352 @@
+"""Storage backends for the MCP server's meetings and pending meeting requests
+
+MemoryStorage keeps everything in process, as the server always has. SQLiteStorage keeps
+it in a WAL-mode database so it survives restarts and can be shared by several worker
+processes. Reads check a connection out of a bounded pool and return it afterwards. Writes go through a single writer thread
+that commits whatever has queued up in one transaction (group commit). A caller still
+gets its row id back only once that transaction is durable.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from config import *
+from meeting_index import MeetingIndex
+from meeting_query import SCHEDULED, matches
+
+PENDING = 'pending'
+
+
+class MemoryStorage:
+    """Meetings and pending requests in process memory; lost on restart"""
+
+    def __init__(self):
+        self._meetings = []  # id - 1 -> meeting
+        self._pending = {}
+        self._next_pending_id = 1
+        self._index = MeetingIndex()
+        self._lock = threading.Lock()
+        self.store_id = uuid.uuid4().hex[:12]  # nothing outlives the process
+
+    def add_meeting(self, meeting):
+        with self._lock:
+            meeting = {'id': len(self._meetings) + 1, **meeting}
+            self._meetings.append(meeting)
+            self._index.add(meeting)
+            return meeting
+
+    def get_meeting(self, meeting_id):
+        with self._lock:
+            return self._meetings[meeting_id - 1] if 0 < meeting_id <= len(self._meetings) else None
+
+    def list_meetings(self):
+        with self._lock:
+            return list(self._meetings)
+
+    def meeting_count(self):
+        return len(self._meetings)
+
+    def meeting_version(self):
+        """Changes whenever a meeting is added; meetings are never updated or deleted"""
+        return len(self._meetings)
+
+    def query_meetings(self, query):
+        """One page of meetings with id above query['after'] that pass the filters; returns (page, last id or None)"""
+        after, limit = query['after'], query['limit']
+        if query.get('participant'):
+            ids = self._index.participant_ids(query['participant'], after)
+        else:
+            ids = range(after + 1, len(self._meetings) + 1)
+        page = []
+        with self._lock:
+            for position, meeting_id in enumerate(ids, 1):
+                meeting = self._meetings[meeting_id - 1]
+                if matches(meeting, query):
+                    page.append(meeting)
+                    if len(page) == limit:
+                        return page, meeting_id if position < len(ids) else None
+        return page, None
+
+    def add_pending(self, pending):
+        with self._lock:
+            pending = {'id': self._next_pending_id, **pending}
+            self._next_pending_id += 1
+            self._pending[pending['id']] = pending
+            return pending
+
+    def get_pending(self, pending_id):
+        with self._lock:
+            return self._pending.get(pending_id)
+
+    def list_pending(self):
+        with self._lock:
+            return list(self._pending.values())
+
+    def take_pending(self, pending_id):
+        """Remove and return a pending request; None if it is gone (e.g. confirmed concurrently)"""
+        with self._lock:
+            return self._pending.pop(pending_id, None)
+
+    def close(self):
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meetings_start_time ON meetings (start_time);
+CREATE INDEX IF NOT EXISTS meetings_status ON meetings (status, id);
+CREATE TABLE IF NOT EXISTS meeting_participants (
+    address TEXT NOT NULL,
+    meeting_id INTEGER NOT NULL,
+    PRIMARY KEY (address, meeting_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pending_meetings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pending_meetings_status ON pending_meetings (status, id);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_INSERT_MEETING = "INSERT INTO meetings (subject, start_time, end_time, status, created_at, data) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_PARTICIPANT = "INSERT OR IGNORE INTO meeting_participants (address, meeting_id) VALUES (?, ?)"
+_SELECT_MEETING = "SELECT id, data FROM meetings WHERE id = ?"
+_SELECT_MEETINGS = "SELECT id, data FROM meetings ORDER BY id"
+_COUNT_MEETINGS = "SELECT COUNT(*) FROM meetings"
+_MAX_MEETING_ID = "SELECT MAX(id) FROM meetings"
+_INSERT_STORE_ID = "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)"
+_SELECT_STORE_ID = "SELECT value FROM store_meta WHERE key = 'store_id'"
+_INSERT_PENDING = "INSERT INTO pending_meetings (status, created_at, data) VALUES (?, ?, ?)"
+_SELECT_PENDING = "SELECT id, data FROM pending_meetings WHERE id = ?"
+_SELECT_ALL_PENDING = "SELECT id, data FROM pending_meetings ORDER BY id"
+_DELETE_PENDING = "DELETE FROM pending_meetings WHERE id = ?"
+
+
+def _row(row):
+    if row is None:
+        return None
+    return {'id': row[0], **json.loads(row[1])}
+
+
+class SQLiteStorage:
+    """Meetings and pending requests in a WAL-mode SQLite database"""
+
+    def __init__(self, path=None, batch_size=None, read_connections=None):
+        self.path = path or MCP_DB_PATH
+        self.batch_size = batch_size or MCP_WRITE_BATCH
+        self.read_connections = read_connections or MCP_READ_CONNECTIONS
+        # Idle reader connections, opened on demand up to read_connections
+        self._readers = queue.SimpleQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writes = []  # (future, operation, args)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {'writes': 0, 'transactions': 0}
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        # Identifies this database across processes and restarts, but not a recreated file
+        connection.execute(_INSERT_STORE_ID, (uuid.uuid4().hex[:12],))
+        self.store_id = connection.execute(_SELECT_STORE_ID).fetchone()[0]
+        connection.close()
+        self._writer = threading.Thread(target=self._write_loop, name="mcp-sqlite-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self, synchronous='NORMAL'):
+        # isolation_level=None: transactions are opened explicitly by the writer
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False,
+                                     cached_statements=256)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={synchronous}")
+        return connection
+
+    @contextmanager
+    def _reader(self):
+        """Check out a reader connection, waiting for one when all are in use"""
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                opening = self._reader_count < self.read_connections
+                if opening:
+                    self._reader_count += 1
+            if opening:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._reader_lock:
+                        self._reader_count -= 1
+                    raise
+            else:
+                connection = self._readers.get()
+        try:
+            yield connection
+        finally:
+            if self._closed:
+                connection.close()
+            else:
+                self._readers.put(connection)
+
+    # Writes
+
+    def _write(self, operation, *args):
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Storage is closed")
+            self._writes.append((future, operation, args))
+            self._cond.notify()
+        return future.result()
+
+    def _write_loop(self):
+        # FULL syncs the WAL on every commit; group commit pays that once per batch
+        connection = self._connect(synchronous='FULL')
+        while True:
+            with self._cond:
+                while not self._writes and not self._closed:
+                    self._cond.wait()
+                if not self._writes:
+                    break
+                batch, self._writes = self._writes[:self.batch_size], self._writes[self.batch_size:]
+            results = []
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                for future, operation, args in batch:
+                    # A savepoint per write keeps one bad write from failing the whole batch
+                    connection.execute("SAVEPOINT write")
+                    try:
+                        results.append((future, operation(connection, *args), None))
+                        connection.execute("RELEASE write")
+                    except Exception as e:
+                        connection.execute("ROLLBACK TO write")
+                        connection.execute("RELEASE write")
+                        results.append((future, None, e))
+                connection.execute("COMMIT")
+            except Exception as e:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                results = [(future, None, e) for future, _, _ in batch]
+            self.stats['writes'] += len(batch)
+            self.stats['transactions'] += 1
+            for future, result, error in results:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+        connection.close()
+
+    @staticmethod
+    def _insert_meeting(connection, meeting):
+        meeting_id = connection.execute(_INSERT_MEETING, (
+            meeting.get('subject', ''), meeting.get('start_time'), meeting.get('end_time'),
+            meeting.get('status', SCHEDULED), meeting.get('created_at'), json.dumps(meeting)
+        )).lastrowid
+        participants = {p.strip().lower() for p in meeting.get('participants') or [] if isinstance(p, str)}
+        connection.executemany(_INSERT_PARTICIPANT, [(address, meeting_id) for address in participants])
+        return {'id': meeting_id, **meeting}
+
+    @staticmethod
+    def _insert_pending(connection, pending):
+        pending_id = connection.execute(_INSERT_PENDING, (
+            pending.get('status', PENDING), pending.get('created_at'), json.dumps(pending)
+        )).lastrowid
+        return {'id': pending_id, **pending}
+
+    @staticmethod
+    def _delete_pending(connection, pending_id):
+        pending = _row(connection.execute(_SELECT_PENDING, (pending_id,)).fetchone())
+        if pending is not None:
+            connection.execute(_DELETE_PENDING, (pending_id,))
+        return pending
+
+    def add_meeting(self, meeting):
+        return self._write(self._insert_meeting, {k: v for k, v in meeting.items() if k != 'id'})
+
+    def add_pending(self, pending):
+        return self._write(self._insert_pending, {k: v for k, v in pending.items() if k != 'id'})
+
+    def take_pending(self, pending_id):
+        """Remove and return a pending request; None if it is gone (e.g. confirmed concurrently)"""
+        return self._write(self._delete_pending, pending_id)
+
+    # Reads
+
+    def get_meeting(self, meeting_id):
+        with self._reader() as connection:
+            return _row(connection.execute(_SELECT_MEETING, (meeting_id,)).fetchone())
+
+    def list_meetings(self):
+        with self._reader() as connection:
+            return [_row(row) for row in connection.execute(_SELECT_MEETINGS)]
+
+    def meeting_count(self):
+        with self._reader() as connection:
+            return connection.execute(_COUNT_MEETINGS).fetchone()[0]
+
+    def meeting_version(self):
+        """Changes whenever any process adds a meeting; ids are never reused (AUTOINCREMENT)"""
+        with self._reader() as connection:
+            return connection.execute(_MAX_MEETING_ID).fetchone()[0] or 0
+
+    def query_meetings(self, query):
+        """One page of meetings with id above query['after'] that pass the filters; returns (page, last id or None)"""
+        sql, params = ["SELECT id, data FROM meetings WHERE id > ?"], [query['after']]
+        for clause, key in (("status = ?", 'status'), ("start_time >= ?", 'start_from'), ("start_time < ?", 'start_to')):
+            if query.get(key):
+                sql.append(clause)
+                params.append(query[key])
+        if query.get('participant'):
+            sql.append("id IN (SELECT meeting_id FROM meeting_participants WHERE address = ? AND meeting_id > ?)")
+            params += [query['participant'], query['after']]
+        # One extra row says whether there is a next page
+        with self._reader() as connection:
+            rows = connection.execute(' AND '.join(sql) + " ORDER BY id LIMIT ?", params + [query['limit'] + 1]).fetchall()
+        page = [_row(row) for row in rows[:query['limit']]]
+        return page, page[-1]['id'] if len(rows) > query['limit'] else None
+
+    def get_pending(self, pending_id):
+        with self._reader() as connection:
+            return _row(connection.execute(_SELECT_PENDING, (pending_id,)).fetchone())
+
+    def list_pending(self):
+        with self._reader() as connection:
+            return [_row(row) for row in connection.execute(_SELECT_ALL_PENDING)]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        # Connections still checked out are closed when they come back
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+BACKENDS = {'memory': MemoryStorage, 'sqlite': SQLiteStorage}
+
+
+def open_storage(backend=None, **kwargs):
+    """Create the configured storage backend"""
+    backend = backend or MCP_STORAGE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MCP storage backend: {backend}")
+    return BACKENDS[backend](**kwargs)
@@ -1,82 +1,86 @@
 import os
-import json
 from datetime import datetime, timedelta
 import smtplib
+import queue
+import threading
+import time
+from string import Template
+from concurrent.futures import ThreadPoolExecutor, wait
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import requests
-import ollama
 import re
 from config import *
 from calendar_service import GoogleCalendarService
+from llm_service import LLMService
+from llm_scheduler import AGENDA
+from joke_pool import get_joke_pool
+from agenda_cache import get_agenda_cache
+from context_cache import get_context_cache
+from smtp_pool import get_smtp_pool, is_connection_error
+from mail_queue import get_mail_queue
+from smtp_readiness import get_smtp_readiness
+from email_templates import get_template_engine
 
 class MeetingAutomation:
-    def __init__(self):
+    def __init__(self, llm_service=None):
         print("Initializing Meeting Automation...")
-        print(f"Connecting to Ollama at {OLLAMA_API_URL}")
-        self.ollama_client = ollama.Client(host=OLLAMA_API_URL)
+        self.llm_service = llm_service or LLMService()
+        self.ollama_client = self.llm_service.ollama_client
+        self.joke_pool = get_joke_pool(self.llm_service)
+        self.agenda_cache = get_agenda_cache()
+        self.context_cache = get_context_cache()
+        self.pipeline_executor = ThreadPoolExecutor(max_workers=MEETING_PIPELINE_WORKERS,
+                                                    thread_name_prefix="meeting-pipeline")
         self.mcp_headers = {
             'Authorization': f'Bearer {MCP_API_KEY}',
             'Content-Type': 'application/json'
         }
         self.meeting_history = []
         self.calendar_service = GoogleCalendarService()
+        self.smtp_pool = get_smtp_pool()
+        self.mail_queue = get_mail_queue(pool=self.smtp_pool)
+        self.smtp_readiness = get_smtp_readiness(self.smtp_pool)
+        self.template_engine = get_template_engine()
         print("Meeting Automation initialized successfully!")
 
     def validate_email_config(self):
-        """Validate email configuration"""
-        print("\nValidating email configuration:")
-        print(f"SMTP Server: {SMTP_SERVER}")
-        print(f"SMTP Port: {SMTP_PORT}")
-        print(f"Email: {SMTP_EMAIL}")
-        print(f"Password length: {len(SMTP_PASSWORD) if SMTP_PASSWORD else 0} characters")
-        print(f"First and last character of password: {SMTP_PASSWORD[0]}...{SMTP_PASSWORD[-1]}")
-        print(f"Password contains spaces: {'yes' if ' ' in SMTP_PASSWORD else 'no'}")
-        
-        if not SMTP_EMAIL or not SMTP_PASSWORD:
-            raise ValueError("Email or password is missing in .env file")
-        
-        if '@' not in SMTP_EMAIL:
-            raise ValueError("Invalid email format")
-        
-        if len(SMTP_PASSWORD) != 16:
-            raise ValueError(f"App password should be exactly 16 characters (current length: {len(SMTP_PASSWORD)})")
-            
-        print("Email configuration validation completed")
+        """Validate email configuration (checked once at startup and cached)"""
+        if self.smtp_readiness.config_errors:
+            raise ValueError("; ".join(self.smtp_readiness.config_errors))
 
     def test_smtp_connection(self):
-        """Test SMTP connection without sending email"""
-        print("\nTesting SMTP connection...")
-        try:
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                print("1. Successfully connected to SMTP server")
-                server.starttls()
-                print("2. Successfully started TLS")
-                server.login(SMTP_EMAIL, SMTP_PASSWORD)
-                print("3. Successfully logged in")
-                return True
-        except Exception as e:
-            print(f"SMTP test failed: {str(e)}")
-            return False
+        """Re-run the SMTP connectivity probe on a pooled session"""
+        return self.smtp_readiness.probe()
 
     def get_context(self, topic, participants):
-        """Get relevant context from MCP"""
+        """Get relevant context from MCP, revalidating a cached answer with its ETag"""
         print(f"Getting context for topic: {topic}")
         context_prompt = {
             "topic": topic,
             "participants": participants,
             "history_length": MAX_HISTORY_LENGTH
         }
+        cache_key = self.context_cache.key(topic, participants, MAX_HISTORY_LENGTH)
+        cached = self.context_cache.get(cache_key)
+        headers = self.mcp_headers
+        if cached is not None:
+            headers = dict(headers, **{'If-None-Match': cached[0]})
         
         try:
             response = requests.post(
                 f"{MCP_API_URL}/context",
-                headers=self.mcp_headers,
+                headers=headers,
                 json=context_prompt
             )
             
-            if response.status_code == 200:
+            if response.status_code == 304 and cached is not None:
+                self.context_cache.not_modified()
+                print("Context unchanged since last request")
+                return cached[1]
+            elif response.status_code == 200:
                 context = response.json().get('context', '')
+                self.context_cache.put(cache_key, response.headers.get('ETag'), context)
                 print("Context retrieved successfully")
                 return context
             else:
@@ -84,12 +88,27 @@ class MeetingAutomation:
                 return ''
         except requests.exceptions.RequestException as e:
             print(f"Error connecting to MCP server: {str(e)}")
-            return ''
+            context = self.context_cache.fallback(cache_key)
+            return context if context is not None else ''
+
+    def generate_meeting_content(self, topic, participants, on_token=None, context=None):
+        """Generate meeting content using Ollama AI with MCP context
 
-    def generate_meeting_content(self, topic, participants):
-        """Generate meeting content using Ollama AI with MCP context"""
+        on_token, when given, receives the agenda text as it streams in. context, when given,
+        is MCP context that was already fetched.
+        """
         print(f"Generating meeting content for: {topic}")
-        context = self.get_context(topic, participants)
+        if context is None:
+            context = self.get_context(topic, participants)
+        
+        # Recurring meetings and same-named stand-ups reuse an agenda generated for the same context
+        cache_key = self.agenda_cache.key(topic, participants, context)
+        cached = self.agenda_cache.get(cache_key)
+        if cached is not None:
+            print("Meeting content served from agenda cache")
+            if on_token:
+                on_token(cached)
+            return cached
         
         prompt = f"""
         Based on the following context:
@@ -104,35 +123,113 @@ class MeetingAutomation:
         """
         
         try:
-            response = self.ollama_client.generate(
-                model=OLLAMA_MODEL,
-                prompt=prompt
-            )
+            if on_token is None:
+                content = self.ollama_client.generate(prompt=prompt, task=AGENDA)['response']
+            else:
+                parts = []
+                for chunk in self.ollama_client.generate(prompt=prompt, stream=True, task=AGENDA):
+                    parts.append(chunk['response'])
+                    on_token(chunk['response'])
+                content = ''.join(parts)
             print("Meeting content generated successfully")
-            return response['response']
+            self.agenda_cache.put(cache_key, content)
+            return content
         except Exception as e:
             print(f"Error generating meeting content: {str(e)}")
             return "Meeting agenda could not be generated. Please prepare manually."
 
-    def schedule_meeting(self, subject, start_time, participants, duration=DEFAULT_MEETING_DURATION, is_recurring=False, recurrence_rule=''):
-        """Schedule a meeting using MCP and Google Calendar"""
+    def _timed(self, timings, stage, func, *args, **kwargs):
+        """Run one pipeline stage, recording its duration in seconds"""
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = round(time.perf_counter() - started, 3)
+
+    def _record_meeting(self, meeting_data):
+        """Store a scheduled meeting in MCP and return MCP's copy"""
+        try:
+            # Send to MCP
+            response = requests.post(
+                f"{MCP_API_URL}/meetings",
+                headers=self.mcp_headers,
+                json=meeting_data
+            )
+            
+            if response.status_code == 200:
+                meeting = response.json()
+                self.meeting_history.append(meeting)
+                self.agenda_cache.on_meeting_recorded(meeting)
+                print("Meeting scheduled successfully")
+                return meeting
+            else:
+                print(f"Error scheduling meeting: {response.text}")
+                raise Exception(f"Failed to schedule meeting: {response.text}")
+        except requests.exceptions.RequestException as e:
+            print(f"Error connecting to MCP server: {str(e)}")
+            raise
+
+    def _patch_agenda(self, event_id, agenda):
+        try:
+            self.calendar_service.update_description(event_id, agenda)
+        except Exception:
+            # The agenda still reaches MCP and the confirmation email
+            pass
+
+    def _cancel_event(self, event_id):
+        """Undo the calendar stage of a pipeline that failed later on"""
+        try:
+            self.calendar_service.delete_meeting(event_id)
+            print(f"Cancelled calendar event {event_id}")
+        except Exception as e:
+            print(f"Warning: calendar event {event_id} could not be cancelled: {str(e)}")
+
+    def run_scheduling_pipeline(self, subject, start_time, participants, duration=DEFAULT_MEETING_DURATION,
+                                is_recurring=False, recurrence_rule='', on_token=None, confirmation=None):
+        """Schedule a meeting with independent stages running concurrently
+
+        The calendar event is created with a placeholder description while MCP context is
+        fetched and the agenda generated; the agenda is then patched into the event while the
+        meeting is recorded in MCP and, if confirmation is 'send' or 'queue', the confirmation
+        email goes out. Returns {'meeting', 'message_id', 'confirmation_error', 'timings'} with
+        per-stage seconds.
+
+        The confirmation does not wait for the MCP record, which saves a round trip but means
+        it can go out for a meeting MCP then fails to store. In that case the calendar event is
+        cancelled; attendees get Google's cancellation notice, which corrects a confirmation
+        already sent. A confirmation that fails once the meeting is recorded does not undo it:
+        message_id is None and confirmation_error says why. Failing to fetch context only
+        means an agenda without it, and a failed agenda is replaced by the fallback text.
+        """
         print(f"Scheduling meeting: {subject}")
+        started = time.perf_counter()
+        timings = {}
         end_time = start_time + timedelta(minutes=duration)
         
-        # Generate meeting content using AI with context
-        meeting_content = self.generate_meeting_content(subject, participants)
-        
-        # Create Google Calendar event with Meet link
-        calendar_event = self.calendar_service.create_meeting(
+        context_future = self.pipeline_executor.submit(
+            self._timed, timings, 'context', self.get_context, subject, participants)
+        calendar_future = self.pipeline_executor.submit(
+            self._timed, timings, 'calendar', self.calendar_service.create_meeting,
             subject=subject,
             start_time=start_time,
             end_time=end_time,
             participants=participants,
-            description=meeting_content,
+            description=AGENDA_PLACEHOLDER,
             is_recurring=is_recurring,
             recurrence_rule=recurrence_rule
         )
         
+        try:
+            context = context_future.result()
+        except Exception as e:
+            print(f"Error getting context, generating the agenda without it: {str(e)}")
+            context = ''
+        
+        # Generate meeting content using AI with context; streams from this thread
+        meeting_content = self._timed(timings, 'agenda', self.generate_meeting_content, subject, participants,
+                                      on_token=on_token, context=context)
+        calendar_event = calendar_future.result()
+        
         # Create meeting data for MCP
         meeting_data = {
             "subject": subject,
@@ -147,70 +244,69 @@ class MeetingAutomation:
             "recurrence_rule": recurrence_rule
         }
         
+        patch_future = self.pipeline_executor.submit(
+            self._timed, timings, 'calendar_patch', self._patch_agenda, calendar_event['id'], meeting_content)
+        record_future = self.pipeline_executor.submit(
+            self._timed, timings, 'mcp_record', self._record_meeting, meeting_data)
+        confirmation_future = None
+        if confirmation:
+            confirmation_future = self.pipeline_executor.submit(
+                self._timed, timings, 'confirmation', self.send_meeting_confirmation,
+                meeting_data, participants, queued=confirmation == 'queue')
+        
+        patch_future.result()
         try:
-            # Send to MCP
-            response = requests.post(
-                f"{MCP_API_URL}/meetings",
-                headers=self.mcp_headers,
-                json=meeting_data
-            )
-            
-            if response.status_code == 200:
-                meeting = response.json()
-                self.meeting_history.append(meeting)
-                print("Meeting scheduled successfully")
-                return meeting
-            else:
-                print(f"Error scheduling meeting: {response.text}")
-                raise Exception(f"Failed to schedule meeting: {response.text}")
-        except requests.exceptions.RequestException as e:
-            print(f"Error connecting to MCP server: {str(e)}")
+            meeting = record_future.result()
+        except Exception:
+            if confirmation_future:
+                wait([confirmation_future])
+            self._cancel_event(calendar_event['id'])
             raise
+        message_id, confirmation_error = None, None
+        if confirmation_future:
+            try:
+                message_id = confirmation_future.result()
+            except Exception as e:
+                # The meeting is recorded; report the failed email instead of failing the whole schedule
+                confirmation_error = str(e)
+                print(f"Error sending meeting confirmation: {confirmation_error}")
+        timings['total'] = round(time.perf_counter() - started, 3)
+        print(f"Scheduling stage timings (s): {timings}")
+        return {'meeting': meeting, 'message_id': message_id, 'confirmation_error': confirmation_error,
+                'timings': timings}
 
-    def send_meeting_confirmation(self, meeting, participants):
-        """Send meeting confirmation email with Google Meet link"""
+    def schedule_meeting(self, subject, start_time, participants, duration=DEFAULT_MEETING_DURATION, is_recurring=False, recurrence_rule='', on_token=None):
+        """Schedule a meeting using MCP and Google Calendar"""
+        return self.run_scheduling_pipeline(subject, start_time, participants, duration, is_recurring,
+                                            recurrence_rule, on_token=on_token)['meeting']
+
+    def send_meeting_confirmation(self, meeting, participants, queued=False):
+        """Send meeting confirmation email with Google Meet link
+
+        With queued=True the message is handed to the mail queue and its id is returned.
+        """
         print("\nPreparing to send meeting confirmation...")
         
-        # Validate configuration first
-        self.validate_email_config()
-        
-        # Test SMTP connection
-        if not self.test_smtp_connection():
-            raise Exception("Failed to establish SMTP connection")
+        # Cached config and connectivity state; no extra handshake on the send path.
+        # Queued mail only needs valid config since the queue retries outages itself.
+        if queued:
+            self.validate_email_config()
+        else:
+            self.smtp_readiness.ensure_ready()
         
         print(f"\nSending confirmation to: {participants}")
         
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"Meeting Confirmation: {meeting['subject']}"
-        msg['From'] = SMTP_EMAIL
-        msg['To'] = ', '.join(participants)
-        
-        html = f"""
-        <html>
-            <body>
-                <h2>Meeting Confirmation</h2>
-                <p>Your meeting has been scheduled:</p>
-                <ul>
-                    <li>Subject: {meeting['subject']}</li>
-                    <li>Start Time: {meeting['start_time']}</li>
-                    <li>End Time: {meeting['end_time']}</li>
-                    <li>Google Meet Link: <a href="{meeting['meet_link']}">{meeting['meet_link']}</a></li>
-                    <li>Calendar Event: <a href="{meeting['calendar_link']}">View in Calendar</a></li>
-                </ul>
-                <h3>Agenda:</h3>
-                <p>{meeting['content']}</p>
-            </body>
-        </html>
-        """
+        email = self.template_engine.render('meeting_confirmation', meeting=meeting)
+        raw_message = email.as_string(SMTP_EMAIL, participants)
         
-        msg.attach(MIMEText(html, 'html'))
+        if queued:
+            message_id = self.mail_queue.enqueue_raw(SMTP_EMAIL, participants, raw_message)
+            print(f"Confirmation queued for delivery: {message_id}")
+            return message_id
         
         try:
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SMTP_EMAIL, SMTP_PASSWORD)
-                server.send_message(msg)
-                print("Email sent successfully!")
+            self.smtp_pool.sendmail(SMTP_EMAIL, participants, raw_message)
+            print("Email sent successfully!")
         except Exception as e:
             print("\nError sending email:")
             print(f"Type: {type(e).__name__}")
@@ -247,44 +343,50 @@ class MeetingAutomation:
                 
         return valid_recipients, invalid_emails
 
+    def _build_email(self, recipients, subject, content, generate_joke=False, joke_topic='', is_html=False, on_token=None):
+        """Validate recipients and build the message; returns (msg, valid_recipients)"""
+        # Validate recipients first
+        valid_recipients, invalid_emails = self.validate_recipients(recipients)
+        
+        if not valid_recipients:
+            return None, []
+            
+        if invalid_emails:
+            print("Warning: Some email addresses are invalid:")
+            for email, message in invalid_emails:
+                print(f"- {email}: {message}")
+        
+        # Generate joke if requested
+        if generate_joke:
+            # Served from the pre-generated pool so sending never waits on Ollama
+            joke = self.joke_pool.take(joke_topic)
+            if on_token:
+                on_token(joke)
+            content = f"Here's a joke about {joke_topic}:\n\n{joke}\n\n{content}"
+        
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = SMTP_EMAIL
+        msg['To'] = ', '.join(valid_recipients)
+        msg['Subject'] = subject
+        
+        # Add body
+        if is_html:
+            msg.attach(MIMEText(content, 'html'))
+        else:
+            msg.attach(MIMEText(content, 'plain'))
+        
+        return msg, valid_recipients
+
     def send_email(self, recipients, subject, content, generate_joke=False, joke_topic='', is_html=False):
         """Send an email with validation and error handling"""
         try:
-            # Validate recipients first
-            valid_recipients, invalid_emails = self.validate_recipients(recipients)
-            
-            if not valid_recipients:
+            msg, valid_recipients = self._build_email(recipients, subject, content, generate_joke, joke_topic, is_html)
+            if msg is None:
                 return False, "No valid recipients found"
-                
-            if invalid_emails:
-                print("Warning: Some email addresses are invalid:")
-                for email, message in invalid_emails:
-                    print(f"- {email}: {message}")
-            
-            # Generate joke if requested
-            if generate_joke:
-                from llm_service import LLMService
-                llm_service = LLMService()
-                joke = llm_service.generate_joke(joke_topic)
-                content = f"Here's a joke about {joke_topic}:\n\n{joke}\n\n{content}"
-            
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = SMTP_EMAIL
-            msg['To'] = ', '.join(valid_recipients)
-            msg['Subject'] = subject
-            
-            # Add body
-            if is_html:
-                msg.attach(MIMEText(content, 'html'))
-            else:
-                msg.attach(MIMEText(content, 'plain'))
             
-            # Send email
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SMTP_EMAIL, SMTP_PASSWORD)
-                server.send_message(msg)
+            # Send email over a pooled session
+            self.smtp_pool.send_message(msg)
             
             return True, f"Email sent successfully to {', '.join(valid_recipients)}"
         except smtplib.SMTPRecipientsRefused as e:
@@ -294,6 +396,123 @@ class MeetingAutomation:
         except Exception as e:
             return False, f"Failed to send email: {str(e)}"
 
+    def queue_email(self, recipients, subject, content, generate_joke=False, joke_topic='', is_html=False, on_token=None):
+        """Hand an email to the outbound mail queue; returns (success, message id or error)"""
+        try:
+            msg, valid_recipients = self._build_email(recipients, subject, content, generate_joke, joke_topic, is_html, on_token)
+            if msg is None:
+                return False, "No valid recipients found"
+            
+            message_id = self.mail_queue.enqueue(msg)
+            print(f"Email to {', '.join(valid_recipients)} queued: {message_id}")
+            return True, message_id
+        except Exception as e:
+            return False, f"Failed to queue email: {str(e)}"
+
+    def get_email_status(self, message_id):
+        """Return the delivery status of a queued email, or None if unknown"""
+        return self.mail_queue.status(message_id)
+
+    def send_bulk_emails(self, subject_template, body_template, recipients, is_html=True, max_sessions=None):
+        """Send one personalized message per recipient over a few long-lived SMTP sessions
+
+        Templates use $name placeholders. Each entry in recipients is a dict with an
+        'email' key plus its template variables. Returns one result per recipient:
+        {'email', 'status': 'sent' | 'refused' | 'invalid' | 'failed', 'error'}.
+        """
+        subject_template = Template(subject_template)
+        body_template = Template(body_template)
+        results = [None] * len(recipients)
+        work = queue.Queue()
+
+        for index, variables in enumerate(recipients):
+            email = variables.get('email', '')
+            is_valid, message = self.validate_email(email)
+            if not is_valid:
+                results[index] = {'email': email, 'status': 'invalid', 'error': message}
+                continue
+            try:
+                subject = subject_template.substitute(variables)
+                body = body_template.substitute(variables)
+            except (KeyError, ValueError) as e:
+                results[index] = {'email': email, 'status': 'failed', 'error': f"Template error: {str(e)}"}
+                continue
+            msg = MIMEText(body, 'html' if is_html else 'plain')
+            msg['From'] = SMTP_EMAIL
+            msg['To'] = email
+            msg['Subject'] = subject
+            work.put((index, email, msg.as_string()))
+
+        sessions = min(max_sessions or BULK_EMAIL_SESSIONS, self.smtp_pool.max_size, work.qsize())
+        if sessions:
+            print(f"Streaming {work.qsize()} messages over {sessions} SMTP session(s)...")
+            # Sessions still draining the queue; a session that dies hands its work to them
+            live = {'sessions': sessions, 'lock': threading.Lock()}
+            with ThreadPoolExecutor(max_workers=sessions) as executor:
+                for _ in range(sessions):
+                    executor.submit(self._stream_bulk_session, work, results, live)
+
+        sent = sum(1 for result in results if result['status'] == 'sent')
+        print(f"Bulk send finished: {sent}/{len(recipients)} delivered")
+        return results
+
+    def _stream_bulk_session(self, work, results, live):
+        """Drain the bulk work queue over one pooled session, reconnecting once if it drops
+
+        A session that cannot reconnect puts its message back for the other sessions;
+        messages are only failed once every session is down.
+        """
+        item, retried = None, False
+        while True:
+            try:
+                with self.smtp_pool.connection() as connection:
+                    while True:
+                        if item is None:
+                            # Under the lock, so a message handed back by a dying session
+                            # is either taken here or failed by that session
+                            with live['lock']:
+                                try:
+                                    item = work.get_nowait()
+                                except queue.Empty:
+                                    live['sessions'] -= 1
+                                    return
+                            retried = False
+                        index, email, raw = item
+                        results[index] = self._send_bulk_message(connection, email, raw)
+                        item = None
+            except Exception as e:
+                if item is not None and is_connection_error(e) and not retried:
+                    retried = True
+                    continue
+                with live['lock']:
+                    if item is not None:
+                        work.put(item)
+                    live['sessions'] -= 1
+                    if live['sessions']:
+                        print(f"Bulk SMTP session gave up ({str(e)}); {live['sessions']} session(s) left")
+                        return
+                    # The server is unreachable from every session: fail everything still queued
+                    while True:
+                        try:
+                            index, email, _ = work.get_nowait()
+                        except queue.Empty:
+                            break
+                        results[index] = {'email': email, 'status': 'failed', 'error': str(e)}
+                return
+
+    def _send_bulk_message(self, connection, email, raw):
+        """Send one rendered message; connection errors propagate so the session is replaced"""
+        try:
+            connection.sendmail(SMTP_EMAIL, [email], raw)
+            return {'email': email, 'status': 'sent', 'error': None}
+        except smtplib.SMTPRecipientsRefused as e:
+            code, reason = e.recipients.get(email, (None, b''))
+            return {'email': email, 'status': 'refused', 'error': f"{code} {reason.decode(errors='replace')}"}
+        except smtplib.SMTPException as e:
+            if is_connection_error(e):
+                raise
+            return {'email': email, 'status': 'failed', 'error': str(e)}
+
     def process_email(self, email_content):
         """Process an email and extract meeting details"""
         print("\nProcessing email for meeting details...")
@@ -331,6 +550,48 @@ class MeetingAutomation:
             print(f"Error processing email: {str(e)}")
             return False, str(e)
 
+    def process_emails(self, messages=None, mbox=None):
+        """Process many inbound emails in one /process_email/batch request
+
+        messages is a list of raw RFC 822 messages; mbox is a path or binary file of an mbox
+        mailbox, streamed to the MCP server as it is read. Confirmation requests for the
+        extracted meetings go out on the pipeline workers. Returns one result per message:
+        {'success', 'message', 'meeting_id'}.
+        """
+        print("\nProcessing emails for meeting details...")
+        headers = dict(self.mcp_headers)
+        try:
+            if mbox is not None:
+                headers['Content-Type'] = 'application/mbox'
+                if isinstance(mbox, (str, os.PathLike)):
+                    with open(mbox, 'rb') as f:
+                        response = requests.post(f"{MCP_API_URL}/process_email/batch", headers=headers, data=f)
+                else:
+                    response = requests.post(f"{MCP_API_URL}/process_email/batch", headers=headers, data=mbox)
+            else:
+                response = requests.post(f"{MCP_API_URL}/process_email/batch", headers=headers,
+                                         json={'messages': list(messages or [])})
+        except requests.exceptions.RequestException as e:
+            print(f"Error processing emails: {str(e)}")
+            return [{'success': False, 'message': str(e), 'meeting_id': None}]
+        if response.status_code != 200:
+            return [{'success': False, 'message': f"Error processing emails: {response.text}", 'meeting_id': None}]
+
+        def confirm(result):
+            if result['status'] != 'pending_confirmation':
+                return {'success': False, 'message': result.get('error', 'Failed to process email'), 'meeting_id': None}
+            success, message = self.send_meeting_confirmation_request(result['meeting_details'],
+                                                                      result['confirmation_link'])
+            if success:
+                message = "Meeting request sent for confirmation"
+            return {'success': success, 'message': message, 'meeting_id': result['meeting_id']}
+
+        batch = response.json()
+        results = list(self.pipeline_executor.map(confirm, batch['results']))
+        print(f"Processed {batch['processed']} emails: {batch['pending_confirmation']} meeting requests, "
+              f"{batch['errors']} without meeting details")
+        return results
+
     def send_meeting_confirmation_request(self, meeting_details, confirmation_link):
         """Send meeting confirmation request to participants with validation"""
         print("\nSending meeting confirmation requests...")
@@ -347,49 +608,19 @@ class MeetingAutomation:
                 for email, message in invalid_emails:
                     print(f"- {email}: {message}")
             
-            subject = f"Meeting Request: {meeting_details['subject']}"
-            content = f"""
-            <html>
-                <body>
-                    <h2>Meeting Request</h2>
-                    <p>A meeting has been requested with the following details:</p>
-                    
-                    <ul>
-                        <li><strong>Subject:</strong> {meeting_details['subject']}</li>
-                        <li><strong>Proposed Time:</strong> {meeting_details['proposed_time']}</li>
-                        <li><strong>Duration:</strong> {meeting_details['duration']} minutes</li>
-                        <li><strong>Participants:</strong> {', '.join(valid_recipients)}</li>
-                    </ul>
-                    
-                    <p>Please confirm or reject this meeting request by clicking one of the buttons below:</p>
-                    
-                    <div style="margin: 20px 0;">
-                        <a href="{confirmation_link}?action=confirm" 
-                           style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; margin-right: 10px;">
-                            Confirm Meeting
-                        </a>
-                        <a href="{confirmation_link}?action=reject" 
-                           style="background-color: #f44336; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">
-                            Reject Meeting
-                        </a>
-                    </div>
-                    
-                    <p>Or copy and paste this link in your browser:</p>
-                    <p style="word-break: break-all;">{confirmation_link}</p>
-                    
-                    <h3>Meeting Details:</h3>
-                    <pre style="white-space: pre-wrap;">{meeting_details['content']}</pre>
-                </body>
-            </html>
-            """
+            email = self.template_engine.render(
+                'meeting_request',
+                meeting=meeting_details,
+                participants=valid_recipients,
+                confirmation_link=confirmation_link
+            )
             
             # Send confirmation emails only to valid recipients
-            success, message = self.send_email(
-                recipients=valid_recipients,
-                subject=subject,
-                content=content,
-                is_html=True
-            )
+            try:
+                self.smtp_pool.sendmail(SMTP_EMAIL, valid_recipients, email.as_string(SMTP_EMAIL, valid_recipients))
+                success, message = True, None
+            except smtplib.SMTPException as e:
+                success, message = False, f"SMTP error: {str(e)}"
             
             if not success:
                 return False, f"Failed to send confirmation emails: {message}"
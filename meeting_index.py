@@ -0,0 +1,39 @@
+"""Participant index over stored MCP meetings for participant-filtered queries
+
+Postings map a participant address to the ids of the meetings that include it. Meeting ids
+only grow, so every posting list is appended to in ascending order and a page after a
+given id is found by bisection.
+"""
+import bisect
+import threading
+
+
+class MeetingIndex:
+    """Participant -> meeting ids"""
+
+    def __init__(self):
+        self._by_participant = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, meeting):
+        """Index a newly stored meeting; ids must be added in increasing order"""
+        meeting_id = meeting['id']
+        with self._lock:
+            self._count += 1
+            for participant in {p.strip().lower() for p in meeting.get('participants') or [] if isinstance(p, str)}:
+                self._by_participant.setdefault(participant, []).append(meeting_id)
+
+    def add_all(self, meetings):
+        for meeting in meetings:
+            self.add(meeting)
+
+    def participant_ids(self, participant, after_id=0):
+        """Ids of the participant's meetings above after_id, ascending"""
+        with self._lock:
+            posting = self._by_participant.get(participant.strip().lower(), [])
+            return posting[bisect.bisect_right(posting, after_id):]
+
+    def stats(self):
+        with self._lock:
+            return {'meetings': self._count, 'participants': len(self._by_participant)}
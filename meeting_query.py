@@ -0,0 +1,115 @@
+"""Filters, keyset pagination, field projection and NDJSON export for GET /meetings
+
+Query parameters:
+  participant   only meetings with this address (case-insensitive)
+  start_from    ISO 8601; only meetings starting at or after it
+  start_to      ISO 8601; only meetings starting before it
+  status        e.g. scheduled; meetings without a status count as scheduled
+  fields        comma-separated keys to return (id is always included)
+  limit         page size, at most MEETINGS_MAX_PAGE_SIZE
+  cursor        next_cursor from the previous page
+Cursors are opaque strings that encode the last position returned. A page resumes after
+that position, so meetings added while paging are neither skipped nor repeated.
+"""
+import base64
+import json
+from datetime import datetime
+from config import *
+
+SCHEDULED = 'scheduled'
+
+
+class QueryError(ValueError):
+    """A malformed /meetings query parameter; reported as HTTP 400"""
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(str(position).encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii'))
+    except ValueError:
+        raise QueryError(f"Invalid cursor: {cursor}")
+
+
+def _iso(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise QueryError(f"{name} must be an ISO 8601 date or time: {value}")
+
+
+def parse_query(args):
+    """Read the /meetings query parameters from a mapping (e.g. request.args)"""
+    try:
+        limit = int(args.get('limit') or MEETINGS_PAGE_SIZE)
+    except ValueError:
+        raise QueryError(f"limit must be an integer: {args.get('limit')}")
+    fields = [field.strip() for field in (args.get('fields') or '').split(',') if field.strip()]
+    return {
+        'participant': (args.get('participant') or '').strip().lower() or None,
+        'start_from': _iso(args.get('start_from'), 'start_from'),
+        'start_to': _iso(args.get('start_to'), 'start_to'),
+        'status': args.get('status') or None,
+        'fields': ['id'] + [field for field in fields if field != 'id'] if fields else None,
+        'limit': max(1, min(limit, MEETINGS_MAX_PAGE_SIZE)),
+        'after': decode_cursor(args.get('cursor')),
+    }
+
+
+def matches(meeting, query):
+    """In-memory form of the filters, for stores without their own query support"""
+    if query.get('status') and meeting.get('status', SCHEDULED) != query['status']:
+        return False
+    start = meeting.get('start_time') or ''
+    if query.get('start_from') and start < query['start_from']:
+        return False
+    if query.get('start_to') and start >= query['start_to']:
+        return False
+    if query.get('participant'):
+        participants = meeting.get('participants') or []
+        if not any(isinstance(p, str) and p.strip().lower() == query['participant'] for p in participants):
+            return False
+    return True
+
+
+def project(meeting, fields):
+    if not fields:
+        return meeting
+    return {field: meeting[field] for field in fields if field in meeting}
+
+
+def paginate_list(meetings, query):
+    """One page over an append-only list; the cursor is a list position. Returns (page, next position or None)"""
+    page, position = [], query['after']
+    while position < len(meetings) and len(page) < query['limit']:
+        meeting = meetings[position]
+        position += 1
+        if matches(meeting, query):
+            page.append(meeting)
+    return page, position if position < len(meetings) else None
+
+
+def page_response(page, next_position, fields):
+    return {
+        'meetings': [project(meeting, fields) for meeting in page],
+        'next_cursor': encode_cursor(next_position) if next_position is not None else None,
+    }
+
+
+def iter_ndjson(fetch_page, query):
+    """Yield one JSON line per meeting, fetching pages lazily; fetch_page(query) -> (page, next position)"""
+    query = dict(query, limit=MEETINGS_EXPORT_CHUNK)
+    while True:
+        page, next_position = fetch_page(query)
+        if page:
+            yield ''.join(json.dumps(project(meeting, query['fields'])) + '\n' for meeting in page)
+        if next_position is None:
+            return
+        query['after'] = next_position
@@ -0,0 +1,183 @@
+"""Expiry, reminders and bounds for pending meeting requests
+
+Every request stored with add_pending gets an expires_at time (PENDING_TTL by default,
+per request up to PENDING_MAX_TTL). A sweeper thread sleeps until the earliest deadline
+in a min-heap, so scheduling, expiring and reminding each cost O(log n). Confirmed or
+rejected requests leave their heap entries behind; those are skipped when they come up
+and the heap is rebuilt once they outnumber the live ones. At most PENDING_MAX_REQUESTS
+requests are kept; beyond that the oldest is dropped.
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from config import *
+
+EXPIRE = 'expire'
+REMIND = 'remind'
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+def parse_ttl(value):
+    """A per-request ttl in seconds from a request parameter; None when absent"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"ttl must be a number of seconds: {value}")
+
+
+class PendingLifecycle:
+    """Tracks pending requests of an mcp_storage backend from creation to confirmation or expiry
+
+    on_reminder(pending) runs PENDING_REMINDER_BEFORE seconds before a request expires
+    (0 turns reminders off) and on_expire(pending) after it has been removed. Both run
+    on the sweeper thread.
+    """
+
+    def __init__(self, storage, ttl=None, max_ttl=None, reminder_before=None, max_pending=None,
+                 on_reminder=None, on_expire=None):
+        self.storage = storage
+        self.ttl = ttl or PENDING_TTL
+        self.max_ttl = max(max_ttl or PENDING_MAX_TTL, self.ttl)
+        self.reminder_before = PENDING_REMINDER_BEFORE if reminder_before is None else reminder_before
+        self.max_pending = max_pending or PENDING_MAX_REQUESTS
+        self.on_reminder = on_reminder
+        self.on_expire = on_expire
+        self._live = OrderedDict()  # pending id -> expiry timestamp, oldest request first
+        self._heap = []  # (due, pending id, expiry timestamp, EXPIRE | REMIND)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.counts = {'created': 0, 'confirmed': 0, 'rejected': 0, 'expired': 0, 'evicted': 0,
+                       'reminders': 0, 'errors': 0}
+
+    def start(self):
+        """Pick up requests already in storage (e.g. after a restart) and start the sweeper"""
+        for pending in self.storage.list_pending():
+            expires_at = pending.get('expires_at') or datetime.fromtimestamp(
+                _timestamp(pending['created_at']) + self.ttl).isoformat()
+            self._track(pending['id'], _timestamp(expires_at), count=False)
+        self._thread = threading.Thread(target=self._sweep, name="pending-sweeper", daemon=True)
+        self._thread.start()
+        return self
+
+    def expires_at(self, ttl=None):
+        """ISO expiry time for a request created now; ttl in seconds, clamped to [1, max_ttl]"""
+        ttl = self.ttl if ttl is None else min(max(float(ttl), 1), self.max_ttl)
+        return datetime.fromtimestamp(time.time() + ttl).isoformat()
+
+    def track(self, pending):
+        """Schedule a request returned by storage.add_pending; it must carry expires_at"""
+        self._track(pending['id'], _timestamp(pending['expires_at']))
+
+    def _track(self, pending_id, expires_at, count=True):
+        evicted = []
+        with self._cond:
+            self._live[pending_id] = expires_at
+            self._push((expires_at, pending_id, expires_at, EXPIRE))
+            if self.reminder_before and expires_at - self.reminder_before > time.time():
+                self._push((expires_at - self.reminder_before, pending_id, expires_at, REMIND))
+            if count:
+                self.counts['created'] += 1
+            while len(self._live) > self.max_pending:
+                evicted.append(self._live.popitem(last=False)[0])
+            self.counts['evicted'] += len(evicted)
+            self._compact()
+        for pending_id in evicted:
+            self.storage.take_pending(pending_id)
+
+    def _push(self, entry):
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._cond.notify()  # the sweeper is sleeping until a later deadline
+
+    def _compact(self):
+        """Drop heap entries of requests that are no longer pending once they are the majority"""
+        if len(self._heap) <= 2 * len(self._live) + 64:
+            return
+        self._heap = [entry for entry in self._heap if self._live.get(entry[1]) == entry[2]]
+        heapq.heapify(self._heap)
+
+    def resolve(self, pending_id, outcome):
+        """Record that a request was confirmed or rejected (taken from storage by the caller)"""
+        with self._cond:
+            self._live.pop(pending_id, None)
+            self.counts[outcome] += 1
+            self._compact()
+
+    def is_overdue(self, pending):
+        expires_at = pending.get('expires_at')
+        return expires_at is not None and _timestamp(expires_at) <= time.time()
+
+    def expire(self, pending_id):
+        """Expire a request now; returns it, or None if it was already gone"""
+        with self._cond:
+            self._live.pop(pending_id, None)
+        pending = self.storage.take_pending(pending_id)
+        if pending is not None:
+            with self._cond:
+                self.counts['expired'] += 1
+            self._notify(self.on_expire, pending)
+        return pending
+
+    def _notify(self, callback, pending):
+        if callback is None:
+            return
+        try:
+            callback(pending)
+        except Exception as e:
+            with self._cond:
+                self.counts['errors'] += 1
+            print(f"Warning: pending request {pending.get('id')} callback failed: {str(e)}")
+
+    def _next_due(self):
+        """Wait for the earliest due heap entry that is still current; None once stopped"""
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                _, pending_id, expires_at, kind = heapq.heappop(self._heap)
+                if self._live.get(pending_id) != expires_at:
+                    continue  # confirmed, rejected, evicted or rescheduled since
+                if kind == EXPIRE:
+                    del self._live[pending_id]
+                return pending_id, kind
+        return None
+
+    def _sweep(self):
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            pending_id, kind = due
+            if kind == EXPIRE:
+                self.expire(pending_id)
+                continue
+            pending = self.storage.get_pending(pending_id)
+            if pending is not None:
+                with self._cond:
+                    self.counts['reminders'] += 1
+                self._notify(self.on_reminder, pending)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counts, pending=len(self._live), scheduled=len(self._heap),
+                        next_due=datetime.fromtimestamp(self._heap[0][0]).isoformat() if self._heap else None)
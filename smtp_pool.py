@@ -0,0 +1,175 @@
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import *
+
+
+def is_connection_error(error):
+    """True when an error means the session itself is unusable and must be replaced"""
+    # SMTPException subclasses OSError, so protocol errors have to be excluded explicitly
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPConnectionPool:
+    """Pool of persistent, authenticated SMTP sessions"""
+
+    def __init__(self, server=None, port=None, email=None, password=None, use_ssl=None,
+                 use_tls=None, max_size=None, idle_timeout=None, noop_interval=None, timeout=None):
+        self.server = server or SMTP_SERVER
+        self.port = port or SMTP_PORT
+        self.email = email if email is not None else SMTP_EMAIL
+        self.password = password if password is not None else SMTP_PASSWORD
+        self.use_ssl = SMTP_USE_SSL if use_ssl is None else use_ssl
+        self.use_tls = SMTP_USE_TLS if use_tls is None else use_tls
+        self.max_size = max_size or SMTP_POOL_SIZE
+        self.idle_timeout = SMTP_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.noop_interval = SMTP_POOL_NOOP_INTERVAL if noop_interval is None else noop_interval
+        self.timeout = timeout or SMTP_TIMEOUT
+
+        self._idle = deque()  # (connection, last_used)
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {
+            'connects': 0,
+            'reuses': 0,
+            'reconnects': 0,
+            'noop_checks': 0,
+            'sent': 0
+        }
+
+    def _connect(self):
+        """Open a new session, upgrade it to TLS and log in"""
+        context = ssl.create_default_context()
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout, context=context)
+        else:
+            connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls and not self.use_ssl:
+                connection.starttls(context=context)
+            if self.email and self.password:
+                connection.login(self.email, self.password)
+        except Exception:
+            self._discard(connection)
+            raise
+        with self._lock:
+            self.stats['connects'] += 1
+        return connection
+
+    def _discard(self, connection):
+        """Close a session without caring whether the server is still there"""
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, connection, last_used):
+        """Check an idle session, using NOOP only when it has been idle for a while"""
+        idle_for = time.monotonic() - last_used
+        if idle_for > self.idle_timeout:
+            return False
+        if idle_for < self.noop_interval:
+            return True
+        with self._lock:
+            self.stats['noop_checks'] += 1
+        try:
+            return connection.noop()[0] == 250
+        except OSError:
+            return False
+
+    def _checkout(self):
+        """Take a healthy idle session, or open a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used = self._idle.pop()
+            if self._is_alive(connection, last_used):
+                with self._lock:
+                    self.stats['reuses'] += 1
+                return connection
+            self._discard(connection)
+            with self._lock:
+                self.stats['reconnects'] += 1
+        return self._connect()
+
+    def _checkin(self, connection):
+        with self._lock:
+            if not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow an authenticated session; at most max_size are out at once"""
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+        except OSError as e:
+            if connection is not None and is_connection_error(e):
+                self._discard(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                self._checkin(connection)
+            self._slots.release()
+
+    def _with_retry(self, send):
+        """Run a send on a pooled session, reconnecting once if it went stale"""
+        for attempt in range(2):
+            try:
+                with self.connection() as connection:
+                    result = send(connection)
+                with self._lock:
+                    self.stats['sent'] += 1
+                return result
+            except OSError as e:
+                if attempt or not is_connection_error(e):
+                    raise
+                with self._lock:
+                    self.stats['reconnects'] += 1
+
+    def send_message(self, msg, from_addr=None, to_addrs=None):
+        """Send an email.message.Message over a pooled session"""
+        return self._with_retry(lambda connection: connection.send_message(msg, from_addr, to_addrs))
+
+    def sendmail(self, from_addr, to_addrs, raw_message):
+        """Send an already serialized message over a pooled session"""
+        return self._with_retry(lambda connection: connection.sendmail(from_addr, to_addrs, raw_message))
+
+    def close(self):
+        """Close every idle session; sessions in use are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(server=None, port=None, email=None, password=None):
+    """Return the shared pool for an SMTP account, creating it on first use"""
+    key = (server or SMTP_SERVER, port or SMTP_PORT, email if email is not None else SMTP_EMAIL)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SMTPConnectionPool(server=key[0], port=key[1], email=key[2], password=password)
+            _pools[key] = pool
+        return pool
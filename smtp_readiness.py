@@ -0,0 +1,105 @@
+import threading
+import time
+from config import *
+from smtp_pool import get_smtp_pool
+
+
+def validate_smtp_config(server, email, password):
+    """Return a list of problems with the SMTP settings (empty when valid)"""
+    errors = []
+    if not email or not password:
+        errors.append("Email or password is missing in .env file")
+        return errors
+    if '@' not in email:
+        errors.append("Invalid email format")
+    if 'gmail.com' in server and len(password) != 16:
+        errors.append(f"App password should be exactly 16 characters (current length: {len(password)})")
+    return errors
+
+
+class SMTPReadiness:
+    """Cached SMTP readiness: config checked once, connectivity probed on a TTL in the background"""
+
+    def __init__(self, pool=None, ttl=None, retry_interval=None):
+        self.pool = pool or get_smtp_pool()
+        self.ttl = ttl or SMTP_READINESS_TTL
+        self.retry_interval = retry_interval or SMTP_READINESS_RETRY_INTERVAL
+        self.config_errors = validate_smtp_config(self.pool.server, self.pool.email, self.pool.password)
+
+        self.ready = None  # None until the first probe has run
+        self.last_error = None
+        self.checked_at = 0.0
+        self._probe_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        print(f"SMTP: {self.pool.server}:{self.pool.port} as {self.pool.email}")
+        for error in self.config_errors:
+            print(f"SMTP configuration problem: {error}")
+
+    def probe(self):
+        """Check connectivity with a pooled session, leaving it warm for the next send"""
+        with self._probe_lock:
+            try:
+                with self.pool.connection() as connection:
+                    code, _ = connection.noop()
+                self.ready = code == 250
+                self.last_error = None if self.ready else f"NOOP returned {code}"
+            except Exception as e:
+                self.ready = False
+                self.last_error = f"{type(e).__name__}: {str(e)}"
+                print(f"SMTP probe failed: {self.last_error}")
+            self.checked_at = time.monotonic()
+            return self.ready
+
+    def _next_probe_in(self):
+        interval = self.ttl if self.ready else min(self.ttl, self.retry_interval)
+        return max(0.0, self.checked_at + interval - time.monotonic())
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self._next_probe_in()):
+            self.probe()
+
+    def start(self):
+        """Start refreshing the probe in the background"""
+        if self.config_errors or (self._thread and self._thread.is_alive()):
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="smtp-readiness", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def ensure_ready(self):
+        """Raise unless the cached state says SMTP is usable; probes only if nothing is cached"""
+        if self.config_errors:
+            raise ValueError("; ".join(self.config_errors))
+        if self.ready is None or time.monotonic() - self.checked_at > self.ttl:
+            self.probe()
+        if not self.ready:
+            raise Exception(f"Failed to establish SMTP connection: {self.last_error}")
+
+    def status(self):
+        return {
+            'config_errors': list(self.config_errors),
+            'ready': self.ready,
+            'last_error': self.last_error,
+            'checked_seconds_ago': round(time.monotonic() - self.checked_at, 1) if self.checked_at else None
+        }
+
+
+_readiness = {}
+_readiness_lock = threading.Lock()
+
+
+def get_smtp_readiness(pool=None):
+    """Return the started readiness tracker for a pool, creating it on first use"""
+    pool = pool or get_smtp_pool()
+    with _readiness_lock:
+        readiness = _readiness.get(id(pool))
+        if readiness is None or readiness.pool is not pool:
+            readiness = SMTPReadiness(pool).start()
+            _readiness[id(pool)] = readiness
+        return readiness
@@ -0,0 +1,244 @@
+"""Shared natural-language time, range and duration parser
+
+Understands clock times ("2pm", "2:30 PM", "14:30", "noon", "at 3"), ranges ("2-3pm",
+"from 10am to 11:30am"), days ("today", "tomorrow", "day after tomorrow", "friday",
+"this friday", "next friday", "next week", "2024-05-03", "May 3", "3rd of May") and
+durations ("45 min", "1.5 hours", "1h30", "an hour and a half"). All patterns are compiled
+once; results are memoized per normalized text and reference date.
+"""
+import re
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from config import *
+
+_CLOCK_12 = re.compile(r'\b(?P<h>1[0-2]|0?[1-9])(?:[:.](?P<m>[0-5]\d))?\s*(?P<ap>[ap])\.?\s?m\b\.?')
+_CLOCK_24 = re.compile(r'\b(?P<h>[01]?\d|2[0-3]):(?P<m>[0-5]\d)\b(?!\s*[ap]\.?\s?m\b)')
+_NAMED_TIME = re.compile(r'\b(?P<name>noon|midday|midnight)\b')
+_BARE_HOUR = re.compile(r'\bat\s+(?P<h>1[0-2]|0?[1-9])(?:[:.](?P<m>[0-5]\d))?\b(?!\s*(?:[:.]\d|[ap]\.?\s?m\b|%|hours?|hrs?|min))')
+_RANGE = re.compile(
+    r'\b(?:from\s+|(?P<between>between)\s+)?(?P<sh>2[0-3]|1\d|0?\d)(?:[:.](?P<sm>[0-5]\d))?\s*(?:(?P<sap>[ap])\.?\s?m\b\.?)?'
+    r'\s*(?P<conn>-|–|to|until|till|and)\s*'
+    r'(?P<eh>2[0-3]|1\d|0?\d)(?:[:.](?P<em>[0-5]\d))?\s*(?:(?P<eap>[ap])\.?\s?m\b\.?)?'
+)
+
+_RELATIVE_DAY = re.compile(r'\b(?P<rel>day after tomorrow|today|tonight|tomorrow|tmrw|tmr)\b')
+_ISO_DATE = re.compile(r'\b(?P<y>\d{4})-(?P<mo>\d{1,2})-(?P<d>\d{1,2})\b')
+_MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+_MONTH = r'(?P<mon>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)'
+_MONTH_DAY = re.compile(r'\b' + _MONTH + r'\.?\s+(?P<d>[0-3]?\d)(?:st|nd|rd|th)?\b(?:,?\s+(?P<y>\d{4})\b)?')
+_DAY_MONTH = re.compile(r'\b(?P<d>[0-3]?\d)(?:st|nd|rd|th)?\s+(?:of\s+)?' + _MONTH + r'\b(?:,?\s+(?P<y>\d{4})\b)?')
+_WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+_WEEKDAY = re.compile(
+    r'\b(?:(?P<qual>this|next|coming|on)\s+)?'
+    r'(?P<wd>monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tues?|wed|thu(?:rs?)?|fri)\b'
+    r'(?P<nextweek>\s+(?:of\s+)?next\s+week)?'
+)
+_NEXT_WEEK = re.compile(r'\bnext\s+week\b')
+
+_DURATION = re.compile(
+    r'\b(?:(?P<hhalf>an? hour and a half|one and a half hours?)'
+    r'|(?P<half>half an hour|half hour)'
+    r'|(?P<quarter>quarter of an hour|quarter hour)'
+    r'|(?P<hours>\d+(?:\.\d+)?)\s*(?:hours?|hrs?|h)(?:\b|(?=\d{2}\b))'
+    r'(?:(?P<tight>\d{2})\b|\s*(?:and\s*)?(?P<hmins>\d+)\s*(?:minutes?|mins?|m)\b)?'
+    r'|(?P<hour>an hour|one hour)'
+    r'|(?P<mins>\d+)\s*(?:minutes?|mins?|m)\b)'
+)
+_BARE_NUMBER = re.compile(r'^\d+$')
+_WHITESPACE = re.compile(r'\s+')
+
+_Parsed = namedtuple('_Parsed', 'start end day_explicit phrase')
+
+
+def _normalize(text):
+    return _WHITESPACE.sub(' ', text.strip().lower())
+
+
+def _to_24h(hour, ampm):
+    hour = int(hour)
+    if ampm is None:
+        return hour
+    return hour % 12 + (12 if ampm == 'p' else 0)
+
+
+def _find_clock(text):
+    """Return (start time, end time or None, span) of the first clock expression"""
+    for match in _RANGE.finditer(text):
+        # A range needs am/pm or minutes somewhere, otherwise "3-4" could be anything
+        if not (match.group('sap') or match.group('eap') or match.group('sm') or match.group('em')):
+            continue
+        if match.group('conn') == 'and' and not match.group('between'):
+            continue
+        end_ap = match.group('eap')
+        start_ap = match.group('sap') or end_ap
+        start_h, end_h = _to_24h(match.group('sh'), start_ap), _to_24h(match.group('eh'), end_ap)
+        if start_ap and start_h > end_h and not match.group('sap'):
+            start_h -= 12  # "11-1pm" starts at 11am
+        if 0 <= start_h < 24 and end_h < 24:
+            start = time(start_h, int(match.group('sm') or 0))
+            end = time(end_h, int(match.group('em') or 0))
+            return start, end, match.span()
+
+    candidates = []
+    match = _CLOCK_12.search(text)
+    if match:
+        candidates.append((match.start(), time(_to_24h(match.group('h'), match.group('ap')), int(match.group('m') or 0)), match.span()))
+    match = _CLOCK_24.search(text)
+    if match:
+        candidates.append((match.start(), time(int(match.group('h')), int(match.group('m'))), match.span()))
+    match = _NAMED_TIME.search(text)
+    if match:
+        candidates.append((match.start(), time(0) if match.group('name') == 'midnight' else time(12), match.span()))
+    if candidates:
+        _, start, span = min(candidates, key=lambda c: c[0])
+        return start, None, span
+
+    match = _BARE_HOUR.search(text)
+    if match:
+        # "at 3" means business hours: 1-7 is afternoon, 8-12 morning/noon
+        hour = int(match.group('h'))
+        if hour <= 7 or 'tonight' in text:
+            hour += 12
+        return time(hour % 24, int(match.group('m') or 0)), None, match.span()
+    return None, None, None
+
+
+def _month_date(match, reference):
+    month = _MONTHS.index(match.group('mon')[:3]) + 1
+    year = int(match.group('y')) if match.group('y') else reference.year
+    try:
+        day = date(year, month, int(match.group('d')))
+    except ValueError:
+        return None
+    if not match.group('y') and day < reference:
+        day = day.replace(year=year + 1)
+    return day
+
+
+def _find_day(text, reference):
+    """Return (date, span) of the first day expression, or (None, None)"""
+    match = _RELATIVE_DAY.search(text)
+    if match:
+        rel = match.group('rel')
+        offset = 2 if rel == 'day after tomorrow' else 1 if rel in ('tomorrow', 'tmrw', 'tmr') else 0
+        return reference + timedelta(days=offset), match.span()
+
+    match = _ISO_DATE.search(text)
+    if match:
+        try:
+            return date(int(match.group('y')), int(match.group('mo')), int(match.group('d'))), match.span()
+        except ValueError:
+            pass
+
+    for pattern in (_MONTH_DAY, _DAY_MONTH):
+        match = pattern.search(text)
+        if match:
+            day = _month_date(match, reference)
+            if day:
+                return day, match.span()
+
+    match = _WEEKDAY.search(text)
+    if match:
+        weekday = _WEEKDAYS[match.group('wd')[:3]]
+        if match.group('qual') == 'next' or match.group('nextweek'):
+            # The given weekday in the following Monday-to-Sunday week
+            monday = reference - timedelta(days=reference.weekday()) + timedelta(days=7)
+            return monday + timedelta(days=weekday), match.span()
+        return reference + timedelta(days=(weekday - reference.weekday()) % 7), match.span()
+
+    match = _NEXT_WEEK.search(text)
+    if match:
+        return reference - timedelta(days=reference.weekday()) + timedelta(days=7), match.span()
+    return None, None
+
+
+@lru_cache(maxsize=TEMPORAL_CACHE_SIZE)
+def _parse(text, reference):
+    start_time, end_time, clock_span = _find_clock(text)
+    if start_time is None:
+        return None
+    # Blank out the clock so "may 2pm" is not read as May 2nd
+    remaining = text[:clock_span[0]] + ' ' * (clock_span[1] - clock_span[0]) + text[clock_span[1]:]
+    day, day_span = _find_day(remaining, reference)
+    phrase_span = clock_span
+    # The phrase covers the day too when it sits next to the clock ("tomorrow at 2pm")
+    if day_span and max(day_span[0] - clock_span[1], clock_span[0] - day_span[1]) <= 12:
+        phrase_span = (min(day_span[0], clock_span[0]), max(day_span[1], clock_span[1]))
+
+    start = datetime.combine(day or reference, start_time)
+    end = None
+    if end_time is not None:
+        end = datetime.combine(day or reference, end_time)
+        if end <= start:
+            end += timedelta(days=1)
+    return _Parsed(start, end, day is not None, text[phrase_span[0]:phrase_span[1]].strip())
+
+
+def _parse_at(text, reference, prefer_future):
+    if not text:
+        return None
+    reference = reference or datetime.now()
+    parsed = _parse(_normalize(text), reference.date())
+    if parsed is None:
+        return None
+    if prefer_future and not parsed.day_explicit and parsed.start < reference:
+        # "3pm" said after 3pm means tomorrow
+        shift = timedelta(days=1)
+        parsed = parsed._replace(start=parsed.start + shift, end=parsed.end and parsed.end + shift)
+    return parsed
+
+
+def parse_time(text, reference=None, prefer_future=False):
+    """Return the datetime described by text, or None when it has no clock time
+
+    reference defaults to now. With prefer_future, a time without a day that has already
+    passed today is moved to tomorrow.
+    """
+    parsed = _parse_at(text, reference, prefer_future)
+    return parsed.start if parsed else None
+
+
+def parse_time_range(text, reference=None, prefer_future=False):
+    """Return (start, end) for "2-3pm"-style text; end is None when only a start is given"""
+    parsed = _parse_at(text, reference, prefer_future)
+    return (parsed.start, parsed.end) if parsed else None
+
+
+def find_time_text(text):
+    """Return the day-and-time phrase in free text (e.g. "tomorrow at 2:00 pm"), or None"""
+    parsed = _parse_at(text, None, False)
+    return parsed.phrase if parsed else None
+
+
+@lru_cache(maxsize=TEMPORAL_CACHE_SIZE)
+def _parse_duration(text):
+    if _BARE_NUMBER.match(text):
+        return int(text)
+    match = _DURATION.search(text)
+    if not match:
+        return None
+    if match.group('hhalf'):
+        return 90
+    if match.group('half'):
+        return 30
+    if match.group('quarter'):
+        return 15
+    if match.group('hour'):
+        return 60
+    if match.group('hours'):
+        minutes = match.group('tight') or match.group('hmins') or 0
+        return int(round(float(match.group('hours')) * 60)) + int(minutes)
+    return int(match.group('mins'))
+
+
+def parse_duration(text, default=None):
+    """Return the duration in text in minutes; a bare number counts as minutes"""
+    if not text:
+        return default
+    minutes = _parse_duration(_normalize(str(text)))
+    return default if minutes is None else minutes
+
+
+def cache_info():
+    return {'times': _parse.cache_info()._asdict(), 'durations': _parse_duration.cache_info()._asdict()}
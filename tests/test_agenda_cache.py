@@ -0,0 +1,48 @@
+"""Keys, invalidation and the debounced file writes of AgendaCache"""
+import json
+import time
+
+import pytest
+
+from agenda_cache import AgendaCache
+
+CONTEXT = json.dumps([{'id': 1, 'subject': 'Sprint planning', 'participants': ['a@x.com']}])
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'agenda_cache.json')
+
+
+def test_topics_containing_a_bar_are_invalidated(path):
+    cache = AgendaCache(path=path, flush_delay=60)
+    key = cache.key('Design | Review', ['a@x.com'], CONTEXT)
+    cache.put(key, "1. Objectives")
+    assert cache.invalidate_topic('design | review') == 1
+    assert cache.get(key) is None
+
+
+def test_puts_are_written_once_after_the_delay(path, monkeypatch):
+    cache = AgendaCache(path=path, flush_delay=0.05)
+    saves = []
+    save = cache._save
+    monkeypatch.setattr(cache, '_save', lambda entries: (saves.append(len(entries)), save(entries)))
+    for i in range(20):
+        cache.put(cache.key(f"stand-up {i}", ['a@x.com'], CONTEXT), f"agenda {i}")
+    assert saves == []
+
+    deadline = time.time() + 2
+    while not saves and time.time() < deadline:
+        time.sleep(0.01)
+    assert saves == [20]
+
+    reloaded = AgendaCache(path=path)
+    assert reloaded.get(cache.key('Stand-up 3', ['A@x.com'], CONTEXT)) == "agenda 3"
+
+
+def test_flush_writes_pending_changes_now(path):
+    cache = AgendaCache(path=path, flush_delay=60)
+    key = cache.key('Retro', [], CONTEXT)
+    cache.put(key, "agenda")
+    cache.flush()
+    assert AgendaCache(path=path).get(key) == "agenda"
@@ -0,0 +1,34 @@
+"""Name resolution in ContactDirectory"""
+import pytest
+
+from contact_directory import Contact, ContactDirectory
+
+CONTACTS = [
+    Contact('Salah', 'salahuddin0758@gmail.com', ()),
+    Contact('Abdullah', 'aamcse@gmail.com', ()),
+    Contact('Sallu', 'salauddin0758@gmail.com', ()),
+]
+
+
+@pytest.fixture
+def directory():
+    return ContactDirectory(path='', contacts=CONTACTS)
+
+
+@pytest.mark.parametrize('name, email', [
+    ('Salah', 'salahuddin0758@gmail.com'),
+    ('abdul', 'aamcse@gmail.com'),
+    ('abd', 'aamcse@gmail.com'),
+    ('Bob@Example.com', 'bob@example.com'),
+])
+def test_resolves(directory, name, email):
+    assert directory.resolve(name) == email
+
+
+@pytest.mark.parametrize('name', ['a', 'ab', 'sal', 'nobody'])
+def test_leaves_short_ambiguous_or_unknown_names_unresolved(directory, name):
+    assert directory.resolve(name) is None
+
+
+def test_short_prefix_is_still_suggested(directory):
+    assert [contact.email for contact, _ in directory.search('ab')] == ['aamcse@gmail.com']
@@ -0,0 +1,73 @@
+"""Rolling summary and token budget in ConversationHistory"""
+import pytest
+
+from conversation_history import SUMMARY_KEY, ConversationHistory, estimate_tokens
+
+
+class Summarizer:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, summary, lines, max_tokens):
+        self.calls.append((summary, list(lines)))
+        if self.fail:
+            raise ConnectionError("ollama is down")
+        return f"{summary} +{len(lines)}".strip()
+
+
+def chat(turns):
+    return {'conversation_history': [{'role': 'user' if i % 2 == 0 else 'assistant', 'content': f"message {i}"}
+                                     for i in range(turns)]}
+
+
+@pytest.fixture
+def summarizer():
+    return Summarizer()
+
+
+def test_short_history_is_verbatim(summarizer):
+    text = ConversationHistory(max_messages=10, summarize=summarizer).render(chat(4))
+    assert text == "User: message 0\nAssistant: message 1\nUser: message 2\nAssistant: message 3\n"
+    assert summarizer.calls == []
+
+
+def test_only_newly_evicted_turns_are_summarized(summarizer):
+    history = ConversationHistory(max_messages=4, summarize=summarizer)
+    context = chat(5)
+    text = history.render(context)
+    assert summarizer.calls == [('', ['User: message 0', 'Assistant: message 1', 'User: message 2'])]
+    assert text.startswith("Summary of earlier conversation:\n+3\nRecent messages:\nAssistant: message 3\n")
+
+    # Rendering again reuses the cached summary
+    history.render(context)
+    assert len(summarizer.calls) == 1
+
+    context['conversation_history'] += chat(3)['conversation_history'][:1] * 3
+    history.render(context)
+    assert summarizer.calls[1] == ('+3', ['Assistant: message 3', 'User: message 4', 'User: message 0'])
+    assert context[SUMMARY_KEY]['summary'] == '+3 +3'
+    assert context[SUMMARY_KEY]['upto'] == 6
+
+
+def test_reset_chat_starts_a_new_summary(summarizer):
+    history = ConversationHistory(max_messages=4, summarize=summarizer)
+    context = chat(9)
+    history.render(context)
+    context['conversation_history'] = chat(2)['conversation_history']
+    assert history.render(context) == "User: message 0\nAssistant: message 1\n"
+    assert context[SUMMARY_KEY]['upto'] == 0
+
+
+def test_failed_summarizer_keeps_clipped_lines():
+    history = ConversationHistory(max_messages=2, summary_line_chars=12, summarize=Summarizer(fail=True))
+    text = history.render(chat(3))
+    assert text == "Summary of earlier conversation:\nUser: mes...\nAssistant...\nRecent messages:\nUser: message 2\n"
+
+
+def test_prompt_stays_within_the_context_window(summarizer):
+    history = ConversationHistory(context_window=300, max_messages=1000, response_reserve=50, summarize=summarizer)
+    context = {'conversation_history': [{'role': 'user', 'content': "word " * 40} for _ in range(30)]}
+    text = history.render(context, prompt_tokens=100)
+    assert estimate_tokens(text) <= history.budget(100) + 8
+    assert summarizer.calls
@@ -0,0 +1,62 @@
+"""extract_json_object on the recorded reply corpus and on the shapes it has to repair"""
+import pytest
+
+from benchmarks.bench_response_parser import load_corpus, matches
+from llm_response_parser import extract_json_object
+
+CORPUS = load_corpus()
+
+
+@pytest.mark.parametrize('intent, exact, contains, text', [record[1:] for record in CORPUS],
+                         ids=[record[0] for record in CORPUS])
+def test_corpus(intent, exact, contains, text):
+    assert matches(extract_json_object(text), intent, exact, contains)
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('```json\n{"intent": "send_email", "subject": "Hi"}\n```', {'intent': 'send_email', 'subject': 'Hi'}),
+    ('Here you go:\n```\n{"intent": "send_email"}\n```\nLet me know.', {'intent': 'send_email'}),
+    ('```json\n{"intent": "send_email", "recipients": ["salah"]', {'intent': 'send_email', 'recipients': ['salah']}),
+], ids=['fenced', 'fenced_no_language', 'fence_never_closed'])
+def test_fences(reply, expected):
+    assert extract_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('{"intent": "send_email", "recipients": ["abdullah",],}', {'intent': 'send_email', 'recipients': ['abdullah']}),
+    ('{"intent": "send_email",\n  "duration": "45",\n}', {'intent': 'send_email', 'duration': '45'}),
+], ids=['in_list_and_object', 'before_newline'])
+def test_trailing_commas(reply, expected):
+    assert extract_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ("{'intent': 'send_email', 'generate_joke': True, 'joke_topic': None}",
+     {'intent': 'send_email', 'generate_joke': True, 'joke_topic': None}),
+    ("{'content': 'I\\'ll be late', 'subject': 'say \"hi\"'}", {'content': "I'll be late", 'subject': 'say "hi"'}),
+], ids=['python_literals', 'escaped_and_double_quotes'])
+def test_single_quotes(reply, expected):
+    assert extract_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('{"content": "Join https://meet.google.com/abc-defg-hij"}', {'content': 'Join https://meet.google.com/abc-defg-hij'}),
+    ('{"intent": "send_email", // email request\n "content": "see http://intranet/q3 // later"}',
+     {'intent': 'send_email', 'content': 'see http://intranet/q3 // later'}),
+    ("{'content': 'http://a/b'} // done", {'content': 'http://a/b'}),
+], ids=['url_value', 'url_value_after_comment', 'single_quoted_url'])
+def test_slashes_in_urls_are_not_comments(reply, expected):
+    assert extract_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('{"intent": "send_email", "content": "Could you send me the bud', {'intent': 'send_email'}),
+    ('{"intent": "send_email", "recipients": ["salah", "sal', {'intent': 'send_email', 'recipients': ['salah']}),
+    ('{"intent": "send_email", "recipients": ["sal', {'intent': 'send_email', 'recipients': []}),
+    ('{"intent": "send_email", "subj', {'intent': 'send_email'}),
+    ('{"intent": "send_email", "subject":', {'intent': 'send_email'}),
+    ("{'intent': 'send_email', 'content': 'I\\'ll be la", {'intent': 'send_email'}),
+    ('{"intent": "send_email", "recipients": ["salah",', {'intent': 'send_email', 'recipients': ['salah']}),
+])
+def test_truncated_values_are_dropped(reply, expected):
+    assert extract_json_object(reply) == expected
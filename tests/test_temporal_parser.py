@@ -0,0 +1,98 @@
+"""Phrase tables for temporal_parser, resolved against a fixed reference (Wednesday 2024-05-15 10:00)"""
+from datetime import datetime
+
+import pytest
+
+import temporal_parser
+
+REFERENCE = datetime(2024, 5, 15, 10, 0)  # a Wednesday
+
+
+def at(day, hour, minute=0):
+    return datetime(2024, 5, day, hour, minute)
+
+
+# (text, expected start or None, expected end or None)
+TIME_CASES = [
+    ('2:00 PM tomorrow', at(16, 14), None),
+    ('tomorrow at 2:00 pm', at(16, 14), None),
+    ('10:00 AM today', at(15, 10), None),
+    ('2pm', at(15, 14), None),
+    ('2 p.m.', at(15, 14), None),
+    ('9.30am', at(15, 9, 30), None),
+    ('12 am', at(15, 0), None),
+    ('12:15 PM', at(15, 12, 15), None),
+    ('14:30', at(15, 14, 30), None),
+    ('tomorrow 09:05', at(16, 9, 5), None),
+    ('noon tomorrow', at(16, 12), None),
+    ('midnight', at(15, 0), None),
+    ('tomorrow at 3', at(16, 15), None),
+    ('today at 9', at(15, 9), None),
+    ('tonight at 8', at(15, 20), None),
+    ('day after tomorrow at 11am', at(17, 11), None),
+    ('10:00 AM this Friday', at(17, 10), None),
+    ('friday 4pm', at(17, 16), None),
+    ('on wed at 1pm', at(15, 13), None),
+    ('monday 9am', at(20, 9), None),
+    ('next friday at 10am', at(24, 10), None),
+    ('next monday 9am', at(20, 9), None),
+    ('thursday next week at 3pm', at(23, 15), None),
+    ('next week at 11am', at(20, 11), None),
+    ('2024-06-01 at 10am', datetime(2024, 6, 1, 10), None),
+    ('May 20 at 2pm', at(20, 14), None),
+    ('3rd of june, 2pm', datetime(2024, 6, 3, 14), None),
+    ('jan 5 9am', datetime(2025, 1, 5, 9), None),
+    ('2-3pm tomorrow', at(16, 14), at(16, 15)),
+    ('from 10am to 11:30am', at(15, 10), at(15, 11, 30)),
+    ('between 1 and 2:30 pm on friday', at(17, 13), at(17, 14, 30)),
+    ('11-1pm', at(15, 11), at(15, 13)),
+    ('9:00-17:00', at(15, 9), at(15, 17)),
+    ('11pm-1am', at(15, 23), at(16, 1)),
+    ("Let's meet tomorrow at 2:00 PM for 30 minutes.", at(16, 14), None),
+    ('tomorrow', None, None),
+    ('sometime next week', None, None),
+    ('', None, None),
+]
+
+# (text, reference, expected start) with prefer_future=True
+FUTURE_CASES = [
+    ('9am', REFERENCE, at(16, 9)),
+    ('11am', REFERENCE, at(15, 11)),
+    ('today at 9am', REFERENCE, at(15, 9)),
+]
+
+# (text, expected minutes or None)
+DURATION_CASES = [
+    ('30', 30),
+    ('45 minutes', 45),
+    ('45 min', 45),
+    ('90m', 90),
+    ('1 hour', 60),
+    ('2 hours', 120),
+    ('1.5 hours', 90),
+    ('1h30', 90),
+    ('1 hour 15 minutes', 75),
+    ('2 hrs and 10 mins', 130),
+    ('an hour', 60),
+    ('half an hour', 30),
+    ('an hour and a half', 90),
+    ('quarter of an hour', 15),
+    ('Can we do a 20 min call tomorrow at 3pm?', 20),
+    ('no length given', None),
+]
+
+
+@pytest.mark.parametrize('text, start, end', TIME_CASES)
+def test_parse_time_range(text, start, end):
+    expected = (start, end) if start else None
+    assert temporal_parser.parse_time_range(text, reference=REFERENCE) == expected
+
+
+@pytest.mark.parametrize('text, reference, start', FUTURE_CASES)
+def test_parse_time_prefer_future(text, reference, start):
+    assert temporal_parser.parse_time(text, reference=reference, prefer_future=True) == start
+
+
+@pytest.mark.parametrize('text, minutes', DURATION_CASES)
+def test_parse_duration(text, minutes):
+    assert temporal_parser.parse_duration(text) == minutes
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, make_response
+from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, make_response, Response
 from flask_cors import CORS
 import json
 from datetime import datetime, timedelta
@@ -6,23 +6,22 @@ import os
 from dotenv import load_dotenv
 from meeting_automation import MeetingAutomation
 from llm_service import LLMService
+from meeting_query import QueryError, parse_query, paginate_list, page_response, iter_ndjson
 import uuid
+import queue
+import threading
 
 # Load environment variables
 print("\nLoading environment variables...")
 load_dotenv()
 
-# Debug print statements
-print(f"SMTP_PASSWORD length: {len(os.getenv('SMTP_PASSWORD', ''))}")
-print(f"SMTP_PASSWORD first and last char: {os.getenv('SMTP_PASSWORD', '')[:1]}...{os.getenv('SMTP_PASSWORD', '')[-1:]}")
-
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 CORS(app, resources={r"/*": {"origins": "*", "supports_credentials": True}})
 
-# Initialize services
-meeting_automation = MeetingAutomation()
+# Initialize services; both share one LLM service and its Ollama connection pool
 llm_service = LLMService()
+meeting_automation = MeetingAutomation(llm_service=llm_service)
 
 # In-memory storage for meetings and chat context
 meetings = []
@@ -35,20 +34,38 @@ def index():
     response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
     return response
 
-@app.route('/chat', methods=['POST'])
-def chat():
+def _chat_request():
+    """Read the chat message and session id from the request; returns (message, session_id, error)"""
     data = request.json
     if not data:
-        return jsonify({'error': 'No data provided'}), 400
+        return None, None, (jsonify({'error': 'No data provided'}), 400)
         
     message = data.get('message', '')
     if not message:
-        return jsonify({'error': 'No message provided'}), 400
+        return None, None, (jsonify({'error': 'No message provided'}), 400)
         
     # Get or create session context
     session_id = request.cookies.get('session_id')
     if not session_id:
         session_id = str(uuid.uuid4())
+    return message, session_id, None
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    message, session_id, error = _chat_request()
+    if error:
+        return error
+    
+    response = jsonify(process_chat_message(session_id, message))
+    response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
+    return response
+
+def process_chat_message(session_id, message, emit=None):
+    """Run one chat turn and return the response payload
+
+    emit(event, data), when given, receives progress updates and partial agenda/joke text.
+    """
+    emit = emit or (lambda event, data: None)
     
     if session_id not in chat_contexts:
         chat_contexts[session_id] = {
@@ -85,49 +102,45 @@ def chat():
                     'role': 'assistant',
                     'content': "I've processed your meeting request and sent confirmation emails to all participants. They'll need to confirm the meeting before it's scheduled."
                 })
-                response = jsonify({
+                return {
                     'response': "I've processed your meeting request and sent confirmation emails to all participants. They'll need to confirm the meeting before it's scheduled.",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
             else:
                 context['conversation_history'].append({
                     'role': 'assistant',
                     'content': f"Sorry, I couldn't process your meeting request: {result}"
                 })
-                response = jsonify({
+                return {
                     'response': f"Sorry, I couldn't process your meeting request: {result}",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
                 
         except Exception as e:
             context['conversation_history'].append({
                 'role': 'assistant',
                 'content': f"Sorry, there was an error processing your request: {str(e)}"
             })
-            response = jsonify({
+            return {
                 'response': f"Sorry, there was an error processing your request: {str(e)}",
                 'show_form': False
-            })
-            response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-            return response
+            }
     
     # Use LLM to understand the intent with context
-    understanding = llm_service.understand_intent(message, context)
+    emit('progress', {'stage': 'intent', 'message': 'Understanding your request...'})
+    understanding = llm_service.understand_intent(
+        message, context, on_token=lambda text: emit('token', {'kind': 'intent', 'text': text})
+    )
+    emit('intent', understanding)
     print(f"LLM Understanding: {understanding}")  # Debug print
     print(f"Session ID: {session_id}")  # Debug print
     print(f"Current Context: {context}")  # Debug print
     
     if not understanding:
-        response = jsonify({
+        return {
             'response': "I'm sorry, I couldn't understand your request. Could you please rephrase it?",
             'show_form': False
-        })
-        response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-        return response
+        }
 
     try:
         # Update context with new information
@@ -147,6 +160,26 @@ def chat():
             context['is_recurring'] = understanding['is_recurring']
         if understanding['recurrence_rule']:
             context['recurrence_rule'] = understanding['recurrence_rule']
+        if understanding['generate_joke']:
+            context['generate_joke'] = understanding['generate_joke']
+            context['joke_topic'] = understanding['joke_topic']
+            # Start writing the joke while the remaining details are collected
+            meeting_automation.joke_pool.warm(context['joke_topic'])
+
+        # Names the directory could not resolve: ask instead of silently dropping them
+        unresolved = understanding.get('unresolved_recipients') or []
+        if unresolved and context['intent'] in ('send_email', 'schedule_meeting'):
+            context['last_question'] = 'recipients'
+            notes = []
+            for name in unresolved:
+                suggestions = [contact.email for contact, _ in llm_service.contacts.search(name, limit=3)]
+                notes.append(f"{name} (did you mean {' or '.join(suggestions)}?)" if suggestions else name)
+            reply = f"I couldn't find a single contact for {', '.join(notes)}. Who should I include?"
+            context['conversation_history'].append({'role': 'assistant', 'content': reply})
+            return {
+                'response': reply,
+                'show_form': False
+            }
 
         # Handle email sending
         if context['intent'] == 'send_email':
@@ -156,12 +189,10 @@ def chat():
                     'role': 'assistant',
                     'content': "Who would you like to send the email to?"
                 })
-                response = jsonify({
+                return {
                     'response': "Who would you like to send the email to?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
 
             if not context['subject'] and context['last_question'] != 'subject':
                 context['last_question'] = 'subject'
@@ -169,12 +200,10 @@ def chat():
                     'role': 'assistant',
                     'content': "What would you like the subject of the email to be?"
                 })
-                response = jsonify({
+                return {
                     'response': "What would you like the subject of the email to be?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
 
             if not context['content'] and context['last_question'] != 'content':
                 context['last_question'] = 'content'
@@ -182,28 +211,38 @@ def chat():
                     'role': 'assistant',
                     'content': "What would you like to say in the email?"
                 })
-                response = jsonify({
+                return {
                     'response': "What would you like to say in the email?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
 
             # If we have all required information, send the email
             if context['recipients'] and context['content']:
                 try:
-                    meeting_automation.send_email(
+                    if context.get('generate_joke'):
+                        emit('progress', {'stage': 'joke', 'message': 'Writing a joke...'})
+                    success, result = meeting_automation.queue_email(
                         recipients=context['recipients'],
                         subject=context['subject'] or "Email from Meeting Assistant",
                         content=context['content'],
                         generate_joke=context.get('generate_joke', False),
-                        joke_topic=context.get('joke_topic', '')
+                        joke_topic=context.get('joke_topic', ''),
+                        on_token=lambda text: emit('token', {'kind': 'joke', 'text': text})
                     )
+                    if not success:
+                        raise Exception(result)
+
+                    message_id = result
+                    delivery_status = meeting_automation.get_email_status(message_id)['status']
+                    if delivery_status == 'sent':
+                        reply = f"I've sent the email to {', '.join(context['recipients'])}."
+                    else:
+                        reply = f"Your email to {', '.join(context['recipients'])} is queued for delivery."
 
                     # Add success message to conversation history
                     context['conversation_history'].append({
                         'role': 'assistant',
-                        'content': f"I've sent the email to {', '.join(context['recipients'])}."
+                        'content': reply
                     })
 
                     # Clear context after successful email
@@ -222,24 +261,22 @@ def chat():
                         'recurrence_rule': ''
                     }
 
-                    response = jsonify({
-                        'response': f"I've sent the email to {', '.join(context['recipients'])}.",
+                    return {
+                        'response': reply,
+                        'message_id': message_id,
+                        'delivery_status': delivery_status,
                         'show_form': False
-                    })
-                    response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                    return response
+                    }
                 except Exception as e:
                     error_message = f"Sorry, there was an error sending the email: {str(e)}"
                     context['conversation_history'].append({
                         'role': 'assistant',
                         'content': error_message
                     })
-                    response = jsonify({
+                    return {
                         'response': error_message,
                         'show_form': False
-                    })
-                    response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                    return response
+                    }
 
         # Handle meeting scheduling
         elif context['intent'] == 'schedule_meeting':
@@ -249,12 +286,10 @@ def chat():
                     'role': 'assistant',
                     'content': "What time would you like to schedule the meeting?"
                 })
-                response = jsonify({
+                return {
                     'response': "What time would you like to schedule the meeting?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
             
             if not context['recipients'] and context['last_question'] != 'recipients':
                 context['last_question'] = 'recipients'
@@ -262,12 +297,10 @@ def chat():
                     'role': 'assistant',
                     'content': "Who would you like to invite to the meeting?"
                 })
-                response = jsonify({
+                return {
                     'response': "Who would you like to invite to the meeting?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
             
             if not context['subject'] and context['last_question'] != 'subject':
                 context['last_question'] = 'subject'
@@ -275,27 +308,28 @@ def chat():
                     'role': 'assistant',
                     'content': "What would you like to title the meeting?"
                 })
-                response = jsonify({
+                return {
                     'response': "What would you like to title the meeting?",
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
 
             # If we have all required information, schedule the meeting
             if context['time'] and context['recipients']:
                 # Schedule the meeting
-                meeting = meeting_automation.schedule_meeting(
+                emit('progress', {'stage': 'agenda', 'message': 'Drafting the agenda and creating the calendar event...'})
+                # The confirmation is queued so the request does not wait on SMTP
+                result = meeting_automation.run_scheduling_pipeline(
                     subject=context['subject'] or "Meeting",
                     start_time=context['time'],
                     participants=context['recipients'],
                     duration=context['duration'],
                     is_recurring=context.get('is_recurring', False),
-                    recurrence_rule=context.get('recurrence_rule', '')
+                    recurrence_rule=context.get('recurrence_rule', ''),
+                    on_token=lambda text: emit('token', {'kind': 'agenda', 'text': text}),
+                    confirmation='queue'
                 )
-                
-                # Send confirmation
-                meeting_automation.send_meeting_confirmation(meeting, context['recipients'])
+                message_id = result['message_id']
+                delivery_status = meeting_automation.get_email_status(message_id)['status'] if message_id else 'failed'
                 
                 # Clear context after successful scheduling
                 chat_contexts[session_id] = {
@@ -311,12 +345,13 @@ def chat():
                     'recurrence_rule': ''
                 }
                 
-                response = jsonify({
+                return {
                     'response': f"Great! I've scheduled a {context['duration']} minute meeting for {context['time'].strftime('%I:%M %p')} with {', '.join(context['recipients'])}. I've sent the calendar invites with Google Meet link.",
+                    'message_id': message_id,
+                    'delivery_status': delivery_status,
+                    'timings': result['timings'],
                     'show_form': False
-                })
-                response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-                return response
+                }
 
         # Handle unclear intent
         else:
@@ -325,21 +360,51 @@ def chat():
                 'role': 'assistant',
                 'content': "I can help you schedule meetings or send emails. What would you like to do?"
             })
-            response = jsonify({
+            return {
                 'response': "I can help you schedule meetings or send emails. What would you like to do?",
                 'show_form': False
-            })
-            response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-            return response
+            }
 
     except Exception as e:
         print(f"Error in chat route: {str(e)}")
-        response = jsonify({
+        return {
             'response': f"Sorry, there was an error: {str(e)}",
             'show_form': False
-        })
-        response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
-        return response
+        }
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Server-Sent Events version of /chat: progress, partial agenda/joke text, then the final reply"""
+    message, session_id, error = _chat_request()
+    if error:
+        return error
+    
+    events = queue.Queue()
+    
+    def run():
+        try:
+            payload = process_chat_message(session_id, message, emit=lambda event, data: events.put((event, data)))
+        except Exception as e:
+            print(f"Error in chat stream: {str(e)}")
+            payload = {'response': f"Sorry, there was an error: {str(e)}", 'show_form': False}
+        events.put(('final', payload))
+    
+    def stream():
+        yield _sse('progress', {'stage': 'received', 'message': 'Thinking...'})
+        while True:
+            event, data = events.get()
+            yield _sse(event, data)
+            if event == 'final':
+                return
+    
+    threading.Thread(target=run, daemon=True).start()
+    response = Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.set_cookie('session_id', session_id, httponly=True, samesite='Lax')
+    return response
 
 @app.route('/schedule', methods=['GET', 'POST'])
 def schedule():
@@ -356,21 +421,22 @@ def schedule():
             # Combine date and time
             start_time = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
             
-            # Schedule meeting
-            meeting = meeting_automation.schedule_meeting(
+            # Schedule meeting and send confirmation emails
+            result = meeting_automation.run_scheduling_pipeline(
                 subject=subject,
                 start_time=start_time,
                 participants=participants,
-                duration=duration
+                duration=duration,
+                confirmation='send'
             )
 
-            # Send confirmation emails
-            meeting_automation.send_meeting_confirmation(meeting, participants)
-
             # Add to local storage
-            meetings.append(meeting)
+            meetings.append(result['meeting'])
 
-            flash('Meeting scheduled successfully!', 'success')
+            if result['confirmation_error']:
+                flash(f"Meeting scheduled, but the confirmation email failed: {result['confirmation_error']}", 'warning')
+            else:
+                flash('Meeting scheduled successfully!', 'success')
         except Exception as e:
             flash(f'Error scheduling meeting: {str(e)}', 'danger')
 
@@ -380,7 +446,42 @@ def schedule():
 
 @app.route('/meetings', methods=['GET'])
 def get_meetings():
-    return jsonify(meetings)
+    """One page of meetings; see meeting_query for the filters and cursor"""
+    try:
+        query = parse_query(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    page, next_position = paginate_list(meetings, query)
+    return jsonify(page_response(page, next_position, query['fields']))
+
+@app.route('/meetings/export', methods=['GET'])
+def export_meetings():
+    """Every matching meeting as NDJSON, generated while streaming"""
+    try:
+        query = parse_query(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(iter_ndjson(lambda q: paginate_list(meetings, q), query), mimetype='application/x-ndjson')
+
+@app.route('/llm_stats', methods=['GET'])
+def llm_stats():
+    return jsonify({
+        'intent_cache': llm_service.intent_cache.stats(),
+        'fast_path': llm_service.fast_path_stats,
+        'gateway': llm_service.ollama_client.stats,
+        'scheduler': llm_service.ollama_client.scheduler.stats(),
+        'joke_pool': meeting_automation.joke_pool.status(),
+        'agenda_cache': meeting_automation.agenda_cache.stats(),
+        'context_cache': meeting_automation.context_cache.stats(),
+        'contacts': llm_service.contacts.stats
+    })
+
+@app.route('/email_status/<message_id>', methods=['GET'])
+def email_status(message_id):
+    status = meeting_automation.get_email_status(message_id)
+    if status is None:
+        return jsonify({'error': 'Unknown message id'}), 404
+    return jsonify(status)
 
 def main():
     try: